@@ -0,0 +1,43 @@
+from mini_btc import FullNode
+from tests.utils import mine, spend
+import random, time
+
+
+# Nombre de transactions de chaque sorte (valides, signature invalide, double dépense)
+N = 200
+
+n1 = FullNode("localhost", 9900, difficulty=1, verbose=0)
+n2 = FullNode("localhost", 9901, "localhost", 9900, difficulty=1, verbose=0)
+for _ in range(2 * N):
+    block = mine(n1)
+    assert n1._add_block(block) and n2._add_block(block)
+n1.start(); n2.start()
+time.sleep(1)
+
+rewards = [block["tx"][0] for block in n1.ledger]
+txs = [spend(reward) for reward in rewards[:N]] \
+    + [spend(reward, valid=False) for reward in rewards[N:]] \
+    + [spend(reward, dest="bob") for reward in rewards[:N]]
+random.shuffle(txs)
+
+# Réception des transactions: le thread réseau ne fait que les mettre en attente
+start = time.time()
+for tx in txs:
+    n1.broadcast({"request": "TRANSACT", "tx": tx}, id=tx["hash"])
+receive = time.time() - start
+
+# Attente de l'admission par les deux noeuds
+while sum(v for k, v in n2.admission_stats().items() if k not in ["received", "dropped", "throughput"]) \
+    < n1.admission_stats()["accepted"] or n1.admission_queue.qsize() > 0:
+    time.sleep(0.1)
+elapsed = time.time() - start
+
+stats = n1.admission_stats()
+print(f"réception de {len(txs)} transactions {receive * 1000:.0f} ms, admission {elapsed:.2f} s")
+print(f"admission: {stats['throughput']:.0f} tx/s, " + ", ".join(f"{k} {v}"
+    for k, v in stats.items() if k != "throughput"))
+print(f"transactions diffusées au voisin: {n2.admission_stats()['received']} "
+    f"(sans admission: {len(txs)})")
+
+n1.shutdown()
+n2.shutdown()
@@ -0,0 +1,55 @@
+from mini_btc import FullNode
+from tests.utils import mine
+import os, shutil, tempfile, time
+
+
+# Nombre de blocs du registre
+L = 100_000
+
+
+class Syncer(FullNode):
+    """
+    Noeud signalant la fin de la synchronisation.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, **kwargs)
+
+
+path = tempfile.mkdtemp()
+store = os.path.join(path, "node")
+
+start = time.time()
+n1 = Syncer("localhost", 9300, store=store, checkpoint_interval=L)
+prev = None
+for _ in range(L):
+    prev = mine(n1, prev=prev)
+    assert n1._add_block(prev)
+print(f"Construction de {L} blocs en {time.time() - start:.1f} s, "
+      f"{sum(os.path.getsize(os.path.join(store, f)) for f in os.listdir(store)) / 1e6:.1f} Mo")
+
+# Avant: le registre est téléchargé et revalidé depuis un voisin
+n2 = Syncer("localhost", 9301, "localhost", 9300, sync_chunk=5000)
+n2.start(); n1.start()
+time.sleep(1)
+start = time.time()
+n2._sync("localhost", 9300)
+while len(n2.block_hashes) < L:
+    time.sleep(0.01)
+print(f"Synchronisation réseau: {time.time() - start:.2f} s")
+n2.shutdown()
+utxo = len(n1.utxo)
+n1.shutdown()
+
+port = 9302
+for name, keep in [("avec point de contrôle", True), ("sans point de contrôle", False)]:
+    if not keep:
+        os.remove(os.path.join(store, "state.dat"))
+    start = time.time()
+    node = Syncer("localhost", port, store=store, checkpoint_interval=L)
+    elapsed = time.time() - start
+    assert L == len(node.ledger) and utxo == len(node.utxo)
+    print(f"Redémarrage {name}: {elapsed:.2f} s")
+    node.store.close()
+    port += 1
+
+shutil.rmtree(path)
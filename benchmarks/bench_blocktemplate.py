@@ -0,0 +1,60 @@
+from mini_btc import FullNode, BlockTemplate, Transaction, MerkleTree
+from mini_btc.utils import address_from_pubkey
+from tests.utils import mine, spend, pubkey
+import random, time
+
+
+# Nombre de répétitions des mesures
+R = 20
+
+
+def rebuild(node: FullNode, size: int) -> dict:
+    """
+    Construction complète du bloc à miner comme avant le modèle incrémental.
+    """
+    block_tx = []
+    candidates = list(node.buf_tx)
+    while len(candidates) > 0 and len(block_tx) < size:
+        group = candidates[:size-len(block_tx)]
+        candidates = candidates[len(group):]
+        for tx, valid in zip(group, node.check_txs(group)):
+            if valid: block_tx.append(tx.to_dict())
+    reward_tx = Transaction()
+    reward_tx.add_output(address_from_pubkey(pubkey), 50, f"{pubkey} CHECKSIG")
+    block_tx.append(reward_tx.to_dict())
+    return {"index": len(node.ledger), "hash": node.block_hashes[-1],
+        "root": MerkleTree([tx["hash"] for tx in block_tx]).get_root(),
+        "nonce": random.randint(0, 1_000_000_000), "tx": block_tx}
+
+
+node = FullNode("localhost", 9950, difficulty=1, verbose=0)
+for _ in range(1000):
+    mine(node, add=True)
+txs = [Transaction(spend(block["tx"][0])) for block in node.ledger]
+# Les signatures sont vérifiées une fois à l'admission
+assert all(node.accept_txs(txs))
+
+for size in [10, 100, 999]:
+    # Une nouvelle transaction arrive pendant le minage
+    start = time.time()
+    for _ in range(R):
+        block = rebuild(node, size)
+    full = (time.time() - start) / R
+
+    template = BlockTemplate(pubkey, size)
+    for tx in txs[:size-1]:
+        template.add(tx)
+    incremental = 0
+    for i in range(R):
+        start = time.time()
+        template.add(txs[size-1])
+        block = template.block()
+        incremental += time.time() - start
+        template.remove(txs[size-1])
+    incremental /= R
+    assert block["root"] == MerkleTree([tx["hash"] for tx in block["tx"]]).get_root()
+
+    print(f"{size} transactions: reconstruction {full * 1000:.2f} ms, "
+          f"modèle incrémental {incremental * 1e6:.0f} µs")
+
+node.shutdown()
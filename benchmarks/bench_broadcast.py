@@ -0,0 +1,95 @@
+from mini_btc import Node
+import random, socket, threading, time
+
+
+# Nombre de noeuds du réseau
+N = 50
+# Délai maximum d'envoi à un voisin
+TIMEOUT = 2.0
+
+
+class Listener(Node):
+    """
+    Noeud enregistrant la date de réception des paquets diffusés.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received = dict()
+
+    def _broadcast_callback(self, host: str, port: int, id: str, body: object):
+        self.received[body["n"]] = time.time()
+
+
+def blackhole(port: int) -> list:
+    """
+    Crée un noeud inactif dont la file de connexions est pleine.
+    Les connexions vers ce noeud restent bloquées jusqu'au délai maximum.
+
+    :return: Prises à conserver ouvertes.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("localhost", port))
+    sock.listen(0)
+    socks = [sock]
+    # Remplissage de la file des connexions en attente
+    for _ in range(4):
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.setblocking(False)
+        client.connect_ex(("localhost", port))
+        socks.append(client)
+    return socks
+
+
+def run(engine: str, base: int):
+    random.seed(0)
+    nodes = []
+    for i in range(N):
+        if i == 0:
+            node = Listener("localhost", base, max_nodes=4, verbose=0,
+                engine=engine, send_timeout=TIMEOUT)
+        else:
+            remote = random.randrange(i)
+            node = Listener("localhost", base + i, "localhost", base + remote,
+                max_nodes=4, verbose=0, engine=engine, send_timeout=TIMEOUT)
+        node.start()
+        nodes.append(node)
+        time.sleep(0.01)
+    time.sleep(1)
+
+    # Liens symétriques pour que le réseau soit connexe
+    for i, node in enumerate(nodes):
+        for host, port in node.nodes.copy():
+            nodes[port - base].nodes.add(("localhost", base + i))
+
+    # Chaque noeud a un voisin inactif en plus de ses voisins actifs
+    holes = [blackhole(base + N + i) for i in range(N)]
+    for i, node in enumerate(nodes):
+        node.nodes.add(("localhost", base + N + i))
+
+    latencies = []
+    for n in range(3):
+        start = time.time()
+        nodes[0].broadcast({"n": n})
+        deadline = start + 10 * TIMEOUT
+        while time.time() < deadline and any(n not in node.received for node in nodes):
+            time.sleep(0.001)
+        arrivals = sorted(node.received[n] - start for node in nodes if n in node.received)
+        latencies.append(arrivals)
+        time.sleep(TIMEOUT)
+
+    for n, arrivals in enumerate(latencies):
+        print(f"{engine} diffusion {n}: {len(arrivals)}/{N} noeuds, "
+              f"médiane {arrivals[len(arrivals) // 2] * 1000:.1f} ms, "
+              f"maximum {arrivals[-1] * 1000:.1f} ms")
+
+    for node in nodes:
+        node.shutdown()
+    for socks in holes:
+        for sock in socks:
+            sock.close()
+
+
+run("threading", 8200)
+run("asyncio", 8300)
+print(f"{threading.active_count()} threads actifs")
@@ -0,0 +1,69 @@
+from mini_btc import FullNode, Transaction
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign, encode_frame, \
+    FrameCompressor, CODECS, FRAME_JSON, FRAME_BINARY
+from tests.utils import mine, privkey, pubkey, address
+import time
+
+
+# Nombre de transactions du bloc encodé
+N = 200
+# Nombre de répétitions des mesures de débit
+R = 50
+
+bob = dsa_import("./wallets/bob.bin")
+bob_pubkey, bob_address = dsa_pubkey(bob)
+
+# Bloc de transactions signées d'Alice vers Bob suivies de la récompense
+prev_tx = Transaction()
+prev_tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+prev_tx = prev_tx.to_dict()
+sign = dsa_sign(privkey, {k: v for k, v in prev_tx.items() if k != "hash"})
+
+block_tx = []
+for i in range(N - 1):
+    tx = Transaction()
+    tx.add_input(prev_tx["hash"], 0, sign)
+    tx.add_output(bob_address, 10, f"{bob_pubkey} CHECKSIG")
+    tx.add_output(address, 40, f"{pubkey} CHECKSIG")
+    block_tx.append(tx.to_dict())
+
+block = mine(FullNode("localhost", 8850, difficulty=1, verbose=0), block_tx)
+pck = {"header": "BROADCAST", "host": "localhost", "port": 8000,
+    "id": "localhost:8000#1677271598.235741",
+    "body": {"request": "SUBMIT_BLOCK", "block": block}}
+
+for type in [FRAME_JSON, FRAME_BINARY]:
+    codec = CODECS[type]
+    data = codec.encode(pck)
+    assert codec.decode(data) == pck
+
+    start = time.time()
+    for _ in range(R):
+        codec.encode(pck)
+    encode = R * N / (time.time() - start)
+
+    start = time.time()
+    for _ in range(R):
+        codec.decode(data)
+    decode = R * N / (time.time() - start)
+
+    print(f"{codec.name}: {len(data)} octets, "
+          f"encodage {encode:.0f} tx/s, décodage {decode:.0f} tx/s")
+
+# Synchronisation d'un registre de 100 blocs en une réponse LIST_BLOCKS
+# suivie de 100 blocs soumis un par un sur la même connexion
+ledger = [dict(block, index=i) for i in range(100)]
+list_blocks = {"header": "PRIVATE", "host": "localhost", "port": 8000,
+    "body": {"request": "LIST_BLOCKS", "blocks": ledger}}
+submits = [{"header": "BROADCAST", "host": "localhost", "port": 8000, "id": f"localhost:8000#{i}",
+    "body": {"request": "SUBMIT_BLOCK", "block": b}} for i, b in enumerate(ledger)]
+
+for type in [FRAME_JSON, FRAME_BINARY]:
+    codec = CODECS[type]
+    for compressor in [None, FrameCompressor()]:
+        start = time.time()
+        size = len(encode_frame(list_blocks, codec, compressor))
+        size_submit = sum(len(encode_frame(pck, codec, compressor)) for pck in submits)
+        elapsed = time.time() - start
+        print(f"{codec.name}{'+zlib' if compressor else ''}: LIST_BLOCKS {size / 2**20:.1f} Mo, "
+              f"SUBMIT_BLOCK {size_submit / 2**20:.1f} Mo en {elapsed:.2f} s")
@@ -0,0 +1,58 @@
+from mini_btc import Miner, Transaction
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign, sha256, encode_frame, \
+    CODECS, FRAME_BINARY
+from tests.utils import mine, privkey, pubkey, address
+import time
+
+
+bob = dsa_import("./wallets/bob.bin")
+bob_pubkey, bob_address = dsa_pubkey(bob)
+
+prev_tx = Transaction()
+prev_tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+prev_tx = prev_tx.to_dict()
+sign = dsa_sign(privkey, {k: v for k, v in prev_tx.items() if k != "hash"})
+
+
+class Sender(Miner):
+    """
+    Mineur dont on capture le bloc soumis au lieu de le diffuser.
+    """
+    def broadcast(self, body: object, id: str = None):
+        self.submitted = body
+
+
+miner = Sender(pubkey, "localhost", 8600, difficulty=1, verbose=0)
+node = Sender(pubkey, "localhost", 8601, difficulty=1, verbose=0)
+binary = CODECS[FRAME_BINARY]
+
+for block_size in [10, 100, 1000]:
+    # Bloc de transactions signées d'Alice vers Bob et récompense
+    block_tx = []
+    for i in range(block_size - 1):
+        tx = Transaction()
+        tx.locktime += i
+        tx.add_input(prev_tx["hash"], i, sign)
+        tx.add_output(bob_address, 10, f"{bob_pubkey} CHECKSIG")
+        tx.add_output(address, 40, f"{pubkey} CHECKSIG")
+        block_tx.append(tx.to_dict())
+    block = mine(miner, block_tx)
+
+    sizes = []
+    for compact in [False, True]:
+        miner.compact_blocks = compact
+        miner.submit_block(block)
+        pck = {"header": "BROADCAST", "host": "localhost", "port": 8600,
+            "id": sha256(block), "body": miner.submitted}
+        sizes.append(len(encode_frame(pck, binary)))
+
+    # Reconstruction à partir d'un tampon contenant toutes les transactions
+    node.buf_tx.clear()
+    node.buf_tx.update(Transaction(tx) for tx in block_tx)
+    start = time.time()
+    rebuilt = node._rebuild_block("localhost", 8600, miner.submitted["compact"])
+    elapsed = time.time() - start
+    assert rebuilt == block
+
+    print(f"{block_size} transactions: bloc complet {sizes[0] / 1000:.1f} Ko, "
+          f"bloc compact {sizes[1] / 1000:.1f} Ko, reconstruction {elapsed * 1000:.1f} ms")
@@ -0,0 +1,59 @@
+from mini_btc import FullNode, Transaction
+from tests.utils import mine, spend
+import time
+
+
+def linear_find_tx(node: FullNode, txHash: str) -> Transaction:
+    """
+    Recherche linéaire d'une transaction dans le registre (avant l'index).
+    """
+    for block in node.ledger:
+        for tx in block["tx"]:
+            if txHash == tx["hash"]:
+                return Transaction(tx)
+    return None
+
+
+port = 8700
+for N in [10_000, 100_000]:
+    node = FullNode("localhost", port, difficulty=1, verbose=0)
+    port += 1
+
+    # Registre de N blocs contenant chacun une récompense pour Alice
+    # Les transactions des blocs du registre ne sont pas vérifiées pour gagner du temps
+    start = time.time()
+    for _ in range(N):
+        node._connect_block(mine(node))
+    print(f"{N} blocs: registre construit en {time.time() - start:.1f} s")
+
+    # Bloc dépensant la dernière récompense d'Alice au profit de Bob
+    reward_tx = node.ledger[-1]["tx"][-1]
+    hash = reward_tx["hash"]
+    block = mine(node, [spend(reward_tx, dest="bob")])
+
+    R = 10
+    start = time.time()
+    for _ in range(R):
+        assert linear_find_tx(node, hash) is not None
+    linear = (time.time() - start) / R
+
+    start = time.time()
+    for _ in range(R):
+        assert node.find_tx(hash) is not None
+    indexed = (time.time() - start) / R
+
+    start = time.time()
+    for _ in range(R):
+        assert node._check_block(block)
+    check = (time.time() - start) / R
+
+    # Validation du même bloc avec la recherche linéaire
+    node.find_tx = lambda txHash: linear_find_tx(node, txHash)
+    start = time.time()
+    for _ in range(R):
+        assert node._check_block(block)
+    linear_check = (time.time() - start) / R
+
+    print(f"{N} blocs: find_tx linéaire {linear * 1000:.2f} ms, indexé {indexed * 1000:.4f} ms")
+    print(f"{N} blocs: validation d'un bloc linéaire {linear_check * 1000:.2f} ms, "
+          f"indexée {check * 1000:.2f} ms")
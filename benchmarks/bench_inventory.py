@@ -0,0 +1,94 @@
+from mini_btc import Node, Transaction
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign
+import mini_btc.ConnectionPool
+import random, threading, time
+
+
+# Nombre de noeuds du réseau
+N = 20
+# Nombre de voisins par noeud
+DEGREE = 10
+# Nombre de transactions diffusées
+M = 50
+
+
+# Comptage des octets envoyés par toutes les connexions
+sent = {"bytes": 0}
+lock_sent = threading.Lock()
+encode_frame = mini_btc.ConnectionPool.encode_frame
+
+def counting_encode_frame(*args, **kwargs) -> bytes:
+    frame = encode_frame(*args, **kwargs)
+    with lock_sent:
+        sent["bytes"] += len(frame)
+    return frame
+
+mini_btc.ConnectionPool.encode_frame = counting_encode_frame
+
+
+# Transactions signées d'Alice vers Bob
+alice = dsa_import("./wallets/alice.bin")
+bob = dsa_import("./wallets/bob.bin")
+alice_pubkey, alice_address = dsa_pubkey(alice)
+bob_pubkey, bob_address = dsa_pubkey(bob)
+
+prev_tx = Transaction()
+prev_tx.add_output(alice_address, 50, f"{alice_pubkey} CHECKSIG")
+prev_tx = prev_tx.to_dict()
+sign = dsa_sign(alice, {k: v for k, v in prev_tx.items() if k != "hash"})
+
+def signed_tx() -> dict:
+    tx = Transaction()
+    tx.add_input(prev_tx["hash"], 0, sign)
+    tx.add_output(bob_address, 10, f"{bob_pubkey} CHECKSIG")
+    tx.add_output(alice_address, 40, f"{alice_pubkey} CHECKSIG")
+    return tx.to_dict()
+
+
+class Listener(Node):
+    """
+    Noeud comptant les paquets diffusés reçus.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count = 0
+
+    def _broadcast_callback(self, host: str, port: int, id: str, body: object):
+        self.count += 1
+
+
+def run(inventory: bool, base: int):
+    random.seed(0)
+    nodes = [Listener("localhost", base + i, max_nodes=DEGREE, verbose=0,
+        inventory=inventory, compression=False) for i in range(N)]
+    for node in nodes:
+        node.start()
+
+    # Graphe aléatoire de degré DEGREE
+    for i, node in enumerate(nodes):
+        while len(node.nodes) < DEGREE:
+            j = random.randrange(N)
+            if j != i:
+                node.nodes.add(("localhost", base + j))
+                nodes[j].nodes.add(("localhost", base + i))
+    time.sleep(0.5)
+
+    sent["bytes"] = 0
+    start = time.time()
+    for i in range(M):
+        tx = signed_tx()
+        nodes[i % N].broadcast({"request": "TRANSACT", "tx": tx}, id=tx["hash"])
+    while any(node.count < M for node in nodes):
+        time.sleep(0.001)
+    elapsed = time.time() - start
+
+    mode = "INV/GETDATA" if inventory else "envoi complet"
+    print(f"{mode}: {sent['bytes'] / M / 1000:.1f} Ko par transaction diffusée, "
+          f"{elapsed * 1000:.0f} ms")
+
+    for node in nodes:
+        node.shutdown()
+
+
+run(False, 8400)
+run(True, 8500)
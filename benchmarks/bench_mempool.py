@@ -0,0 +1,53 @@
+from mini_btc import Mempool, Transaction
+import time, tracemalloc
+
+
+# Nombre de transactions reçues lors de l'inondation
+N = 50_000
+# Nombre de sorties distinctes dépensées par ces transactions
+K = 1000
+# Capacité du tampon borné
+CAPACITY = 5000
+
+
+def tx_spending(index: int, n: int) -> Transaction:
+    tx = Transaction()
+    tx.add_input(prevTxHash="prev", index=index, unlock="true")
+    tx.add_output(f"address{n}", 1, "true")
+    return tx
+
+
+txs = [tx_spending(n % K, n) for n in range(N)]
+for tx in txs: tx.raw_format()
+# Bloc qui confirme une transaction par sortie, différente de celles du tampon
+block = [tx_spending(index, -index-1) for index in range(K)]
+
+for name in ["set", "Mempool"]:
+    tracemalloc.start()
+    start = time.time()
+    if name == "set":
+        # Toutes les transactions sont conservées
+        buf_tx = set()
+        for tx in txs:
+            buf_tx.add(tx)
+    else:
+        buf_tx = Mempool(max_count=CAPACITY)
+        for tx in txs:
+            buf_tx.add(tx)
+    admission = time.time() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Retrait des transactions confirmées et des doubles dépenses devenues invalides
+    start = time.time()
+    if name == "set":
+        spent = {(intx["prevTxHash"], intx["index"]) for tx in block for intx in tx.input}
+        buf_tx.difference_update({tx for tx in buf_tx
+            if any((intx["prevTxHash"], intx["index"]) in spent for intx in tx.input)})
+    else:
+        buf_tx.difference_update(block)
+    removal = time.time() - start
+    assert 0 == len(buf_tx)
+
+    print(f"{name}: admission {N / admission:,.0f} tx/s, tampon {memory / 1e6:.1f} Mo, "
+          f"retrait d'un bloc de {K} transactions {removal * 1000:.1f} ms")
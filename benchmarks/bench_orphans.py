@@ -0,0 +1,64 @@
+from mini_btc import FullNode
+from mini_btc.utils import sha256
+from tests.utils import mine
+import random, time
+
+
+# Nombre de noeuds du réseau
+N = 6
+# Nombre de blocs diffusés
+B = 30
+
+
+class Counter(FullNode):
+    """
+    Noeud comptant les blocs reçus par LIST_BLOCKS.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, **kwargs)
+        self.received = 0
+
+    def _private_callback(self, host: str, port: int, body: object):
+        if "LIST_BLOCKS" == body["request"]:
+            self.received += len(body["blocks"])
+        super()._private_callback(host, port, body)
+
+
+def run(name: str, base: int, **kwargs):
+    random.seed(0)
+    nodes = [Counter("localhost", base, **kwargs)]
+    for i in range(1, N):
+        nodes.append(Counter("localhost", base + i, "localhost", base, **kwargs))
+    for node in nodes:
+        node.start()
+        time.sleep(0.2)
+    time.sleep(1)
+
+    # Les blocs sont diffusés par paires inversées: chaque bloc impair
+    # arrive avant son parent
+    source = nodes[0]
+    blocks = [mine(source, add=True) for _ in range(B)]
+    order = []
+    for i in range(0, B, 2):
+        order += blocks[i:i+2][::-1]
+
+    start = time.time()
+    for block in order:
+        req = {"request": "SUBMIT_BLOCK", "host": source.host, "port": source.port, "block": block}
+        source.broadcast(req, id=sha256(block))
+        time.sleep(0.01)
+    while any(node.block_hashes != source.block_hashes for node in nodes):
+        time.sleep(0.01)
+    elapsed = time.time() - start
+
+    received = sum(node.received for node in nodes)
+    print(f"{name}: {B} blocs sur {N} noeuds en {elapsed * 1000:.0f} ms, "
+          f"{received} blocs reçus par LIST_BLOCKS")
+
+    for node in nodes:
+        node.shutdown()
+
+
+# Avant: un bloc orphelin déclenche immédiatement une synchronisation
+run("sans orphelins", 9100, max_orphans=0, sync_timeout=0)
+run("avec orphelins", 9200)
@@ -0,0 +1,72 @@
+from mini_btc import Node
+from mini_btc.utils import send
+import threading, time
+
+
+# Nombre de paquets privés envoyés par mesure
+N = 2000
+
+
+class Receiver(Node):
+    """
+    Noeud comptant les paquets privés reçus.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count = 0
+        self.lock_count = threading.Lock()
+
+    def _private_callback(self, host: str, port: int, body: object):
+        with self.lock_count:
+            self.count += 1
+
+
+def wait(receiver: Receiver, n: int):
+    while receiver.count < n:
+        time.sleep(0.001)
+
+
+receiver = Receiver("localhost", 8100, verbose=0)
+sender = Node("localhost", 8101, verbose=0)
+receiver.start()
+sender.start()
+
+body = {"request": "TRANSACT", "tx": {'locktime': 1676235668.405151, 'input': [], 'output': [], 'hash': '4b22550a32452d9b6d7e7f82d2a2015c0083b289e1fadb538c9f868b0e6d9b4e'}}
+pck = {"header": "PRIVATE", "host": "localhost", "port": 8101, "body": body}
+
+# Avant: une prise temporaire par paquet
+start = time.time()
+for _ in range(N):
+    send("localhost", 8100, pck)
+wait(receiver, N)
+elapsed = time.time() - start
+print(f"Prise temporaire: {N / elapsed:.0f} paquets/s")
+
+# Après: connexion persistante
+receiver.count = 0
+start = time.time()
+for _ in range(N):
+    sender.send("localhost", 8100, body)
+wait(receiver, N)
+elapsed = time.time() - start
+print(f"Connexion persistante (threading): {N / elapsed:.0f} paquets/s")
+
+sender.shutdown()
+receiver.shutdown()
+
+# Moteur asyncio: une boucle d'événements et un nombre borné de threads
+receiver = Receiver("localhost", 8102, verbose=0, engine="asyncio")
+sender = Node("localhost", 8103, verbose=0, engine="asyncio")
+receiver.start()
+sender.start()
+
+start = time.time()
+for _ in range(N):
+    sender.send("localhost", 8102, body)
+wait(receiver, N)
+elapsed = time.time() - start
+print(f"Connexion persistante (asyncio): {N / elapsed:.0f} paquets/s, "
+      f"{threading.active_count()} threads actifs")
+
+sender.shutdown()
+receiver.shutdown()
@@ -0,0 +1,60 @@
+from mini_btc import FullNode, Transaction, MerkleTree
+from mini_btc.utils import json_encode, json_decode
+import random, time, tracemalloc
+
+
+# Nombre de blocs du registre et de sorties dépensées par bloc
+L = 5000
+W = 20
+
+
+def mine(node: FullNode) -> dict:
+    """
+    Bloc dont la transaction dépense toutes les sorties du bloc précédent,
+    l'ensemble des UTXO reste donc de taille constante. Les sorties sont
+    déverrouillées sans signature pour ne mesurer que le registre.
+    """
+    reward_tx = Transaction()
+    reward_tx.locktime += random.random()
+    reward_tx.add_output("miner", 50, "true")
+    block_tx = [reward_tx.to_dict()]
+    if len(node.ledger) > 0:
+        spend_tx = Transaction()
+        value = 0
+        for tx in node.ledger[-1]["tx"]:
+            for index, utxo in enumerate(tx["output"]):
+                spend_tx.add_input(prevTxHash=tx["hash"], index=index, unlock="")
+                value += utxo["value"]
+        for i in range(W):
+            spend_tx.add_output(f"address{i}", value // W + (value % W if i == 0 else 0), "true")
+        block_tx = [spend_tx.to_dict()] + block_tx
+    block = {"index": len(node.ledger),
+        "hash": node.block_hashes[-1] if len(node.ledger) > 0 else None,
+        "root": MerkleTree([tx["hash"] for tx in block_tx]).get_root(),
+        "nonce": random.randint(0, 1_000_000_000), "tx": block_tx}
+    while not node._check_block(block, check_tx=False):
+        block["nonce"] += 1
+    assert node._add_block(block)
+    return block
+
+
+miner = FullNode("localhost", 9500, difficulty=1, verbose=0)
+data = [json_encode(mine(miner)) for _ in range(L)]
+miner.shutdown()
+
+port = 9501
+for name, kwargs in [("sans élagage", {}), ("prune_depth=100", {"prune_depth": 100}),
+    ("prune_bytes=500 Ko", {"prune_bytes": 500_000})]:
+    tracemalloc.start()
+    node = FullNode("localhost", port, difficulty=1, verbose=0, **kwargs)
+    start = time.time()
+    # Les blocs sont décodés comme s'ils étaient reçus du réseau
+    for block in data:
+        assert node._add_block(json_decode(block))
+    elapsed = time.time() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {memory / 1e6:.1f} Mo, {len(node.utxo)} UTXO, "
+          f"{node.history_height()} blocs élagués, ajout en {elapsed:.2f} s")
+    node.shutdown()
+    port += 1
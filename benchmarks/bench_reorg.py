@@ -0,0 +1,58 @@
+from mini_btc import FullNode
+from tests.utils import mine
+import time
+
+
+def replay(node: FullNode, height: int, branch: list):
+    """
+    Avant: les index et les UTXO sont recalculés depuis genesis
+    puis la branche est ajoutée.
+    """
+    ledger = node.ledger[:height]
+    node.ledger = []
+    node.tx_index = dict()
+    node.block_hashes = []
+    node.block_heights = dict()
+    node.utxo.clear()
+    for index, block in enumerate(ledger):
+        node.ledger.append(block)
+        node._apply_block(index, block)
+    for block in branch:
+        assert node._add_block(block)
+
+
+port = 9000
+for L in [1000, 10000]:
+    n1 = FullNode("localhost", port, difficulty=1, verbose=0)
+    n2 = FullNode("localhost", port + 1, difficulty=1, verbose=0)
+    chain = [mine(n1)]
+    for _ in range(L - 1):
+        chain.append(mine(n1, prev=chain[-1]))
+    for block in chain:
+        assert n1._add_block(block) and n2._add_block(block)
+
+    for depth in [1, 5]:
+        # Branche plus lourde de depth + 1 blocs à partir de la hauteur L - depth
+        branch = [mine(n1, prev=n1.ledger[L - depth - 1])]
+        for _ in range(depth):
+            branch.append(mine(n1, prev=branch[-1]))
+
+        start = time.time()
+        replay(n2, L - depth, branch)
+        before = time.time() - start
+
+        start = time.time()
+        for block in branch:
+            assert n1._add_block(block)
+        after = time.time() - start
+        assert n1.block_hashes == n2.block_hashes
+
+        print(f"{L} blocs, bascule de profondeur {depth}: "
+              f"rejeu {before * 1000:.1f} ms, arbre {after * 1000:.2f} ms")
+
+        # Retour à la chaîne initiale de longueur L
+        for node in [n1, n2]:
+            replay(node, 0, chain)
+
+    n1.shutdown(); n2.shutdown()
+    port += 2
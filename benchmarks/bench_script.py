@@ -0,0 +1,37 @@
+from mini_btc import Transaction
+from mini_btc.script import execute, compile_script
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign, _dsa_verifier
+import time
+
+
+# Nombre d'entrées vérifiées
+N = 300
+
+privkey = dsa_import("./wallets/alice.bin")
+pubkey, address = dsa_pubkey(privkey)
+
+# Récompenses versées à la même clé publique comme celles d'un mineur
+inputs = []
+for i in range(N):
+    tx = Transaction()
+    tx.locktime += i
+    tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+    data = tx.to_dict()
+    data.pop("hash")
+    inputs.append((dsa_sign(privkey, data), tx.output[0]["lock"], tx))
+
+
+def run(cold: bool) -> float:
+    start = time.time()
+    for unlock, lock, tx in inputs:
+        if cold:
+            _dsa_verifier.cache_clear()
+            compile_script.cache_clear()
+        assert "true" == execute(unlock, lock, tx)
+    return N / (time.time() - start)
+
+
+# Avant: la clé est décodée et importée et le script découpé à chaque entrée
+print(f"Sans cache: {run(cold=True):.0f} entrées/s")
+# Après: clé importée et script compilé une seule fois
+print(f"Avec cache: {run(cold=False):.0f} entrées/s")
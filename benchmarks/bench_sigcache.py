@@ -0,0 +1,31 @@
+from mini_btc import FullNode, Transaction
+from tests.utils import mine, spend
+import time
+
+
+# Nombre de transactions du bloc
+N = 200
+
+port = 9700
+nodes = {name: FullNode("localhost", port + i, difficulty=1, verbose=0, sig_cache_size=size)
+    for i, (name, size) in enumerate([("sans cache", 0), ("avec cache", 100_000)])}
+for _ in range(N):
+    block = mine(nodes["sans cache"])
+    for node in nodes.values():
+        assert node._add_block(block)
+
+txs = [Transaction(spend(block["tx"][0])) for block in nodes["sans cache"].ledger]
+block = mine(nodes["sans cache"], [tx.to_dict() for tx in txs])
+
+for name, node in nodes.items():
+    # Les transactions sont d'abord vérifiées dans le tampon
+    start = time.time()
+    assert all(node.check_txs(txs))
+    admission = time.time() - start
+    start = time.time()
+    assert node._add_block(block)
+    elapsed = time.time() - start
+    stats = node.sig_cache.stats()
+    print(f"{name}: tampon {admission:.2f} s, bloc de {N} transactions {elapsed:.2f} s, "
+          f"taux de succès {stats['hit_rate']:.0%}")
+    node.shutdown()
@@ -0,0 +1,42 @@
+from mini_btc import FullNode, Transaction
+from mini_btc.utils import dsa_sign, dsa_verify
+from tests.utils import mine, privkey, pubkey, address
+import time
+
+
+# Nombre de sorties de la transaction parente toutes dépensées par une transaction
+N = 300
+
+node = FullNode("localhost", 9800, difficulty=1, verbose=0, sig_cache_size=0)
+
+# Transaction parente de N sorties
+reward = Transaction(mine(node, add=True)["tx"][0])
+parent = Transaction()
+parent.add_input(reward.txid, 0, dsa_sign(privkey, reward.sighash))
+for i in range(N):
+    parent.add_output(f"{address}{i}", 50 if i == 0 else 0, f"{pubkey} CHECKSIG")
+parent = Transaction(mine(node, [parent.to_dict()], add=True)["tx"][0])
+
+# Transaction de N entrées qui dépensent toutes la transaction parente
+spend_tx = Transaction()
+sign = dsa_sign(privkey, parent.sighash)
+for i in range(N):
+    spend_tx.add_input(parent.txid, i, sign)
+spend_tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+
+# Avant: la transaction parente est resérialisée et hachée pour chaque entrée
+start = time.time()
+for _ in range(N):
+    data = parent.to_dict()
+    data.pop("hash")
+    assert dsa_verify(pubkey, sign, data)
+before = time.time() - start
+
+# Après: le message signé est calculé une seule fois
+start = time.time()
+assert node.check_tx(spend_tx)
+after = time.time() - start
+
+print(f"Transaction de {N} entrées sur un parent de {len(parent.raw_format()) / 1e3:.0f} Ko: "
+      f"{before:.2f} s avant, {after:.2f} s après")
+node.shutdown()
@@ -0,0 +1,51 @@
+from mini_btc import FullNode
+from tests.utils import mine
+import time
+
+
+# Nombre de blocs du registre
+L = 20_000
+
+
+n1 = FullNode("localhost", 9400, difficulty=1, verbose=0, sync_chunk=5000)
+for _ in range(L):
+    mine(n1, add=True)
+n1.start()
+
+# Avant: le nouveau noeud télécharge et valide tout le registre
+n2 = FullNode("localhost", 9401, difficulty=1, verbose=0)
+n2.start()
+time.sleep(1)
+start = time.time()
+n2._sync("localhost", 9400)
+while len(n2.block_hashes) < L:
+    time.sleep(0.01)
+print(f"Synchronisation complète de {L} blocs: {time.time() - start:.2f} s")
+n2.shutdown()
+
+# Après: le nouveau noeud charge un instantané puis ne synchronise que 10 blocs
+snapshot = n1.export_snapshot()
+for _ in range(10):
+    mine(n1, add=True)
+n3 = FullNode("localhost", 9402, difficulty=1, verbose=0)
+n3.start()
+time.sleep(1)
+start = time.time()
+assert n3.import_snapshot(snapshot, snapshot["commitment"])
+n3._sync("localhost", 9400)
+while len(n3.block_hashes) < L + 10:
+    time.sleep(0.01)
+elapsed = time.time() - start
+assert n1.utxo.entries == n3.utxo.entries
+print(f"Amorçage par instantané de {len(snapshot['tx'])} UTXO: {elapsed:.2f} s")
+
+# Validation en tâche de fond de l'historique antérieur
+start = time.time()
+n3.validate_snapshot("localhost", 9400)
+while n3.snapshot_validated is None:
+    time.sleep(0.01)
+assert n3.snapshot_validated
+print(f"Validation de l'historique en tâche de fond: {time.time() - start:.2f} s")
+
+n1.shutdown()
+n3.shutdown()
@@ -0,0 +1,49 @@
+from mini_btc import FullNode
+from tests.utils import mine
+import time
+
+
+class Syncer(FullNode):
+    """
+    Noeud comptant les blocs reçus par LIST_BLOCKS.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, **kwargs)
+        self.received = 0
+
+    def _private_callback(self, host: str, port: int, body: object):
+        if "LIST_BLOCKS" == body["request"]:
+            self.received += len(body["blocks"])
+        super()._private_callback(host, port, body)
+
+
+port = 8900
+for L in [1000, 5000]:
+    n1 = Syncer("localhost", port)
+    n2 = Syncer("localhost", port + 1, "localhost", port)
+    n1.start(); n2.start()
+    for _ in range(L):
+        mine(n1, add=True)
+
+    for mode in ["start", "locator"]:
+        # Le second noeud a 2 blocs de retard
+        n2._truncate(0)
+        for block in n1.ledger[:-2]:
+            assert n2._add_block(block)
+        n2.received = 0
+
+        start = time.time()
+        if mode == "start":
+            # Avant: tout le registre est renvoyé et revalidé depuis genesis
+            n2.send("localhost", port, {"request": "GET_BLOCKS", "start": 0})
+        else:
+            n2._sync("localhost", port)
+        while n2.block_hashes != n1.block_hashes:
+            time.sleep(0.001)
+        elapsed = time.time() - start
+
+        print(f"{L} blocs, 2 de retard, {mode}: {n2.received} blocs reçus "
+              f"en {elapsed * 1000:.0f} ms")
+
+    n1.shutdown(); n2.shutdown()
+    port += 2
@@ -0,0 +1,99 @@
+from mini_btc import FullNode, Transaction
+from mini_btc.utils import sha256
+from tests.utils import mine, spend
+import sys, time
+
+
+# Module de la classe FullNode dont on remplace la classe Transaction
+fullnode = sys.modules["mini_btc.FullNode"]
+
+# Nombre de transactions du bloc validé
+N = 200
+# Nombre de répétitions des mesures
+R = 5
+
+
+class LegacyTransaction:
+    """
+    Transaction avant la mise en cache du hash: chaque appel à to_dict,
+    __hash__ ou __eq__ sérialise et hache à nouveau la transaction.
+    """
+    def __init__(self, tx: dict, txid: str = None):
+        self.input = tx["input"]
+        self.output = tx["output"]
+        self.locktime = tx["locktime"]
+
+    def __eq__(self, other: 'LegacyTransaction') -> bool:
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return int.from_bytes(self.to_dict()["hash"].encode("utf-8"), "big")
+
+    def to_dict(self) -> dict:
+        tx = {"locktime": self.locktime, "input": self.input, "output": self.output}
+        tx["hash"] = sha256(tx)
+        return tx
+
+    @property
+    def txid(self) -> str:
+        return self.to_dict()["hash"]
+
+    @property
+    def sighash(self) -> dict:
+        tx = self.to_dict()
+        tx.pop("hash")
+        return tx
+
+
+# Registre de N blocs contenant chacun une récompense pour Alice
+node = FullNode("localhost", 8800, difficulty=1, verbose=0, sig_cache_size=0)
+rewards = [mine(node, add=True)["tx"][-1] for _ in range(N)]
+
+# Bloc dépensant chaque récompense au profit de Bob
+block_tx = [spend(reward_tx, dest="bob") for reward_tx in rewards]
+block = mine(node, block_tx)
+
+
+def measure(cls: type, verify: bool):
+    fullnode.Transaction = cls
+    # Sans vérification des signatures on ne mesure que le coût des transactions
+    # L'exécution du script demande toujours le dictionnaire de la transaction
+    fullnode.execute = execute if verify else lambda args, script, tx, checks=None: tx.to_dict() and "true"
+    txs = [cls(tx) for tx in block_tx]
+
+    # Vérification des transactions du bloc
+    start = time.time()
+    for _ in range(R):
+        for reward_tx in rewards:
+            node.utxo.add_tx(reward_tx)
+        assert all(node.check_tx(tx) for tx in txs)
+    check = (time.time() - start) / R
+
+    # Tampon des transactions candidates (opérations d'ensemble)
+    start = time.time()
+    for _ in range(R):
+        buf_tx = set(txs)
+        assert all(tx in buf_tx for tx in txs)
+        buf_tx.difference_update({cls(tx) for tx in block_tx})
+    buffer = (time.time() - start) / R
+
+    # Ajout du bloc au registre
+    elapsed = 0
+    for _ in range(R):
+        for reward_tx in rewards:
+            node.utxo.add_tx(reward_tx)
+        node.buf_tx = set(txs)
+        start = time.time()
+        assert node._add_block(block)
+        elapsed += time.time() - start
+        node._truncate(N)
+    add = elapsed / R
+
+    print(f"{cls.__name__}{'' if verify else ' sans signatures'}: check_tx {check / N * 1000:.3f} ms/tx, "
+          f"tampon {buffer * 1000:.1f} ms, _add_block {add * 1000:.1f} ms")
+
+
+execute = fullnode.execute
+for verify in [False, True]:
+    measure(LegacyTransaction, verify)
+    measure(Transaction, verify)
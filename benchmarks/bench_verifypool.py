@@ -0,0 +1,43 @@
+from mini_btc import FullNode, Transaction
+from mini_btc.utils import dsa_sign
+from tests.utils import mine, spend, privkey, pubkey, address
+import os, time
+
+
+# Les processus de vérification importent ce script
+if __name__ == "__main__":
+    # Nombre d'entrées du bloc vérifié
+    N = 1000
+
+    port = 9600
+    workers = sorted({1, 2, os.cpu_count()})
+    nodes = [FullNode("localhost", port + i, difficulty=1, verbose=0, verify_workers=w)
+        for i, w in enumerate(workers)]
+
+    # N récompenses dépensées par un bloc de N entrées
+    for _ in range(N):
+        block = mine(nodes[0])
+        for node in nodes:
+            assert node._add_block(block)
+    spend_tx = Transaction()
+    for block in nodes[0].ledger:
+        data = block["tx"][0].copy()
+        data.pop("hash")
+        spend_tx.add_input(prevTxHash=block["tx"][0]["hash"], index=0, unlock=dsa_sign(privkey, data))
+    spend_tx.add_output(address, 50 * N, f"{pubkey} CHECKSIG")
+    spend_block = mine(nodes[0], [spend_tx.to_dict()])
+
+    # Groupe de N transactions d'une entrée
+    group = [Transaction(spend(block["tx"][0])) for block in nodes[0].ledger]
+
+    print(f"{os.cpu_count()} coeurs disponibles")
+    for w, node in zip(workers, nodes):
+        start = time.time()
+        assert node._check_block(spend_block)
+        elapsed_block = time.time() - start
+        start = time.time()
+        assert all(node.check_txs(group))
+        elapsed_group = time.time() - start
+        print(f"verify_workers={w}: bloc de {N} entrées {elapsed_block:.2f} s, "
+              f"groupe de {N} transactions {elapsed_group:.2f} s")
+        node.shutdown()
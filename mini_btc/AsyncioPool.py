@@ -0,0 +1,333 @@
+import asyncio, socket, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import zlib
+from mini_btc.utils import encode_frame, decode_frame_header, decode_frame_payload, \
+    negotiate_codec, FrameCompressor, CODECS, CODEC_NAMES, FRAME_HEADER, FRAME_JSON
+from typing import Callable, List
+
+
+class AsyncioConnection:
+    """
+    Connexion persistante et bidirectionnelle gérée par une boucle asyncio.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        :param reader: Flux de lecture de la connexion.
+        :param writer: Flux d'écriture de la connexion.
+        """
+        self.reader = reader
+        self.writer = writer
+        # Adresse d'écoute du noeud distant si elle est connue
+        self.peer = None
+        self.last_used = time.time()
+        self.closed = False
+
+        # Codec des paquets envoyés, JSON tant que la négociation n'a pas eu lieu
+        self.codec = CODECS[FRAME_JSON]
+        # Compression des paquets envoyés si négociée
+        self.compressor = None
+        self.decompressor = zlib.decompressobj()
+        self.hello_sent = False
+
+    async def send(self, pck: object):
+        """
+        Envoi d'un paquet sur la connexion.
+
+        :param pck: Objet Python sérialisable en JSON.
+        """
+        # L'encodage et l'écriture ont lieu sans interruption dans la boucle
+        # ce qui garantit l'ordre des trames compressées en flux
+        self.writer.write(encode_frame(pck, self.codec, self.compressor))
+        await self.writer.drain()
+        self.last_used = time.time()
+
+    def close(self):
+        """
+        Fermeture de la connexion. Peut être appelée plusieurs fois.
+        """
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+class AsyncioPool:
+    """
+    Variante de ConnectionPool où l'acceptation, la lecture et l'écriture des
+    connexions sont exécutées par une seule boucle asyncio.
+
+    Les paquets reçus sont traités par un nombre borné de threads ce qui permet
+    de gérer de nombreuses connexions sans créer un thread par paquet.
+    Les paquets postés sont placés dans une file par noeud distant vidée par
+    une tâche asyncio propre à ce noeud.
+    """
+    def __init__(self, host: str, port: int, on_packet: Callable,
+        idle_timeout: float = 60.0, codecs: List[str] = list(CODEC_NAMES),
+        compression: List[str] = ["zlib"], workers: int = 8,
+        on_failure: Callable = None, timeout: float = 5.0, queue_size: int = 1000):
+        """
+        :param host: Adresse d'écoute du noeud propriétaire.
+        :param port: Port associé à cette adresse.
+        :param on_packet: Fonction appelée sur chaque paquet reçu.
+        Elle est exécutée par un thread de l'exécuteur.
+        :param idle_timeout: Durée en secondes au-delà de laquelle une connexion
+        inutilisée est fermée.
+        :param codecs: Noms des codecs acceptés.
+        :param compression: Noms des compressions acceptées.
+        :param workers: Nombre de threads traitant les paquets reçus.
+        :param on_failure: Fonction appelée avec (host, port) lorsqu'un paquet
+        posté n'a pas pu être envoyé à un noeud.
+        :param timeout: Délai maximum en secondes de connexion et d'envoi par noeud.
+        :param queue_size: Nombre maximum de paquets en attente par noeud.
+        Les plus anciens sont abandonnés au-delà.
+        """
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.codecs = codecs
+        self.compression = compression
+        self.timeout = timeout
+        self._on_packet = on_packet
+        self._on_failure = on_failure
+
+        # Files des paquets à envoyer par noeud distant
+        # Uniquement manipulées depuis la boucle asyncio
+        self.queues = dict()
+        self.queue_size = queue_size
+
+        # Connexions actives par adresse d'écoute du noeud distant
+        # Uniquement manipulées depuis la boucle asyncio
+        self.connections = dict()
+        # Toutes les connexions ouvertes, entrantes comprises, fermées à l'arrêt
+        self.opened = set()
+        # Verrous de création de connexion par noeud distant
+        self.locks = dict()
+
+        # Exécuteur des traitements coûteux (signatures, validation des blocs)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    async def __read(self, conn: AsyncioConnection):
+        """
+        Boucle de lecture des trames reçues jusqu'à la fermeture de la connexion.
+
+        HELLO: Identification du noeud distant, négociation du codec
+        et de la compression.
+        """
+        try:
+            while True:
+                header = await conn.reader.readexactly(FRAME_HEADER.size)
+                type, length, checksum = decode_frame_header(header)
+                payload = await conn.reader.readexactly(length)
+                pck = decode_frame_payload(type, payload, checksum, conn.decompressor)
+                conn.last_used = time.time()
+
+                if "HELLO" == pck["header"]:
+                    conn.peer = (pck["host"], pck["port"])
+                    conn.codec = negotiate_codec(self.codecs, pck.get("codecs", []))
+                    if "zlib" in self.compression and "zlib" in pck.get("compression", []):
+                        if conn.compressor is None:
+                            conn.compressor = FrameCompressor()
+                    self.connections.setdefault(conn.peer, conn)
+                    # Réponse à une connexion entrante
+                    if not conn.hello_sent:
+                        await self.__hello(conn)
+                else:
+                    self.loop.run_in_executor(self.executor, self._on_packet, pck)
+
+        # Connexion fermée ou trame invalide
+        except (asyncio.IncompleteReadError, OSError, ValueError):
+            pass
+
+        finally:
+            self.__close(conn)
+
+    async def __hello(self, conn: AsyncioConnection):
+        """
+        Envoi du paquet HELLO sur une connexion.
+        """
+        conn.hello_sent = True
+        await conn.send({"header": "HELLO", "host": self.host, "port": self.port,
+            "codecs": self.codecs, "compression": self.compression})
+
+    def __close(self, conn: AsyncioConnection):
+        """
+        Fermeture d'une connexion et retrait de l'ensemble des connexions.
+        """
+        conn.close()
+        self.opened.discard(conn)
+        if conn.peer is not None and self.connections.get(conn.peer) is conn:
+            del self.connections[conn.peer]
+
+    async def __accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Prise en charge d'une connexion entrante.
+        """
+        conn = AsyncioConnection(reader, writer)
+        self.opened.add(conn)
+        try:
+            await self.__read(conn)
+        # Arrêt du pool, asyncio journalise l'annulation des tâches du serveur
+        except asyncio.CancelledError:
+            pass
+
+    async def __serve(self, sock: socket.socket):
+        """
+        Création du serveur asyncio à partir du socket d'écoute.
+        """
+        self.server = await asyncio.start_server(self.__accept, sock=sock)
+
+    async def __get(self, host: str, port: int) -> AsyncioConnection:
+        """
+        Donne la connexion vers un noeud en la créant si nécessaire.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :return: Connexion ouverte.
+        """
+        self.__evict_idle()
+
+        peer = (host, port)
+        lock = self.locks.setdefault(peer, asyncio.Lock())
+        async with lock:
+            conn = self.connections.get(peer)
+            if conn is not None and not conn.closed:
+                return conn
+
+            # ConnectionRefusedError possible si le noeud est inactif
+            reader, writer = await asyncio.open_connection(host, port)
+            conn = AsyncioConnection(reader, writer)
+            conn.peer = peer
+            self.connections[peer] = conn
+            self.opened.add(conn)
+            await self.__hello(conn)
+            self.loop.create_task(self.__read(conn))
+            return conn
+
+    async def __send(self, host: str, port: int, pck: object):
+        """
+        Écriture d'un paquet sur la connexion vers un noeud.
+        """
+        conn = await self.__get(host, port)
+        try:
+            await conn.send(pck)
+        # La connexion a été rompue
+        except OSError:
+            self.__close(conn)
+            conn = await self.__get(host, port)
+            await conn.send(pck)
+
+    def __enqueue(self, peer: tuple, pck: object):
+        """
+        Ajout d'un paquet à la file d'un noeud depuis la boucle asyncio.
+        Une tâche d'envoi est créée si la file n'existait pas.
+        """
+        if peer not in self.queues:
+            self.queues[peer] = deque(maxlen=self.queue_size)
+            self.loop.create_task(self.__drain(peer))
+        self.queues[peer].append(pck)
+
+    async def __drain(self, peer: tuple):
+        """
+        Envoi des paquets de la file d'un noeud jusqu'à ce qu'elle soit vide.
+        """
+        queue = self.queues[peer]
+        while len(queue) > 0:
+            pck = queue.popleft()
+            try:
+                await asyncio.wait_for(self.__send(*peer, pck), self.timeout)
+            # Le noeud est inactif ou trop lent
+            except (OSError, asyncio.TimeoutError):
+                queue.clear()
+                conn = self.connections.get(peer)
+                if conn is not None:
+                    self.__close(conn)
+                if self._on_failure is not None:
+                    self.loop.run_in_executor(self.executor, self._on_failure, *peer)
+            # Paquet invalide
+            except Exception:
+                pass
+        del self.queues[peer]
+
+    def __evict_idle(self):
+        """
+        Ferme les connexions inutilisées depuis plus de idle_timeout secondes.
+        """
+        now = time.time()
+        for conn in list(self.connections.values()):
+            if now - conn.last_used > self.idle_timeout:
+                self.__close(conn)
+
+    def serve(self, sock: socket.socket):
+        """
+        Démarre l'écoute des connexions entrantes sur la boucle asyncio.
+
+        :param sock: Socket d'écoute du noeud.
+        """
+        asyncio.run_coroutine_threadsafe(self.__serve(sock), self.loop).result()
+
+    def send(self, host: str, port: int, pck: object, ignore_errors=True):
+        """
+        Envoi d'un paquet à un noeud en réutilisant la connexion existante.
+        Si la connexion est rompue, on se reconnecte une fois.
+        Ne doit pas être appelée depuis la boucle asyncio.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :param pck: Objet Python sérialisable en JSON.
+        :param ignore_errors: Si True les erreurs sont ignorées.
+        """
+        try:
+            asyncio.run_coroutine_threadsafe(self.__send(host, port, pck), self.loop).result()
+
+        except Exception as error:
+            if ignore_errors:
+                return
+            else:
+                raise error
+
+    def post(self, host: str, port: int, pck: object):
+        """
+        Place un paquet dans la file d'envoi d'un noeud sans attendre son envoi.
+        Les paquets d'une même file sont envoyés dans l'ordre.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :param pck: Objet Python sérialisable en JSON.
+        """
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.__enqueue, (host, port), pck)
+
+    async def __shutdown(self):
+        """
+        Fermeture du serveur et des connexions depuis la boucle asyncio.
+        Les tâches de lecture et d'envoi en cours sont annulées et attendues
+        pour que la boucle puisse être fermée.
+        """
+        if self.server is not None:
+            self.server.close()
+        writers = [conn.writer for conn in self.opened]
+        for conn in list(self.opened):
+            self.__close(conn)
+
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*[writer.wait_closed() for writer in writers],
+            return_exceptions=True)
+
+    def close(self):
+        """
+        Arrête l'écoute des connexions entrantes, ferme toutes les connexions
+        puis la boucle asyncio.
+        """
+        asyncio.run_coroutine_threadsafe(self.__shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,251 @@
+import mmap, os, struct, threading
+from collections import OrderedDict
+from mini_btc.utils import sha256, json_encode, json_decode, CODECS, FRAME_BINARY
+from typing import Iterator, List, Union
+
+
+class BlockStore:
+    """
+    Registre de blocs persistant utilisable comme une liste de blocs.
+
+    Les blocs sont ajoutés à la fin d'un fichier segment avec leurs données
+    d'annulation, encodés par le codec binaire. Un fichier index contient
+    pour chaque hauteur la position du bloc dans le segment et son hash.
+    Les deux fichiers sont lus par mmap et seuls les blocs demandés sont décodés.
+
+    L'état dérivé du registre (UTXO, index des transactions) est sauvegardé
+    périodiquement dans un point de contrôle pour éviter de rejouer
+    tous les blocs au redémarrage.
+    """
+    # Position, taille et hash d'un bloc
+    RECORD = struct.Struct("!QI32s")
+
+    def __init__(self, path: str, cache_size: int = 1000):
+        """
+        Ouvre ou crée le registre dans un dossier.
+
+        :param path: Dossier des fichiers du registre.
+        :param cache_size: Nombre de blocs décodés conservés en mémoire.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.codec = CODECS[FRAME_BINARY]
+
+        self.segment = open(os.path.join(path, "blocks.dat"), "a+b")
+        self.index = open(os.path.join(path, "index.dat"), "a+b")
+        # Projections mémoire des fichiers, recréées lorsqu'ils grandissent
+        self.segment_map = None
+        self.index_map = None
+
+        # Après un arrêt brutal les enregistrements d'index incomplets ou qui
+        # désignent des données absentes du segment sont ignorés
+        size = os.path.getsize(self.segment.name)
+        self.count = os.path.getsize(self.index.name) // self.RECORD.size
+        self.end = 0
+        while self.count > 0:
+            self.index.seek((self.count - 1) * self.RECORD.size)
+            offset, length, _ = self.RECORD.unpack(self.index.read(self.RECORD.size))
+            if offset + length <= size:
+                self.end = offset + length
+                break
+            self.count -= 1
+        self.index.truncate(self.count * self.RECORD.size)
+        self.segment.truncate(self.end)
+
+        # Blocs décodés récemment par hauteur
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        # Verrou sur les fichiers et les projections
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def __map(file, size: int, current: Union[mmap.mmap, None]) -> Union[mmap.mmap, None]:
+        """
+        Donne une projection mémoire couvrant au moins size octets d'un fichier.
+        """
+        if current is not None and len(current) >= size:
+            return current
+        if current is not None:
+            current.close()
+        file.flush()
+        if size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __record(self, height: int) -> tuple:
+        """
+        Enregistrement d'index d'une hauteur.
+
+        :return: Position, taille et hash brut du bloc.
+        """
+        end = (height + 1) * self.RECORD.size
+        self.index_map = self.__map(self.index, end, self.index_map)
+        return self.RECORD.unpack_from(self.index_map, height * self.RECORD.size)
+
+    def __read(self, height: int) -> list:
+        """
+        Décode l'enregistrement du segment d'une hauteur.
+
+        :return: Couple (bloc, données d'annulation).
+        """
+        offset, length, _ = self.__record(height)
+        self.segment_map = self.__map(self.segment, offset + length, self.segment_map)
+        return self.codec.decode(memoryview(self.segment_map)[offset:offset+length])
+
+    def __cache(self, height: int, block: dict):
+        self.cache[height] = block
+        self.cache.move_to_end(height)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get(self, height: int) -> dict:
+        """
+        Donne le bloc d'une hauteur.
+
+        :param height: Hauteur du bloc indexée à partir de 0.
+        :return: Objet Python du bloc.
+        """
+        with self.lock:
+            if height < 0:
+                height += self.count
+            if not 0 <= height < self.count:
+                raise IndexError("Hauteur absente du registre")
+            if height in self.cache:
+                self.cache.move_to_end(height)
+                return self.cache[height]
+            block = self.__read(height)[0]
+            self.__cache(height, block)
+            return block
+
+    def undo(self, height: int) -> list:
+        """
+        Donne les données d'annulation d'un bloc.
+
+        :param height: Hauteur du bloc.
+        :return: Liste des UTXO consommées (txid, indice, sortie).
+        """
+        with self.lock:
+            return self.__read(height)[1]
+
+    def hashes(self) -> List[str]:
+        """
+        Donne les hashs de tous les blocs dans l'ordre du registre.
+
+        :return: Liste des hashs en hexadécimal.
+        """
+        with self.lock:
+            if self.count == 0:
+                return []
+            self.__record(self.count - 1)
+            return [hash.hex() for _, _, hash in self.RECORD.iter_unpack(
+                self.index_map[:self.count * self.RECORD.size])]
+
+    def append(self, block: dict, hash: str = None, undo: list = []):
+        """
+        Ajoute un bloc en fin de registre.
+
+        :param block: Objet Python du bloc.
+        :param hash: Hash du bloc s'il est déjà connu.
+        :param undo: Données d'annulation du bloc.
+        """
+        if hash is None:
+            hash = sha256(block)
+        data = self.codec.encode([block, undo])
+        with self.lock:
+            # Le bloc est sur disque avant l'enregistrement d'index qui le désigne
+            self.segment.write(data)
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.index.write(self.RECORD.pack(self.end, len(data), bytes.fromhex(hash)))
+            self.index.flush()
+            self.end += len(data)
+            self.__cache(self.count, block)
+            self.count += 1
+
+    def pop(self) -> dict:
+        """
+        Retire le dernier bloc du registre.
+
+        :return: Objet Python du bloc retiré.
+        """
+        with self.lock:
+            block = self.get(-1)
+            self.truncate(self.count - 1)
+            return block
+
+    def truncate(self, height: int):
+        """
+        Supprime les blocs à partir d'une hauteur.
+
+        :param height: Nombre de blocs conservés.
+        """
+        with self.lock:
+            if height >= self.count:
+                return
+            self.end = self.__record(height)[0]
+            # Les projections doivent être fermées avant de réduire les fichiers
+            for map in [self.segment_map, self.index_map]:
+                if map is not None: map.close()
+            self.segment_map = self.index_map = None
+            self.segment.truncate(self.end)
+            self.index.truncate(height * self.RECORD.size)
+            for h in range(height, self.count):
+                self.cache.pop(h, None)
+            self.count = height
+
+    def save_state(self, state: dict):
+        """
+        Sauvegarde atomique d'un point de contrôle.
+        Le décodeur JSON natif est plus rapide que le codec binaire
+        sur un objet de cette taille.
+
+        :param state: Objet Python à sauvegarder.
+        """
+        file = os.path.join(self.path, "state.dat")
+        with open(file + ".tmp", "wb") as f:
+            f.write(json_encode(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(file + ".tmp", file)
+
+    def load_state(self) -> Union[dict, None]:
+        """
+        Charge le dernier point de contrôle.
+
+        :return: Objet Python sauvegardé ou None s'il n'existe pas ou est illisible.
+        """
+        file = os.path.join(self.path, "state.dat")
+        if not os.path.exists(file):
+            return None
+        with open(file, "rb") as f:
+            try:
+                return json_decode(f.read())
+            # Point de contrôle illisible, les blocs seront rejoués
+            except ValueError:
+                return None
+
+    def close(self):
+        """
+        Ferme les fichiers du registre.
+        """
+        with self.lock:
+            for map in [self.segment_map, self.index_map]:
+                if map is not None: map.close()
+            self.segment_map = self.index_map = None
+            self.segment.close()
+            self.index.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[dict, List[dict]]:
+        if isinstance(key, slice):
+            return [self.get(height) for height in range(*key.indices(self.count))]
+        return self.get(key)
+
+    def __iter__(self) -> Iterator[dict]:
+        for height in range(self.count):
+            yield self.get(height)
+
+    def __eq__(self, other: object) -> bool:
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
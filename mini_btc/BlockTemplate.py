@@ -0,0 +1,131 @@
+import threading
+from mini_btc import Transaction
+from mini_btc.MerkleTree import IncrementalMerkleTree
+from mini_btc.utils import address_from_pubkey
+from typing import Union
+
+
+class BlockTemplate:
+    """
+    Modèle du prochain bloc à miner mis à jour au fil des transactions.
+
+    Les transactions candidates sont ajoutées ou retirées une à une et la racine
+    de Merkle est maintenue de façon incrémentale. La transaction récompense est
+    toujours la dernière du bloc: sa sortie est calculée une seule fois et
+    seule sa date change à chaque nouveau bloc précédent pour que son hash soit
+    unique. Chaque modification incrémente la version du modèle ce qui permet
+    au mineur de basculer sur le nouveau bloc sans tout reconstruire.
+    """
+    def __init__(self, pubkey: str, size: int):
+        """
+        :param pubkey: Clé publique pour la récompense de minage.
+        :param size: Nombre maximum de transactions candidates du bloc.
+        """
+        assert size >= 0
+        self.size = size
+        # Sortie de la récompense de minage de 50 BTC
+        self.reward_output = (address_from_pubkey(pubkey), 50, f"{pubkey} CHECKSIG")
+
+        # Transactions candidates dans l'ordre du bloc et leur position
+        self.txs = []
+        self.positions = dict()
+        # Arbre de Merkle des transactions puis de la récompense
+        self.tree = IncrementalMerkleTree()
+
+        # Bloc précédent auquel le bloc se chaîne
+        self.index = 0
+        self.parent = None
+        self.reward = self._new_reward()
+        self.tree.append(self.reward["hash"])
+
+        self.version = 0
+        # Verrou sur le modèle pour les mises à jour composées
+        self.lock = threading.RLock()
+
+    def _new_reward(self) -> dict:
+        """
+        Transaction récompense datée de maintenant.
+
+        :return: Dictionnaire de la transaction.
+        """
+        reward_tx = Transaction()
+        reward_tx.add_output(*self.reward_output)
+        return reward_tx.to_dict()
+
+    @property
+    def full(self) -> bool:
+        """
+        Indique si le bloc contient suffisamment de transactions candidates.
+        """
+        return len(self.txs) >= self.size
+
+    def __len__(self) -> int:
+        return len(self.txs)
+
+    def __contains__(self, tx: Union[Transaction, str]) -> bool:
+        return (tx if isinstance(tx, str) else tx.txid) in self.positions
+
+    def reset(self, index: int, parent: Union[str, None]):
+        """
+        Chaîne le bloc à un nouveau bloc précédent avec une nouvelle récompense.
+
+        :param index: Numéro du bloc.
+        :param parent: Hash du bloc précédent, None pour le premier bloc.
+        """
+        with self.lock:
+            self.index = index
+            self.parent = parent
+            self.reward = self._new_reward()
+            self.tree.set(len(self.txs), self.reward["hash"])
+            self.version += 1
+
+    def add(self, tx: Transaction) -> bool:
+        """
+        Ajoute une transaction juste avant la récompense.
+
+        :param tx: Transaction candidate déjà vérifiée.
+        :return: True si ajoutée False si le bloc est plein ou la contient déjà.
+        """
+        with self.lock:
+            if self.full or tx.txid in self.positions:
+                return False
+            self.positions[tx.txid] = len(self.txs)
+            self.txs.append(tx.to_dict())
+            self.tree.set(len(self.txs) - 1, tx.txid)
+            self.tree.append(self.reward["hash"])
+            self.version += 1
+            return True
+
+    def remove(self, tx: Union[Transaction, str]) -> bool:
+        """
+        Retire une transaction. La dernière transaction candidate prend sa place.
+
+        :param tx: Transaction ou hash de la transaction.
+        :return: True si retirée False si absente du bloc.
+        """
+        txid = tx if isinstance(tx, str) else tx.txid
+        with self.lock:
+            pos = self.positions.pop(txid, None)
+            if pos is None:
+                return False
+            last = self.txs.pop()
+            if pos < len(self.txs):
+                self.txs[pos] = last
+                self.positions[last["hash"]] = pos
+                self.tree.set(pos, last["hash"])
+            self.tree.set(len(self.txs), self.reward["hash"])
+            self.tree.pop()
+            self.version += 1
+            return True
+
+    def block(self, nonce: int = 0) -> dict:
+        """
+        Bloc à miner correspondant à la version courante du modèle.
+
+        :param nonce: Valeur initiale à incrémenter pour le minage.
+        :return: Objet Python du bloc.
+        """
+        with self.lock:
+            return {"index": self.index, "hash": self.parent,
+                "root": self.tree.get_root(), "nonce": nonce,
+                "tx": self.txs + [self.reward]}
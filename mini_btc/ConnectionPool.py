@@ -0,0 +1,351 @@
+import socket, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from mini_btc.utils import create_sock, encode_frame, negotiate_codec, FrameReader, \
+    FrameCompressor, CODECS, CODEC_NAMES, FRAME_JSON
+from typing import Callable, List
+
+
+class Connection:
+    """
+    Connexion TCP persistante et bidirectionnelle avec un noeud voisin.
+    Les paquets sont multiplexés sous forme de trames sur la même prise.
+    """
+    def __init__(self, sock: socket.socket, on_packet: Callable, on_close: Callable):
+        """
+        La lecture des trames démarre immédiatement dans un thread dédié.
+
+        :param sock: Prise connectée au noeud voisin.
+        :param on_packet: Fonction appelée avec (connexion, paquet) à chaque paquet reçu.
+        :param on_close: Fonction appelée avec la connexion lors de sa fermeture.
+        """
+        self.sock = sock
+        # Lecture des trames dans un tampon préalloué
+        self.reader = FrameReader(sock)
+        # Adresse d'écoute du noeud distant si elle est connue
+        self.peer = None
+        self.last_used = time.time()
+        self.closed = False
+
+        # Codec des paquets envoyés, JSON tant que la négociation n'a pas eu lieu
+        self.codec = CODECS[FRAME_JSON]
+        # Compression des paquets envoyés si négociée
+        self.compressor = None
+        self.hello_sent = False
+
+        # Verrou sur l'écriture des trames
+        self.lock_send = threading.Lock()
+
+        self._on_packet = on_packet
+        self._on_close = on_close
+
+        threading.Thread(target=self.__read, daemon=True).start()
+
+    def __read(self):
+        """
+        Boucle de lecture des trames reçues jusqu'à la fermeture de la prise.
+        """
+        while not self.closed:
+            try:
+                pck = self.reader.read()
+            # Prise fermée ou trame invalide
+            except (OSError, ValueError):
+                break
+
+            if pck is None:
+                break
+
+            self.last_used = time.time()
+            self._on_packet(self, pck)
+
+        self.close()
+
+    def send(self, pck: object):
+        """
+        Envoi d'un paquet sur la connexion.
+
+        :param pck: Objet Python sérialisable en JSON.
+        """
+        # La compression en flux impose d'envoyer les trames dans l'ordre d'encodage
+        with self.lock_send:
+            self.sock.sendall(encode_frame(pck, self.codec, self.compressor))
+        self.last_used = time.time()
+
+    def close(self):
+        """
+        Fermeture de la connexion. Peut être appelée plusieurs fois.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+        self._on_close(self)
+
+
+class ConnectionPool:
+    """
+    Ensemble des connexions persistantes d'un noeud indexées par l'adresse
+    d'écoute des noeuds distants.
+
+    Chaque connexion commence par un échange de paquets HELLO indiquant l'adresse
+    d'écoute, les codecs et les compressions connus de chaque extrémité.
+    Le noeud distant peut ainsi réutiliser la même connexion pour répondre et
+    les deux noeuds utilisent le codec commun préféré.
+
+    Les paquets postés sont placés dans une file par noeud distant. Les files
+    sont vidées en parallèle par un ensemble borné de threads d'envoi si bien
+    qu'un noeud lent ou inactif ne retarde pas les autres.
+    """
+    def __init__(self, host: str, port: int, on_packet: Callable,
+        idle_timeout: float = 60.0, codecs: List[str] = list(CODEC_NAMES),
+        compression: List[str] = ["zlib"], on_failure: Callable = None,
+        timeout: float = 5.0, senders: int = 16, queue_size: int = 1000):
+        """
+        :param host: Adresse d'écoute du noeud propriétaire.
+        :param port: Port associé à cette adresse.
+        :param on_packet: Fonction appelée sur chaque paquet reçu.
+        Elle est exécutée dans un thread séparé pour ne pas bloquer la lecture.
+        :param idle_timeout: Durée en secondes au-delà de laquelle une connexion
+        inutilisée est fermée.
+        :param codecs: Noms des codecs acceptés.
+        :param compression: Noms des compressions acceptées.
+        :param on_failure: Fonction appelée avec (host, port) lorsqu'un paquet
+        posté n'a pas pu être envoyé à un noeud.
+        :param timeout: Délai maximum en secondes de connexion et d'envoi par noeud.
+        :param senders: Nombre de threads d'envoi des paquets postés.
+        :param queue_size: Nombre maximum de paquets en attente par noeud.
+        Les plus anciens sont abandonnés au-delà.
+        """
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.codecs = codecs
+        self.compression = compression
+        self.timeout = timeout
+        self._on_packet = on_packet
+        self._on_failure = on_failure
+
+        # Files des paquets à envoyer par noeud distant
+        self.queues = dict()
+        # Noeuds distants dont la file est en cours d'envoi
+        self.draining = set()
+        self.queue_size = queue_size
+        # Verrou sur queues et draining
+        self.lock_queues = threading.Lock()
+        self.senders = ThreadPoolExecutor(max_workers=senders)
+
+        # Connexions actives par adresse d'écoute du noeud distant
+        self.connections = dict()
+        # Verrou sur connections
+        self.lock_connections = threading.Lock()
+
+        # Socket d'écoute des connexions entrantes
+        self.sock = None
+
+    def __packet(self, conn: Connection, pck: object):
+        """
+        Fonction appelée par une connexion lors de la réception d'un paquet.
+
+        HELLO: Identification du noeud distant, négociation du codec
+        et de la compression.
+        """
+        if "HELLO" == pck["header"]:
+            conn.peer = (pck["host"], pck["port"])
+            conn.codec = negotiate_codec(self.codecs, pck.get("codecs", []))
+            if "zlib" in self.compression and "zlib" in pck.get("compression", []):
+                with conn.lock_send:
+                    if conn.compressor is None:
+                        conn.compressor = FrameCompressor()
+            with self.lock_connections:
+                if conn.peer not in self.connections:
+                    self.connections[conn.peer] = conn
+
+            # Réponse à une connexion entrante
+            if not conn.hello_sent:
+                try:
+                    self.__hello(conn)
+                except OSError:
+                    conn.close()
+        else:
+            threading.Thread(target=self._on_packet, args=(pck,)).start()
+
+    def __hello(self, conn: Connection):
+        """
+        Envoi du paquet HELLO sur une connexion.
+        """
+        conn.hello_sent = True
+        conn.send({"header": "HELLO", "host": self.host, "port": self.port,
+            "codecs": self.codecs, "compression": self.compression})
+
+    def __close(self, conn: Connection):
+        """
+        Fonction appelée par une connexion lors de sa fermeture.
+        """
+        with self.lock_connections:
+            if conn.peer is not None and self.connections.get(conn.peer) is conn:
+                del self.connections[conn.peer]
+
+    def __wait(self):
+        """
+        Fonction appelée par un thread principal permettant l'écoute des
+        connexions entrantes en provenance des autres noeuds du réseau.
+        Chaque connexion entrante est conservée et lue dans un thread dédié.
+        """
+        while True:
+            try:
+                # Attente de clients
+                sock, ip_client = self.sock.accept()
+            # Le socket a été fermé
+            except OSError:
+                break
+
+            sock.settimeout(self.timeout)
+            Connection(sock, self.__packet, self.__close)
+
+    def serve(self, sock: socket.socket):
+        """
+        Démarre l'écoute des connexions entrantes.
+
+        :param sock: Socket d'écoute du noeud.
+        """
+        self.sock = sock
+        threading.Thread(target=self.__wait).start()
+
+    def get(self, host: str, port: int) -> Connection:
+        """
+        Donne la connexion vers un noeud en la créant si nécessaire.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :return: Connexion ouverte.
+        """
+        self.evict_idle()
+
+        peer = (host, port)
+        with self.lock_connections:
+            conn = self.connections.get(peer)
+        if conn is not None and not conn.closed:
+            return conn
+
+        # ConnectionRefusedError possible si le noeud est inactif
+        conn = Connection(create_sock(host, port, self.timeout), self.__packet, self.__close)
+        conn.peer = peer
+        self.__hello(conn)
+
+        with self.lock_connections:
+            other = self.connections.get(peer)
+            # Une autre connexion a pu être établie entre temps
+            if other is not None and not other.closed:
+                conn.peer = None
+            else:
+                self.connections[peer] = conn
+                other = None
+
+        if other is not None:
+            conn.close()
+            return other
+        return conn
+
+    def send(self, host: str, port: int, pck: object, ignore_errors=True):
+        """
+        Envoi d'un paquet à un noeud en réutilisant la connexion existante.
+        Si la connexion est rompue, on se reconnecte une fois.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :param pck: Objet Python sérialisable en JSON.
+        :param ignore_errors: Si True les erreurs sont ignorées.
+        """
+        try:
+            conn = self.get(host, port)
+            try:
+                conn.send(pck)
+            # La connexion a été rompue
+            except OSError:
+                conn.close()
+                self.get(host, port).send(pck)
+
+        except Exception as error:
+            if ignore_errors:
+                return
+            else:
+                raise error
+
+    def post(self, host: str, port: int, pck: object):
+        """
+        Place un paquet dans la file d'envoi d'un noeud sans attendre son envoi.
+        Les paquets d'une même file sont envoyés dans l'ordre.
+
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        :param pck: Objet Python sérialisable en JSON.
+        """
+        peer = (host, port)
+        with self.lock_queues:
+            if peer not in self.queues:
+                self.queues[peer] = deque(maxlen=self.queue_size)
+            self.queues[peer].append(pck)
+            if peer in self.draining:
+                return
+            self.draining.add(peer)
+
+        try:
+            self.senders.submit(self.__drain, peer)
+        # Le noeud est éteint
+        except RuntimeError:
+            pass
+
+    def __drain(self, peer: tuple):
+        """
+        Envoi des paquets de la file d'un noeud jusqu'à ce qu'elle soit vide.
+        Exécutée par un thread d'envoi.
+        """
+        while True:
+            with self.lock_queues:
+                queue = self.queues[peer]
+                if len(queue) == 0:
+                    del self.queues[peer]
+                    self.draining.discard(peer)
+                    return
+                pck = queue.popleft()
+
+            try:
+                self.send(*peer, pck, ignore_errors=False)
+            # Le noeud est inactif ou trop lent
+            except OSError:
+                with self.lock_queues:
+                    self.queues[peer].clear()
+                if self._on_failure is not None:
+                    self._on_failure(*peer)
+            # Paquet invalide
+            except Exception:
+                pass
+
+    def evict_idle(self):
+        """
+        Ferme les connexions inutilisées depuis plus de idle_timeout secondes.
+        """
+        now = time.time()
+        with self.lock_connections:
+            idle = [conn for conn in self.connections.values()
+                if now - conn.last_used > self.idle_timeout]
+        for conn in idle:
+            conn.close()
+
+    def close(self):
+        """
+        Arrête l'écoute des connexions entrantes et ferme toutes les connexions.
+        """
+        if self.sock is not None:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        self.senders.shutdown(wait=False)
+        with self.lock_connections:
+            connections = list(self.connections.values())
+        for conn in connections:
+            conn.close()
@@ -1,10 +1,33 @@
-import threading
+import threading, time, queue
+from collections import deque
 from mini_btc import Node
-from mini_btc.utils import sha256, send
+from mini_btc.utils import sha256, send, short_txid, block_locator, json_encode
 from mini_btc import Transaction
 from mini_btc import MerkleTree
+from mini_btc import UtxoSet
+from mini_btc import OrphanPool
+from mini_btc import BlockStore
+from mini_btc import VerifyPool
+from mini_btc import SigCache
+from mini_btc import Mempool
 from mini_btc.script import execute
-from typing import Union
+from typing import Callable, List, Union
+
+
+# Version du format des instantanés des UTXO
+SNAPSHOT_VERSION = 2
+
+
+def snapshot_commitment(height: int, hashes: List[str], utxo_commitment: str) -> str:
+    """
+    Engagement d'un instantané des UTXO qui couvre tous les hashs des blocs.
+
+    :param height: Hauteur de l'instantané.
+    :param hashes: Hashs des blocs jusqu'à cette hauteur.
+    :param utxo_commitment: Engagement des UTXO.
+    :return: Hash de l'engagement.
+    """
+    return sha256([SNAPSHOT_VERSION, height, sha256(hashes), utxo_commitment])
 
 
 class FullNode(Node):
@@ -14,7 +37,13 @@ class FullNode(Node):
     """
     def __init__(self, listen_host: str, listen_port: int,
         remote_host: str = None, remote_port: int = None, max_nodes: int = 10,
-        block_size: int = 3, difficulty: int = 5, verbose: int = 2):
+        block_size: int = 3, difficulty: int = 5, verbose: int = 2,
+        engine: str = "threading", sync_chunk: int = 500, max_orphans: int = 100,
+        orphan_timeout: float = 1.0, sync_timeout: float = 10.0, store: str = None,
+        checkpoint_interval: int = 1000, prune_depth: int = None, prune_bytes: int = None,
+        verify_workers: int = 1, sig_cache_size: int = 100_000,
+        mempool_size: int = 10_000, mempool_bytes: int = None,
+        admission_queue: int = 10_000, admission_batch: int = 64, fork_depth: int = 100):
         """
         Création d'un noeud appartenant à la BlockChain.
 
@@ -32,24 +61,126 @@ class FullNode(Node):
         au nombre de 0 attendus en début de hash. Plus ce nombre est élevé
         plus la difficulté est grande.
         :param verbose: Niveau de verbosité entre 0 et 2.
+        :param engine: Moteur réseau "threading" ou "asyncio".
+        :param sync_chunk: Nombre maximum de blocs envoyés par réponse LIST_BLOCKS.
+        :param max_orphans: Nombre maximum de blocs orphelins conservés.
+        :param orphan_timeout: Délai en secondes après lequel un bloc orphelin dont
+        le parent n'est toujours pas arrivé déclenche une synchronisation.
+        :param sync_timeout: Délai en secondes pendant lequel une demande GET_BLOCKS
+        sans réponse empêche d'en envoyer une autre au même noeud.
+        :param store: Dossier du registre persistant. Si None le registre
+        est conservé en mémoire uniquement.
+        :param checkpoint_interval: Nombre de blocs entre deux points de contrôle
+        des UTXO et de l'index des transactions du registre persistant.
+        :param prune_depth: Nombre de blocs récents dont les transactions sont
+        conservées. Si None les blocs ne sont pas élagués selon leur profondeur.
+        :param prune_bytes: Taille maximale en octets des listes de transactions
+        conservées. Si None les blocs ne sont pas élagués selon leur taille.
+        :param verify_workers: Nombre de processus vérifiant les signatures
+        des blocs et des groupes de transactions. Si 1 les signatures sont
+        vérifiées dans le thread appelant.
+        :param sig_cache_size: Nombre maximum de vérifications de signatures
+        réussies conservées pour ne pas les répéter.
+        :param mempool_size: Nombre maximum de transactions candidates conservées.
+        :param mempool_bytes: Taille maximale en octets des transactions candidates.
+        Si None seul leur nombre est borné.
+        :param admission_queue: Nombre maximum de transactions reçues en attente
+        d'admission. Au-delà les transactions reçues sont ignorées.
+        :param admission_batch: Nombre maximum de transactions admises ensemble
+        dont les signatures sont vérifiées en un seul lot.
+        :param fork_depth: Nombre de blocs récents au-delà duquel les blocs
+        des branches concurrentes sont oubliés.
         """
         # Création du noeud la couche pair à pair
         super().__init__(listen_host, listen_port, remote_host, remote_port,
-            max_nodes, verbose)
+            max_nodes, verbose, engine=engine)
 
         # Registre pour stocker la liste de blocs
         self.ledger = []
+        # Index des transactions du registre: hash -> (indice du bloc, position)
+        self.tx_index = dict()
+        # Hashs des blocs du registre et hauteur de chaque hash
+        self.block_hashes = []
+        self.block_heights = dict()
+        # Arbre des blocs des branches concurrentes par hash, travail cumulé
+        # depuis la genèse de chaque bloc de l'arbre. Les blocs du registre
+        # n'y figurent pas et leur travail se déduit de leur hauteur.
+        self.blocks = dict()
+        self.work = dict()
+        self.fork_depth = fork_depth
+        # Données d'annulation des blocs du registre: hash -> UTXO consommées
+        self.undo = dict()
+        # Blocs reçus avant leur parent
+        self.orphans = OrphanPool(max_orphans)
+        self.orphan_timeout = orphan_timeout
+        # Date de la demande GET_BLOCKS en cours par noeud
+        self.syncing = dict()
+        self.sync_timeout = sync_timeout
+        self.lock_syncing = threading.Lock()
         self.lock_ledger = threading.Lock()
         self.block_size = block_size
+        self.sync_chunk = sync_chunk
 
         # Tampon des transactions candidates (à inclure dans les prochains blocs)
-        self.buf_tx = set()
-        # Transactions non-dépensées par adresse
-        self.utxo = dict()
+        self.buf_tx = Mempool(mempool_size, mempool_bytes)
+        # Transactions reçues en attente d'admission par le thread d'admission
+        self.admission_queue = queue.Queue(admission_queue)
+        self.admission_batch = admission_batch
+        # Compteurs d'admission
+        self.admission = {"received": 0, "dropped": 0, "accepted": 0, "malformed": 0,
+            "duplicate": 0, "conflict": 0, "invalid": 0, "signature": 0}
+        self.admission_time = 0.0
+        self.lock_admission = threading.Lock()
+        # Sorties non-dépensées par point de sortie (txid, indice)
+        self.utxo = UtxoSet()
+
+        # Registre amorcé par un instantané: les blocs antérieurs à snapshot_height
+        # sont absents (None) et les transactions des UTXO sont dans snapshot_tx
+        self.snapshot_height = 0
+        self.snapshot_tx = dict()
+        self.snapshot = None
+        # Validation en tâche de fond des blocs antérieurs à l'instantané
+        self.history = None
+        self.snapshot_validated = None
+
+        # Élagage: les blocs antérieurs à pruned_height ne conservent que leur en-tête
+        # et les transactions ayant encore des UTXO sont dans pruned_tx
+        assert prune_depth is None or prune_depth > 0
+        assert store is None or (prune_depth is None and prune_bytes is None)
+        self.prune_depth = prune_depth
+        self.prune_bytes = prune_bytes
+        self.pruned_height = 0
+        self.pruned_tx = dict()
+        # Hauteur des transactions élaguées retirées de l'index des transactions
+        self.pruned_index = dict()
+        # Sorties consommées par les blocs complets, qui peuvent encore être annulés
+        self.revertible = set()
+        # Taille des listes de transactions conservées à partir de history_height
+        self.body_sizes = deque()
+        self.body_bytes = 0
+
+        # Vérification des signatures par lots
+        self.verifier = VerifyPool(verify_workers)
+        # Vérifications réussies partagées entre le tampon et les blocs
+        self.sig_cache = SigCache(sig_cache_size)
+
+        # Blocs compacts en attente des transactions manquantes par racine de Merkle
+        # avec les positions des transactions retrouvées dans le tampon
+        self.pending_blocks = dict()
+        self.max_pending_blocks = 16
+        self.lock_pending = threading.Lock()
 
         assert difficulty > 0
         self.difficulty = difficulty
 
+        # Registre persistant rechargé au démarrage
+        self.store = None
+        self.checkpoint_interval = checkpoint_interval
+        if store is not None:
+            self.store = BlockStore(store)
+            self.ledger = self.store
+            self._load_store()
+
     def _broadcast_callback(self, host: str, port: int, id: str, body: object):
         """
         Fonction appelée sur le corps d'un paquet diffusé sur le réseau.
@@ -60,36 +191,174 @@ class FullNode(Node):
         :param port: Port associée à cette adresse.
         :param id: Identifiant du paquet.
         :param body: Objet Python du corps du paquet.
+        :return: False si la diffusion du paquet est différée.
 
         TRANSACT: Traitement d'une transaction.
-        SUBMIT_BLOCK: Soumission d'un bloc résolu.
+        SUBMIT_BLOCK: Soumission d'un bloc résolu complet ou compact.
         """
         # Traitement d'une transaction
         if "TRANSACT" == body["request"]:
-            body.pop("request")
-            self.buf_tx.add(Transaction(body["tx"]))
-            self._transact_callback(host, port, body)
+            # La transaction n'est diffusée qu'une fois admise par le thread d'admission
+            try:
+                self.admission_queue.put_nowait((host, port, id, body))
+                self._count("received")
+            except queue.Full:
+                self._count("dropped")
+            return False
 
         # Soumission d'un bloc résolu
         elif "SUBMIT_BLOCK" == body["request"]:
-            block = body["block"]
+            # Les blocs connus, périmés ou incomplets ne sont pas relayés
+            # sauf le bloc que ce noeud soumet lui-même
+            if self._known(id): return (host, port) == (self.host, self.port)
+            if "compact" in body:
+                # Si pas de retard ne reconstruire que les blocs d'une branche connue
+                compact = body["compact"]
+                if compact["index"] < len(self.ledger) and not self._known(compact["hash"]):
+                    return False
+                block = self._rebuild_block(host, port, body["compact"])
+                # Transactions manquantes demandées à l'expéditeur
+                if block is None: return False
+            else:
+                block = body["block"]
 
-            # Le bloc est-il valide ?
-            if self._check_block(block, check_tx=False):
-                k = block["index"] # 0-based
-                n = len(self.ledger)
+            self._submit_block(host, port, block)
+
+    def _submit_block(self, host: str, port: int, block: object):
+        """
+        Traitement d'un bloc résolu soumis par un noeud.
 
-                # En retard de 1 bloc
-                if k == n:
-                    # Ajout du bloc au registre
-                    self._add_block(block)
+        :param host: Adresse du noeud expéditeur.
+        :param port: Port associée à cette adresse.
+        :param block: Objet Python du bloc.
+        """
+        # Le bloc est-il valide ?
+        if self._check_block(block, check_tx=False):
+            # Le bloc parent est connu: ajout au registre ou à une branche
+            if block["hash"] is None or self._known(block["hash"]):
+                self._add_block(block)
+
+            # Des blocs manquent avant le bloc proposé
+            elif block["index"] >= len(self.ledger):
+                hash = sha256(block)
+                # Le parent est peut-être encore en cours de diffusion
+                if self.orphans.add(hash, block):
+                    timer = threading.Timer(self.orphan_timeout, self.__orphan_timeout,
+                        args=(host, port, hash))
+                    timer.daemon = True
+                    timer.start()
+                elif hash not in self.orphans:
+                    self._sync(host, port)
 
-                # En retard de plus de 1 bloc
-                elif k > n:
-                    req = {"request": "GET_BLOCKS"}
-                    super().send(host, port, req)
+            # Sinon le bloc proposé ne se raccroche à rien de connu
 
-                # Si pas de retard ne pas prendre en compte le bloc proposé
+    def _sync(self, host: str, port: int):
+        """
+        Demande à un noeud les blocs qui suivent le dernier bloc commun
+        des deux registres.
+
+        :param host: Adresse du noeud.
+        :param port: Port associée à cette adresse.
+        """
+        # Une seule demande en cours par noeud
+        with self.lock_syncing:
+            now = time.time()
+            if now - self.syncing.get((host, port), 0) < self.sync_timeout:
+                return
+            self.syncing[(host, port)] = now
+
+        req = {"request": "GET_BLOCKS", "locator": block_locator(self.block_hashes)}
+        super().send(host, port, req)
+
+    def __orphan_timeout(self, host: str, port: int, hash: str):
+        """
+        Synchronisation avec le noeud expéditeur d'un bloc orphelin
+        si son parent n'est toujours pas arrivé.
+
+        :param host: Adresse du noeud expéditeur.
+        :param port: Port associée à cette adresse.
+        :param hash: Hash du bloc orphelin.
+        """
+        if hash in self.orphans:
+            self._sync(host, port)
+
+    def _find_fork(self, locator: list) -> int:
+        """
+        Recherche le dernier bloc commun avec un registre distant.
+
+        :param locator: Localisateur de blocs du registre distant.
+        :return: Hauteur du premier bloc qui suit le dernier bloc commun.
+        """
+        for hash in locator:
+            height = self.block_heights.get(hash)
+            if height is not None:
+                return height + 1
+        return 0
+
+    def _rebuild_block(self, host: str, port: int, compact: object) -> Union[object, None]:
+        """
+        Reconstruction d'un bloc compact à partir du tampon des transactions
+        candidates. Les transactions absentes du tampon sont demandées
+        au noeud expéditeur et le bloc est mis en attente. Si la racine de Merkle
+        du bloc reconstruit est fausse, un identifiant court désigne une autre
+        transaction du tampon et toutes les transactions retrouvées sont demandées.
+
+        :param host: Adresse du noeud expéditeur.
+        :param port: Port associée à cette adresse.
+        :param compact: En-tête du bloc, identifiants courts de ses transactions
+        et transactions préremplies avec leur position.
+        :return: Objet Python du bloc ou None si des transactions manquent
+        ou si une position préremplie est invalide.
+        """
+        # Les positions préremplies proviennent du réseau
+        for pos, _ in compact["prefilled"]:
+            if not isinstance(pos, int) or not 0 <= pos < len(compact["shortids"]):
+                return None
+
+        known = dict()
+        for tx in self.buf_tx:
+            known[short_txid(tx.txid)] = tx.to_dict()
+
+        block_tx = [known.get(shortid) for shortid in compact["shortids"]]
+        for pos, tx in compact["prefilled"]:
+            block_tx[pos] = tx
+
+        block = {"index": compact["index"], "hash": compact["hash"],
+            "root": compact["root"], "nonce": compact["nonce"], "tx": block_tx}
+
+        prefilled = {pos for pos, _ in compact["prefilled"]}
+        resolved = [pos for pos, tx in enumerate(block_tx) if tx is not None and pos not in prefilled]
+        missing = [pos for pos, tx in enumerate(block_tx) if tx is None]
+        if len(missing) == 0:
+            if block["root"] == MerkleTree([tx["hash"] for tx in block_tx]).get_root():
+                return block
+            # Collision d'identifiants courts
+            self._request_block_tx(host, port, block, resolved, [])
+        else:
+            self._request_block_tx(host, port, block, missing, resolved)
+        return None
+
+    def _request_block_tx(self, host: str, port: int, block: object,
+        indexes: List[int], resolved: List[int]):
+        """
+        Met en attente un bloc compact et demande des transactions au noeud expéditeur.
+
+        :param host: Adresse du noeud expéditeur.
+        :param port: Port associée à cette adresse.
+        :param block: Bloc en cours de reconstruction.
+        :param indexes: Positions des transactions demandées.
+        :param resolved: Positions des transactions retrouvées dans le tampon
+        à redemander si la racine de Merkle du bloc complété est fausse.
+        """
+        with self.lock_pending:
+            self.pending_blocks[block["root"]] = (block, resolved)
+            # On oublie les blocs en attente les plus anciens
+            while len(self.pending_blocks) > self.max_pending_blocks:
+                self.pending_blocks.pop(next(iter(self.pending_blocks)))
+
+        req = {"request": "GET_BLOCK_TX", "index": block["index"],
+            "root": block["root"], "indexes": indexes}
+        super().send(host, port, req)
 
     def _private_callback(self, host: str, port: int, body: object):
         """
@@ -100,51 +369,93 @@ class FullNode(Node):
         :param port: Port associée à cette adresse.
         :param body: Objet Python du corps du paquet.
 
-        GET_BLOCKS: Demande d'une liste de blocs résolus.
-        LIST_BLOCKS: Réception d'une liste de blocs résolus.
+        GET_BLOCKS: Demande des blocs à partir d'une hauteur (start)
+        ou du dernier bloc commun d'un localisateur (locator),
+        éventuellement réduits à leur en-tête (headers).
+        LIST_BLOCKS:Réception d'une suite de blocs résolus par morceaux.
         GET_BALANCE: Demande des UTXO associées à une adresse.
+        GET_PROOF: Demande de preuve de validation d'une transaction.
+        GET_BLOCK_TX: Demande de transactions d'un bloc compact.
+        BLOCK_TX: Réception de transactions d'un bloc compact.
         """
         # Demande de blocs résolus
         if "GET_BLOCKS" == body["request"]:
-            # On envoie la blockchain entière pour simplifier
-            req = {"request": "LIST_BLOCKS", "blocks": self.ledger}
+            # Premier bloc manquant du demandeur
+            if "locator" in body:
+                start = self._find_fork(body["locator"])
+            else:
+                start = body.get("start", 0)
+
+            # Seule la suite manquante est envoyée par morceaux
+            # Les blocs antérieurs à un instantané ou élagués ne peuvent pas être envoyés
+            # sauf leur en-tête si le demandeur ne veut que les en-têtes
+            history = self.history_height()
+            blocks = []
+            if body.get("headers", False):
+                if start >= self.snapshot_height:
+                    blocks = [{key: value for key, value in block.items() if key != "tx"}
+                        for block in self.ledger[start:start+self.sync_chunk]]
+            elif start >= history:
+                blocks = self.ledger[start:start+self.sync_chunk]
+            req = {"request": "LIST_BLOCKS", "start": start, "height": len(self.ledger),
+                "blocks": blocks}
+            # Annonce de la hauteur à partir de laquelle les blocs sont complets
+            if history > 0:
+                req["pruned"] = history
+            # Réponse destinée à la validation d'un instantané
+            if body.get("history", False):
+                req["history"] = True
             super().send(host, port, req)
 
         # Réception de blocs résolus
         # Un noeud qui se connecte plus tard peut récupérer toute la blockchain
         elif "LIST_BLOCKS" == body["request"]:
-            # Il faut au moins un bloc reçu
-            if len(body["blocks"]) == 0:
+            start, blocks = body.get("start", 0), body["blocks"]
+            if body.get("history", False):
+                self._history_blocks(host, port, start, blocks)
                 return
 
-            # Récupération des anciennes transactions
-            old_tx = set()
-            for block in self.ledger:
-                old_tx.update({Transaction(tx) for tx in block["tx"]})
-            # Ajout des anciennes transactions libérées
-            self.buf_tx.update(old_tx)
-
-            self.lock_ledger.acquire()
+            # La demande en cours a reçu sa réponse
+            with self.lock_syncing:
+                self.syncing.pop((host, port), None)
 
-            # Suppression du registre actuel
-            # Le premier bloc genesis est particulier: il ne faut pas vérifier le chaînage
-            block = body["blocks"][0]
-            if not self._check_block(block):
+            # Il faut au moins un bloc reçu
+            if len(blocks) == 0:
                 return
-            self.ledger = [block]
 
-            # Reconstruction du registre
-            # On suppose que les blocs sont bien ordonnés
-            for block in body["blocks"][1:]:
-                # Ajout du bloc au registre
-                if not self._add_block(block, lock=False): break
+            with self.lock_ledger:
+                n = len(self.ledger)
+
+                # Des blocs manquent entre le registre et la réponse
+                if start > n:
+                    self._sync(host, port)
+                    return
 
-            self.lock_ledger.release()
+                # Ajout de la suite des blocs
+                # Si le registre distant diverge à partir de la hauteur start
+                # les blocs forment une branche qui ne remplace le registre
+                # que lorsque son travail cumulé devient supérieur
+                added = 0
+                for block in blocks:
+                    # Les blocs déjà présents dans le registre sont ignorés
+                    if sha256(block) not in self.block_heights \
+                        and not self._add_block(block, lock=False): break
+                    added += 1
+                complete = added == len(blocks)
+
+            # Demande du morceau suivant
+            if complete and start + len(blocks) < body.get("height", 0):
+                with self.lock_syncing:
+                    self.syncing[(host, port)] = time.time()
+                req = {"request": "GET_BLOCKS", "start": start + len(blocks)}
+                super().send(host, port, req)
 
         # Demande de la somme d'argent détenue par une adresse
         elif "GET_BALANCE" == body["request"]:
             address = body["address"]
-            utxo = [tx.to_dict() for tx in self.utxo[address]] if address in self.utxo else []
+            # Le porte-feuille signe la transaction entière contenant la UTXO
+            txids = {txid for txid, index in self.utxo.outpoints(address)}
+            utxo = [self.find_tx(txid).to_dict() for txid in txids]
             req = {"request": "BALANCE", "address": address, "utxo": utxo}
             super().send(host, port, req)
 
@@ -154,15 +465,133 @@ class FullNode(Node):
             index = self.find_tx(txid, return_index=True)
 
             # On ne renvoie pas de réponse si transaction pas encore validée
-            if index is not None:
+            if index is not None and index < self.history_height():
+                # Le bloc élagué ne permet plus de calculer la preuve
+                req = {"request": "PROOF", "txid": txid, "index": index, "pruned": True}
+                super().send(host, port, req)
+            elif index is not None:
                 tx_hash = [tx["hash"] for tx in self.ledger[index]["tx"]]
                 proof = MerkleTree(tx_hash).get_proof(txid)
                 req = {"request": "PROOF", "txid": txid, "index": index, "proof": proof}
                 super().send(host, port, req)
 
+        # Demande des transactions manquantes d'un bloc compact
+        elif "GET_BLOCK_TX" == body["request"]:
+            k = body["index"]
+            if self.history_height() <= k < len(self.ledger) and self.ledger[k]["root"] == body["root"]:
+                block_tx = self.ledger[k]["tx"]
+                tx = [block_tx[pos] for pos in body["indexes"] if pos < len(block_tx)]
+                req = {"request": "BLOCK_TX", "root": body["root"],
+                    "indexes": body["indexes"], "tx": tx}
+                super().send(host, port, req)
+
+        # Réception des transactions manquantes d'un bloc compact
+        elif "BLOCK_TX" == body["request"]:
+            with self.lock_pending:
+                pending = self.pending_blocks.pop(body["root"], None)
+            if pending is None or len(body["indexes"]) != len(body["tx"]):
+                return
+
+            block, resolved = pending
+            for pos, tx in zip(body["indexes"], body["tx"]):
+                block["tx"][pos] = tx
+
+            if all(tx is not None for tx in block["tx"]):
+                # Collision d'identifiants courts parmi les transactions du tampon
+                if len(resolved) > 0 and \
+                    block["root"] != MerkleTree([tx["hash"] for tx in block["tx"]]).get_root():
+                    self._request_block_tx(host, port, block, resolved, [])
+                # La racine de Merkle est vérifiée par _check_block
+                else:
+                    self._submit_block(host, port, block)
+
+    def start(self):
+        """
+        Démarre le noeud, le pool de vérification des signatures
+        et le thread d'admission des transactions.
+        """
+        self.verifier.start()
+        super().start()
+        threading.Thread(target=self.__admission_routine, daemon=True).start()
+
+    def __admission_routine(self):
+        """
+        Routine d'admission des transactions reçues à appeler dans un thread.
+        Les transactions en attente sont admises par lots et seules
+        les transactions admises sont diffusées aux voisins.
+        """
+        while True:
+            batch = [self.admission_queue.get()]
+            while batch[-1] is not None and len(batch) < self.admission_batch:
+                try:
+                    batch.append(self.admission_queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Arrêt du noeud
+            stop = batch[-1] is None
+            if stop: batch.pop()
+
+            try:
+                txs = [self._parse_tx(body.get("tx")) for _, _, _, body in batch]
+                results = self.accept_txs(txs)
+            except Exception as e:
+                # Un lot ne doit pas arrêter le thread d'admission
+                if 0 < self.verbose: self.logging(f"ADMISSION ERROR {e!r}")
+                self._count("invalid", len(batch))
+                results = [False] * len(batch)
+            for (host, port, id, body), res in zip(batch, results):
+                if res:
+                    self._relay({"header": "BROADCAST", "host": host, "port": port,
+                        "id": id, "body": body})
+                    self._transact_callback(host, port,
+                        {k: v for k, v in body.items() if k != "request"})
+            if stop: return
+
+    @staticmethod
+    def _parse_tx(data: object) -> Union[Transaction, None]:
+        """
+        Vérifications structurelles d'une transaction reçue, sans
+        consulter le registre.
+
+        :param data: Dictionnaire de la transaction reçue.
+        :return: Transaction ou None si elle est mal formée.
+        """
+        try:
+            if not isinstance(data["locktime"], (int, float)): return None
+            for intx in data["input"]:
+                if not (isinstance(intx["prevTxHash"], str) and type(intx["index"]) is int
+                    and intx["index"] >= 0 and isinstance(intx["unlock"], str)): return None
+            for utxo in data["output"]:
+                if not (isinstance(utxo["address"], str) and type(utxo["value"]) is int
+                    and utxo["value"] >= 0 and isinstance(utxo["lock"], str)): return None
+            tx = Transaction(data)
+            # Le hash annoncé doit correspondre au contenu
+            if data.get("hash", tx.txid) != tx.txid: return None
+            return tx
+        except (KeyError, TypeError):
+            return None
+
+    def _count(self, counter: str, n: int = 1):
+        with self.lock_admission:
+            self.admission[counter] += n
+
+    def admission_stats(self) -> dict:
+        """
+        Compteurs d'admission des transactions.
+
+        :return: Dictionnaire des compteurs et du nombre de transactions
+        traitées par seconde d'admission.
+        """
+        with self.lock_admission:
+            stats = self.admission.copy()
+        processed = sum(v for k, v in stats.items() if k not in ["received", "dropped"])
+        stats["throughput"] = processed / self.admission_time if self.admission_time > 0 else 0.0
+        return stats
+
     def _delete_tx(self, tx: set):
         """
-        Supprime les transactions en entrée du buffer.
+        Supprime les transactions en entrée du buffer ainsi que
+        les transactions du buffer qui dépensent les mêmes sorties.
 
         :param trans: Transactions à supprimer
         """
@@ -178,12 +607,15 @@ class FullNode(Node):
         """
         pass
 
-    def _check_block(self, block: object, check_tx: bool = True) -> bool:
+    def _check_block(self, block: object, check_tx: bool = True,
+        utxo: UtxoSet = None, find_tx: Callable = None) -> bool:
         """
         Vérifie si un bloc est valide.
 
         :param block: Objet Python du bloc à vérifier.
         :param check_tx: Si True vérifie les transactions du bloc.
+        :param utxo: UTXO de référence des transactions, par défaut celles du registre.
+        :param find_tx: Recherche des transactions de référence, par défaut self.find_tx.
         :return: True si valide False sinon.
         """
         # Les champs du bloc sont-ils tous renseignés ?
@@ -198,10 +630,16 @@ class FullNode(Node):
 
         # Les transactions sont-elles valides ?
         if check_tx:
+            # Signatures des transactions vérifiées en un seul lot
+            checks = []
             # On accepte une seule transaction récompense par bloc
             reward_utxo = False
             for tx in block["tx"]:
+                txid = tx["hash"]
                 tx = Transaction(tx)
+                # Le hash annoncé est-il celui de la transaction ?
+                # Les hashs des transactions du registre sont ensuite considérés comme sûrs
+                if tx.txid != txid: return False
 
                 # Transaction récompense
                 if len(tx.input) == 0 and len(tx.output) == 1:
@@ -211,7 +649,10 @@ class FullNode(Node):
 
                 # Transaction classique
                 else:
-                    res = res and self.check_tx(tx)
+                    res = res and self.check_tx(tx, utxo, find_tx, checks)
+
+            # Les résultats sont réunis avant la mise à jour des UTXO
+            res = res and all(self._verify(checks))
 
         return res
 
@@ -222,7 +663,8 @@ class FullNode(Node):
         :param block: Objet Python du bloc à vérifier.
         :return: True si valide False sinon.
         """
-        return len(self.ledger) == 0 or sha256(self.ledger[-1]) == block["hash"]
+        tip = self.block_hashes[-1] if len(self.block_hashes) > 0 else None
+        return tip == block["hash"] and block["index"] == len(self.ledger)
 
     def find_tx(self, txHash: str, return_index=False) -> Union[Transaction, int, None]:
         """
@@ -233,14 +675,526 @@ class FullNode(Node):
         :return: Transaction correspondante ou indice du bloc
         ou None si transaction absente.
         """
-        for index, block in enumerate(self.ledger):
+        if txHash not in self.tx_index:
+            # Transaction élaguée dont seule la hauteur est connue
+            if return_index:
+                return self.pruned_index.get(txHash)
+            # Transaction d'une UTXO de l'instantané dont le bloc est absent
+            if txHash in self.snapshot_tx:
+                return Transaction(self.snapshot_tx[txHash], txHash)
+            return None
+        index, pos = self.tx_index[txHash]
+        if return_index: return index
+        # Transaction d'un bloc élagué conservée tant que ses sorties peuvent servir
+        if index < self.pruned_height:
+            tx = self.pruned_tx.get(txHash)
+            return None if tx is None else Transaction(tx, txHash)
+        return Transaction(self.ledger[index]["tx"][pos], txHash)
+
+    def _index_block(self, index: int, block: object):
+        """
+        Ajoute les transactions d'un bloc du registre à l'index des transactions.
+        En cas de doublon on conserve la première occurrence.
+
+        :param index: Indice du bloc dans le registre.
+        :param block: Objet Python du bloc.
+        """
+        for pos, tx in enumerate(block["tx"]):
+            self.tx_index.setdefault(tx["hash"], (index, pos))
+
+    def _apply_block(self, index: int, block: object):
+        """
+        Met à jour les index et les UTXO avec un bloc ajouté au registre.
+        Les UTXO consommées sont conservées pour pouvoir annuler le bloc.
+
+        :param index: Indice du bloc dans le registre.
+        :param block: Objet Python du bloc.
+        """
+        hash = sha256(block)
+        self.block_hashes.append(hash)
+        self.block_heights[hash] = index
+        self._index_block(index, block)
+
+        spent = []
+        for tx in block["tx"]:
+            # Suppression des UTXO consommées
+            for intx in tx["input"]:
+                utxo = self.utxo.spend(intx["prevTxHash"], intx["index"])
+                if utxo is not None:
+                    spent.append((intx["prevTxHash"], intx["index"], utxo))
+
+            # Enregistrement des UTXO créées
+            self.utxo.add_tx(tx)
+
+        self.undo[hash] = spent
+
+    def _disconnect_block(self):
+        """
+        Annule le dernier bloc du registre à l'aide de ses données d'annulation.
+        Ses transactions retournent dans le tampon des transactions candidates
+        sauf les transactions récompense.
+        Le registre doit être verrouillé.
+
+        :return: Objet Python du bloc retiré.
+        """
+        index = len(self.ledger) - 1
+        hash = self.block_hashes.pop()
+        undo = self.undo.pop(hash) if self.store is None else self.store.undo(index)
+        self.revertible.difference_update((txid, i) for txid, i, _ in undo)
+        block = self.ledger.pop()
+        if self.prune_bytes is not None:
+            self.body_bytes -= self.body_sizes.pop()
+        # Le bloc retiré rejoint les branches concurrentes
+        self._store_block(hash, block)
+        del self.block_heights[hash]
+
+        for pos, tx in enumerate(block["tx"]):
+            # Suppression des UTXO créées
+            for i in range(len(tx["output"])):
+                self.utxo.spend(tx["hash"], i)
+            if self.tx_index.get(tx["hash"]) == (index, pos):
+                del self.tx_index[tx["hash"]]
+
+        # Restauration des UTXO consommées
+        for txid, i, utxo in undo:
+            self.utxo.add(txid, i, utxo)
+
+        self.buf_tx.update({Transaction(tx, tx["hash"]) for tx in block["tx"]
+            if len(tx["input"]) > 0 or len(tx["output"]) == 0})
+
+        return block
+
+    def _connect_block(self, block: object):
+        """
+        Ajoute en fin de registre un bloc déjà vérifié.
+        Le registre doit être verrouillé.
+
+        :param block: Objet Python du bloc.
+        """
+        self._apply_block(len(self.ledger), block)
+        hash = self.block_hashes[-1]
+        if self.prune_depth is not None or self.prune_bytes is not None:
+            self.revertible.update((txid, i) for txid, i, _ in self.undo[hash])
+        # Le bloc quitte les branches concurrentes
+        self.blocks.pop(hash, None)
+        self.work.pop(hash, None)
+        if self.store is None:
+            self.ledger.append(block)
+            if self.prune_bytes is not None:
+                size = len(json_encode(block["tx"]))
+                self.body_sizes.append(size)
+                self.body_bytes += size
+        else:
+            # Les données d'annulation sont conservées sur disque
+            self.store.append(block, hash, self.undo.pop(hash))
+            if len(self.store) % self.checkpoint_interval == 0:
+                self._checkpoint()
+
+        # Suppression des transactions candidates traitées
+        self._delete_tx({Transaction(tx, tx["hash"]) for tx in block["tx"]})
+
+    def _truncate(self, height: int):
+        """
+        Supprime les blocs du registre à partir d'une hauteur.
+        Seuls les blocs supprimés sont annulés, du plus récent au plus ancien.
+        Les blocs supprimés restent dans l'arbre des blocs.
+        Le registre doit être verrouillé.
+
+        :param height: Nombre de blocs conservés.
+        """
+        while len(self.ledger) > height:
+            self._disconnect_block()
+
+    def _block_work(self) -> int:
+        """
+        Travail attendu pour résoudre un bloc.
+
+        :return: Nombre moyen de hashs calculés.
+        """
+        return 16 ** self.difficulty
+
+    def _store_block(self, hash: str, block: object):
+        """
+        Enregistre un bloc d'une branche concurrente dans l'arbre des blocs
+        avec son travail cumulé.
+
+        :param hash: Hash du bloc.
+        :param block: Objet Python du bloc.
+        """
+        parent = block["hash"]
+        self.blocks[hash] = block
+        self.work[hash] = (0 if parent is None else self._work(parent)) + self._block_work()
+
+    def _forget_blocks(self, hashes: set):
+        """
+        Oublie des blocs de l'arbre des blocs ainsi que leurs descendants.
+
+        :param hashes: Hashs des blocs à oublier.
+        """
+        forgotten = set(hashes)
+        # Un parent est toujours parcouru avant ses enfants
+        for hash, block in sorted(self.blocks.items(), key=lambda item: item[1]["index"]):
+            if hash in forgotten or block["hash"] in forgotten:
+                forgotten.add(hash)
+                del self.blocks[hash]
+                self.work.pop(hash, None)
+
+    def _trim_blocks(self):
+        """
+        Oublie les blocs des branches concurrentes plus profonds que
+        self.fork_depth ou antérieurs aux blocs complets du registre
+        puisqu'une bascule sur ces branches n'est plus envisagée.
+        Le registre doit être verrouillé.
+        """
+        floor = max(len(self.ledger) - self.fork_depth, self.history_height())
+        self._forget_blocks({hash for hash, block in self.blocks.items() if block["index"] < floor})
+
+    def _known(self, hash: str) -> bool:
+        """
+        Indique si un bloc est dans le registre ou dans une branche concurrente.
+
+        :param hash: Hash du bloc.
+        :return: True si le bloc est connu False sinon.
+        """
+        return hash in self.block_heights or hash in self.blocks
+
+    def _work(self, hash: str) -> int:
+        """
+        Travail cumulé d'un bloc connu. Les blocs du registre ne sont pas
+        dans l'arbre des blocs et leur travail se déduit de leur hauteur
+        puisque la difficulté est fixe.
+
+        :param hash: Hash du bloc.
+        :return: Travail cumulé depuis la genèse.
+        """
+        if hash in self.work:
+            return self.work[hash]
+        return (self.block_heights[hash] + 1) * self._block_work()
+
+    def _reorganize(self, hash: str) -> bool:
+        """
+        Bascule le registre sur la branche de l'arbre qui se termine par un bloc.
+        Seuls les blocs qui suivent le dernier bloc commun sont annulés puis
+        les blocs de la nouvelle branche sont vérifiés et ajoutés.
+        Si un bloc de la branche est invalide le registre est restauré.
+        Le registre doit être verrouillé.
+
+        :param hash: Hash du dernier bloc de la branche.
+        :return: True si le registre a basculé False sinon.
+        """
+        # Remontée de la branche jusqu'au dernier bloc commun
+        branch = []
+        while hash is not None and hash not in self.block_heights:
+            block = self.blocks.get(hash)
+            # Un ancêtre a été rejeté ou oublié
+            if block is None: return False
+            branch.append((hash, block))
+            hash = block["hash"]
+        fork = 0 if hash is None else self.block_heights[hash] + 1
+        # Les blocs antérieurs à un instantané ou élagués ne peuvent pas être annulés
+        if fork < self.history_height(): return False
+
+        removed = []
+        while len(self.ledger) > fork:
+            removed.append(self._disconnect_block())
+
+        for hash, block in reversed(branch):
+            if not (self._check_block(block) and self._check_chain(block)):
+                self._truncate(fork)
+                for block in reversed(removed):
+                    self._connect_block(block)
+                # Le bloc invalide et ses descendants sont oubliés
+                self._forget_blocks({hash})
+                return False
+            self._connect_block(block)
+
+        # Les transactions remises dans le tampon peuvent dépendre des blocs annulés
+        txs = list(self.buf_tx)
+        self._delete_tx({tx for tx, valid in zip(txs, self.check_txs(txs)) if not valid})
+
+        return True
+
+    def history_height(self) -> int:
+        """
+        Hauteur à partir de laquelle les blocs du registre sont complets.
+        Les blocs antérieurs sont absents (instantané) ou réduits
+        à leur en-tête (élagage) et ne peuvent être ni envoyés ni annulés.
+
+        :return: Hauteur du premier bloc complet.
+        """
+        return max(self.snapshot_height, self.pruned_height)
+
+    def _prune(self):
+        """
+        Élague les blocs les plus anciens du registre selon la profondeur
+        et la taille maximales. Un bloc élagué ne conserve que son en-tête,
+        dont la racine de Merkle. Ses transactions sont conservées dans
+        self.pruned_tx tant qu'une de leurs sorties n'est pas dépensée ou l'est
+        par un bloc qui peut encore être annulé. Les autres sont retirées
+        de l'index des transactions et seule leur hauteur est conservée
+        dans self.pruned_index.
+        Le hash des blocs élagués reste dans self.block_hashes.
+        Le registre doit être verrouillé.
+        """
+        if self.prune_depth is None and self.prune_bytes is None:
+            return
+        height = self.history_height()
+        tip = len(self.ledger)
+
+        def deep() -> bool:
+            return self.prune_depth is not None and tip - height > self.prune_depth
+
+        def heavy() -> bool:
+            return self.prune_bytes is not None and self.body_bytes > self.prune_bytes
+
+        # Le dernier bloc du registre est toujours conservé
+        if not (height < tip - 1 and (deep() or heavy())):
+            return
+
+        def needed(txid: str, n: int) -> bool:
+            # Une sortie non-dépensée ou qui peut être restaurée
+            return any((txid, i) in self.utxo or (txid, i) in self.revertible for i in range(n))
+
+        while height < tip - 1 and (deep() or heavy()):
+            block = self.ledger[height]
+            hash = self.block_hashes[height]
+            # Les dépenses d'un bloc élagué sont définitives
+            for txid, i, _ in self.undo.get(hash, []):
+                self.revertible.discard((txid, i))
+
+            for pos, tx in enumerate(block["tx"]):
+                if needed(tx["hash"], len(tx["output"])):
+                    self.pruned_tx[tx["hash"]] = tx
+                elif self.tx_index.get(tx["hash"]) == (height, pos):
+                    del self.tx_index[tx["hash"]]
+                    self.pruned_index[tx["hash"]] = height
+                # Une sortie consommée par un bloc élagué ne peut plus être restaurée
+                for prev in {intx["prevTxHash"] for intx in tx["input"]}:
+                    for txs in [self.pruned_tx, self.snapshot_tx]:
+                        prev_tx = txs.get(prev)
+                        if prev_tx is not None and not needed(prev, len(prev_tx["output"])):
+                            del txs[prev]
+                            if txs is self.pruned_tx and prev in self.tx_index:
+                                self.pruned_index[prev] = self.tx_index.pop(prev)[0]
+
+            self.ledger[height] = {key: value for key, value in block.items() if key != "tx"}
+            self.undo.pop(hash, None)
+            if self.prune_bytes is not None:
+                self.body_bytes -= self.body_sizes.popleft()
+            height += 1
+            self.pruned_height = height
+
+    def _checkpoint(self):
+        """
+        Sauvegarde des UTXO et de l'index des transactions du registre persistant.
+        Le registre doit être verrouillé.
+        """
+        state = {"height": len(self.ledger),
+            "hash": self.block_hashes[-1] if len(self.block_hashes) > 0 else None,
+            "utxo": [[txid, i, utxo] for (txid, i), utxo in self.utxo.entries.items()],
+            "tx_index": [[txid, index, pos] for txid, (index, pos) in self.tx_index.items()]}
+        self.store.save_state(state)
+
+    def _load_store(self):
+        """
+        Recharge l'état du registre persistant au démarrage.
+        Les hashs proviennent de l'index, les UTXO et l'index des transactions
+        du dernier point de contrôle. Seuls les blocs postérieurs au point
+        de contrôle sont rejoués.
+        """
+        hashes = self.store.hashes()
+        state = self.store.load_state()
+        height = 0
+        # Le point de contrôle doit correspondre à un bloc du registre
+        if state is not None and 0 < state["height"] <= len(hashes) \
+            and state["hash"] == hashes[state["height"] - 1]:
+            height = state["height"]
+            for txid, i, utxo in state["utxo"]:
+                self.utxo.add(txid, i, utxo)
+            self.tx_index = {txid: (index, pos) for txid, index, pos in state["tx_index"]}
+
+        self.block_hashes = hashes[:height]
+        self.block_heights = {hash: index for index, hash in enumerate(self.block_hashes)}
+        for index in range(height, len(self.store)):
+            self._apply_block(index, self.store[index])
+        self.undo.clear()
+
+    def export_snapshot(self) -> dict:
+        """
+        Exporte un instantané des UTXO à la hauteur courante du registre.
+        Il contient les hashs des blocs, les transactions ayant des sorties
+        non-dépensées avec les indices de ces sorties et un engagement
+        qui permet de vérifier son intégrité.
+
+        :return: Objet Python de l'instantané sérialisable en JSON.
+        """
+        with self.lock_ledger:
+            unspent = dict()
+            for txid, index in self.utxo:
+                unspent.setdefault(txid, []).append(index)
+            tx = [[self.find_tx(txid).to_dict(), sorted(indexes)]
+                for txid, indexes in sorted(unspent.items())]
+            height = len(self.ledger)
+            hashes = self.block_hashes.copy()
+            commitment = self.utxo.commitment()
+
+        return {"version": SNAPSHOT_VERSION, "height": height, "hashes": hashes, "tx": tx,
+            "commitment": snapshot_commitment(height, hashes, commitment)}
+
+    def import_snapshot(self, snapshot: dict, commitment: str = None) -> bool:
+        """
+        Amorce un registre vide à partir d'un instantané des UTXO.
+        Seuls les blocs qui suivent l'instantané sont ensuite synchronisés.
+        Les blocs antérieurs peuvent être validés en tâche de fond
+        avec self.validate_snapshot.
+
+        :param snapshot: Objet Python de l'instantané.
+        :param commitment: Engagement attendu si l'instantané provient
+        d'une source non fiable.
+        :return: True si l'instantané a été chargé False sinon.
+        """
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return False
+        height, hashes = snapshot.get("height"), snapshot.get("hashes")
+        if not isinstance(height, int) or not isinstance(hashes, list) or len(hashes) != height:
+            return False
+        if not all(isinstance(hash, str) for hash in hashes): return False
+        if not isinstance(snapshot.get("tx"), list): return False
+
+        # Les transactions et les UTXO correspondent-elles à l'engagement ?
+        utxo = UtxoSet()
+        snapshot_tx = dict()
+        # Une entrée malformée rend l'instantané invalide
+        try:
+            for tx, indexes in snapshot["tx"]:
+                if Transaction(tx).txid != tx["hash"]: return False
+                snapshot_tx[tx["hash"]] = tx
+                for index in indexes:
+                    if not isinstance(index, int) or not 0 <= index < len(tx["output"]):
+                        return False
+                    utxo.add(tx["hash"], index, tx["output"][index])
+        except (TypeError, ValueError, KeyError, AttributeError):
+            return False
+        expected = snapshot_commitment(height, hashes, utxo.commitment())
+        if expected != snapshot.get("commitment"): return False
+        if commitment is not None and expected != commitment: return False
+
+        with self.lock_ledger:
+            if len(self.ledger) > 0 or self.store is not None: return False
+            self.ledger = [None] * height
+            self.block_hashes = hashes.copy()
+            self.block_heights = {hash: index for index, hash in enumerate(hashes)}
+            self.utxo = utxo
+            self.snapshot_tx = snapshot_tx
+            self.snapshot_height = height
+            self.snapshot = {"height": height, "commitment": expected}
+        return True
+
+    def validate_snapshot(self, host: str, port: int):
+        """
+        Demande à un noeud les blocs antérieurs à l'instantané chargé pour
+        les valider en tâche de fond. À la fin, self.snapshot_validated indique
+        si les blocs reproduisent l'instantané et ils remplacent alors
+        les blocs absents du registre.
+
+        :param host: Adresse du noeud.
+        :param port: Port associée à cette adresse.
+        """
+        if self.snapshot_height == 0: return
+        self.history = {"blocks": [], "utxo": UtxoSet(), "tx": dict(), "undo": []}
+        self.snapshot_validated = None
+        req = {"request": "GET_BLOCKS", "start": 0, "history": True}
+        super().send(host, port, req)
+
+    def _history_blocks(self, host: str, port: int, start: int, blocks: list):
+        """
+        Validation d'un morceau des blocs antérieurs à l'instantané.
+        Les blocs sont vérifiés comme par self._add_block mais sur un état
+        séparé du registre courant. Leurs données d'annulation sont enregistrées
+        pour que les blocs installés puissent être annulés par une réorganisation.
+
+        :param host: Adresse du noeud expéditeur.
+        :param port: Port associée à cette adresse.
+        :param start: Hauteur du premier bloc reçu.
+        :param blocks: Blocs reçus.
+        """
+        history = self.history
+        if history is None or start != len(history["blocks"]): return
+        height = self.snapshot["height"]
+
+        def find_tx(txid: str) -> Union[Transaction, None]:
+            tx = history["tx"].get(txid)
+            return None if tx is None else Transaction(tx, txid)
+
+        for block in blocks[:height - start]:
+            index = len(history["blocks"])
+            valid = block["index"] == index and sha256(block) == self.block_hashes[index] \
+                and self._check_block(block, utxo=history["utxo"], find_tx=find_tx)
+            if not valid:
+                self.history = None
+                self.snapshot_validated = False
+                if 0 < self.verbose: self.logging("INVALID SNAPSHOT HISTORY")
+                return
+
+            history["blocks"].append(block)
+            spent = []
             for tx in block["tx"]:
-                if txHash == tx["hash"]:
-                    if return_index: return index
-                    else: return Transaction(tx)
-        return None
+                history["tx"].setdefault(tx["hash"], tx)
+                for intx in tx["input"]:
+                    utxo = history["utxo"].spend(intx["prevTxHash"], intx["index"])
+                    if utxo is not None:
+                        spent.append((intx["prevTxHash"], intx["index"], utxo))
+                history["utxo"].add_tx(tx)
+            history["undo"].append(spent)
+
+        # Demande du morceau suivant
+        if len(history["blocks"]) < height:
+            if len(blocks) > 0:
+                req = {"request": "GET_BLOCKS", "start": len(history["blocks"]), "history": True}
+                super().send(host, port, req)
+            return
+
+        # Les blocs reproduisent-ils l'instantané ?
+        expected = snapshot_commitment(height, self.block_hashes[:height],
+            history["utxo"].commitment())
+        self.history = None
+        self.snapshot_validated = expected == self.snapshot["commitment"]
+        if not self.snapshot_validated:
+            if 0 < self.verbose: self.logging("INVALID SNAPSHOT HISTORY")
+            return
 
-    def check_tx(self, tx: Transaction) -> bool:
+        # Un noeud élagué ne conserve pas l'historique validé
+        if self.prune_depth is not None or self.prune_bytes is not None:
+            return
+
+        # Les blocs antérieurs remplacent les blocs absents du registre
+        with self.lock_ledger:
+            self.ledger[:height] = history["blocks"]
+            for index, block in enumerate(history["blocks"]):
+                self._index_block(index, block)
+                self.undo[self.block_hashes[index]] = history["undo"][index]
+            self.snapshot_tx = dict()
+            self.snapshot_height = 0
+
+    def shutdown(self):
+        """
+        Éteins le noeud et ferme le registre persistant
+        après un dernier point de contrôle.
+        """
+        super().shutdown()
+        # La file peut être pleine: le thread d'admission s'arrêtera avec le processus
+        try:
+            self.admission_queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self.verifier.close()
+        if self.store is not None:
+            with self.lock_ledger:
+                self._checkpoint()
+                self.store.close()
+
+    def check_tx(self, tx: Transaction, utxo: UtxoSet = None, find_tx: Callable = None,
+        checks: list = None) -> bool:
         """
         Vérifie si une transaction est valide.
 
@@ -251,28 +1205,42 @@ class FullNode(Node):
         Ces transactions spéciales sont validées au niveau de self._check_block.
 
         :param tx: Transaction à vérifier.
+        :param utxo: UTXO de référence, par défaut celles du registre.
+        :param find_tx: Recherche des transactions de référence, par défaut self.find_tx.
+        :param checks: Si renseigné les signatures ne sont pas vérifiées mais
+        ajoutées à cette liste pour être vérifiées par lot avec self._verify.
         :return: True si valide False sinon.
         """
+        if utxo is None: utxo = self.utxo
+        if find_tx is None: find_tx = self.find_tx
+
         # Transaction vide
         if len(tx.input) == 0 and len(tx.output) == 0:
             # La transaction existe-t-elle déjà dans le registre ?
-            return self.find_tx(tx.to_dict()["hash"]) is None
+            return find_tx(tx.txid) is None
 
         # Transaction classique
         input_value = 0
+        # Signatures qui ne sont pas dans le cache des vérifications
+        signatures = []
         # Les entrées sont-elles valides ?
-        for intx in tx.input:
-            prev_tx = self.find_tx(intx["prevTxHash"])
+        for index, intx in enumerate(tx.input):
+            prev_tx = find_tx(intx["prevTxHash"])
             # La transaction consommée existe-t-elle dans le registre ?
             if prev_tx is None: return False
 
-            utxo = prev_tx.output[intx["index"]]
+            prev_utxo = utxo.get(intx["prevTxHash"], intx["index"])
             # La UTXO a-t-elle déjà été consommée ?
-            if prev_tx not in self.utxo[utxo["address"]]: return False
+            if prev_utxo is None: return False
 
             # Le déverrouillage a-t-il échoué ?
-            if execute(intx["unlock"], utxo["lock"], prev_tx) == "false": return False
-            input_value += utxo["value"]
+            deferred = []
+            if execute(intx["unlock"], prev_utxo["lock"], prev_tx, deferred) == "false": return False
+            for check in deferred:
+                key = SigCache.key(tx.txid, index, check[0])
+                if not self.sig_cache.lookup(key):
+                    signatures.append((key, check))
+            input_value += prev_utxo["value"]
 
         # La somme en entrée est-elle égale à la somme en sortie ?
         output_value = sum([utxo["value"] for utxo in tx.output])
@@ -280,43 +1248,154 @@ class FullNode(Node):
         # La contrainte d'unicité des adresses en sortie est-elle respectée ?
         nunique = len({utxo["address"] for utxo in tx.output})
 
-        return input_value == output_value and nunique == len(tx.output)
+        res = input_value == output_value and nunique == len(tx.output)
+        # Les signatures ne sont vérifiées qu'une fois le reste de la transaction valide
+        if checks is not None:
+            checks.extend(signatures)
+            return res
+        return res and all(self._verify(signatures))
+
+    def _verify(self, checks: list) -> List[bool]:
+        """
+        Vérifie un lot de signatures et enregistre les vérifications
+        réussies dans le cache.
+
+        :param checks: Liste de couples (clé du cache, vérification)
+        remplie par self.check_tx.
+        :return: Résultat de chaque vérification dans l'ordre du lot.
+        """
+        if len(checks) == 0:
+            return []
+        results = self.verifier.verify([check for _, check in checks])
+        for (key, _), valid in zip(checks, results):
+            if valid: self.sig_cache.add(key)
+        return results
+
+    def accept_tx(self, tx: Transaction) -> bool:
+        """
+        Admission d'une transaction dans le tampon des transactions candidates.
+
+        :param tx: Transaction reçue.
+        :return: True si la transaction a été ajoutée au tampon False sinon.
+        """
+        return self.accept_txs([tx])[0]
+
+    def accept_txs(self, txs: List[Union[Transaction, None]]) -> List[bool]:
+        """
+        Admission d'un groupe de transactions dans le tampon des transactions candidates.
+        Une transaction doit être valide par rapport au registre et ne pas
+        dépenser une sortie déjà dépensée par une transaction du tampon.
+
+        Les UTXO et les scripts sont vérifiés sans verrouiller le registre puis
+        les signatures du groupe sont vérifiées en un seul lot. Chaque transaction
+        est enfin vérifiée à nouveau au moment de l'ajout, registre verrouillé,
+        ce qui ne coûte que des recherches dans le cache des signatures.
+
+        :param txs: Transactions reçues, None si mal formée.
+        :return: Admission de chaque transaction dans l'ordre du groupe.
+        """
+        start = time.time()
+        reasons = [None] * len(txs)
+        checks, spans = [], []
+        for i, tx in enumerate(txs):
+            begin = len(checks)
+            if tx is None:
+                reasons[i] = "malformed"
+            elif tx in self.buf_tx:
+                reasons[i] = "duplicate"
+            elif len(self.buf_tx.conflicts_with(tx)) > 0:
+                reasons[i] = "conflict"
+            elif not self.check_tx(tx, checks=checks):
+                reasons[i] = "invalid"
+                del checks[begin:]
+            spans.append((begin, len(checks)))
+
+        # Vérification des signatures par lot
+        results = self._verify(checks)
+        for i, (begin, end) in enumerate(spans):
+            if reasons[i] is None and not all(results[begin:end]):
+                reasons[i] = "signature"
+
+        # Le registre ne doit pas changer entre la vérification et l'ajout
+        with self.lock_ledger:
+            for i, tx in enumerate(txs):
+                if reasons[i] is not None: continue
+                if not self.check_tx(tx):
+                    reasons[i] = "invalid"
+                elif not self.buf_tx.add(tx):
+                    reasons[i] = "duplicate" if tx in self.buf_tx else "conflict"
+
+        with self.lock_admission:
+            for reason in reasons:
+                self.admission["accepted" if reason is None else reason] += 1
+            self.admission_time += time.time() - start
+        return [reason is None for reason in reasons]
+
+    def check_txs(self, txs: List[Transaction]) -> List[bool]:
+        """
+        Vérifie un groupe de transactions en vérifiant leurs signatures
+        en un seul lot.
+
+        :param txs: Transactions à vérifier.
+        :return: Validité de chaque transaction dans l'ordre du groupe.
+        """
+        checks = []
+        valid, spans = [], []
+        for tx in txs:
+            start = len(checks)
+            valid.append(self.check_tx(tx, checks=checks))
+            spans.append((start, len(checks)))
+
+        results = self._verify(checks)
+        return [res and all(results[start:end]) for res, (start, end) in zip(valid, spans)]
 
     def _add_block(self, block: object, lock: bool = True) -> bool:
         """
-        Ajoute un bloc au registre s'il est valide.
+        Ajoute un bloc au registre ou à une branche concurrente s'il est valide.
+        Le registre bascule sur une branche dès que son travail cumulé dépasse
+        celui du registre.
 
         :param block: Bloc à ajouter au registre.
         :param lock: Verrouillage du registre si True.
-        :return: True si le bloc a été ajouté False sinon.
+        :return: True si le bloc a été ajouté à l'arbre des blocs False sinon.
         """
         if lock: self.lock_ledger.acquire()
 
+        hash = sha256(block)
+        parent = block["hash"]
+
+        # Le bloc est déjà dans le registre
+        if hash in self.block_heights:
+            res = False
+
         # Le bloc est-il valide et suit-il le dernier bloc du registre ?
-        res = self._check_block(block) and self._check_chain(block)
-        if res:
-            # Ajout du bloc au registre
-            self.ledger.append(block)
+        elif self._check_chain(block):
+            res = self._check_block(block)
+            if res:
+                self._connect_block(block)
 
-            for tx in block["tx"]:
-                # Suppression des UTXO consommées
-                for intx in tx["input"]:
-                    index = intx["index"]
-                    intx = self.find_tx(intx["prevTxHash"])
-                    if intx is not None:
-                        address = intx.output[index]["address"]
-                        # KeyError possible
-                        self.utxo[address].remove(intx)
-
-                # Enregistrement des UTXO créées
-                for utxo in tx["output"]:
-                    address = utxo["address"]
-                    if address not in self.utxo:
-                        self.utxo[address] = set()
-                    self.utxo[address].add(Transaction(tx))
-
-            # Suppression des transactions candidates traitées
-            self._delete_tx({Transaction(tx) for tx in block["tx"]})
+        # Le bloc prolonge-t-il une branche connue ?
+        elif hash not in self.blocks and (parent is None or self._known(parent)) \
+            and self._check_block(block, check_tx=False):
+            res = block["index"] == (0 if parent is None else self.block_heights[parent] + 1
+                if parent in self.block_heights else self.blocks[parent]["index"] + 1)
+            if res:
+                self._store_block(hash, block)
+                tip = self._work(self.block_hashes[-1]) if len(self.block_hashes) > 0 else 0
+                # Les transactions ne sont vérifiées qu'au moment de la bascule
+                if self.work[hash] > tip:
+                    res = self._reorganize(hash)
+
+        else:
+            res = False
+
+        # Rattachement des blocs orphelins qui attendaient ce bloc
+        if res:
+            for child in self.orphans.pop_children(hash):
+                self._add_block(child, lock=False)
+            # Élagage après une éventuelle bascule qui doit pouvoir être annulée
+            self._prune()
+            self._trim_blocks()
 
         if lock: self.lock_ledger.release()
 
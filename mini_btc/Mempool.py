@@ -0,0 +1,203 @@
+import threading
+from collections import OrderedDict
+from mini_btc import Transaction
+from typing import Container, Iterable, Iterator, List, Union
+
+
+class Mempool:
+    """
+    Tampon borné des transactions candidates (à inclure dans les prochains blocs).
+
+    Les transactions sont indexées par hash dans leur ordre d'arrivée. Un index
+    des points de sortie (hash de la transaction, indice) consommés par le tampon
+    détecte en temps constant les doubles dépenses: la première transaction
+    reçue est conservée et les suivantes sont refusées. Lorsque le nombre de
+    transactions ou leur taille dépasse la capacité, les plus anciennes sont
+    évincées. Les transactions n'ayant pas de frais elles ne peuvent pas être
+    départagées autrement.
+
+    La validité des transactions par rapport au registre est vérifiée
+    par le noeud avant l'admission.
+    """
+    def __init__(self, max_count: int = 10_000, max_bytes: int = None):
+        """
+        :param max_count: Nombre maximum de transactions conservées.
+        :param max_bytes: Taille maximale en octets des transactions conservées.
+        Si None seul le nombre de transactions est borné.
+        """
+        assert max_count > 0
+        assert max_bytes is None or max_bytes > 0
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+
+        # Hash -> transaction dans l'ordre d'arrivée
+        self.txs = OrderedDict()
+        # Point de sortie consommé -> hash de la transaction qui le dépense
+        self.spent = dict()
+        # Taille des transactions conservées
+        self.sizes = dict()
+        self.bytes = 0
+        # Verrou sur le tampon
+        self.lock = threading.RLock()
+
+        # Compteurs
+        self.added = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _txid(tx: Union[Transaction, str]) -> str:
+        return tx if isinstance(tx, str) else tx.txid
+
+    def conflicts_with(self, tx: Transaction) -> List[str]:
+        """
+        Transactions du tampon qui dépensent une sortie consommée par une transaction.
+
+        :param tx: Transaction à comparer au tampon.
+        :return: Hashs des transactions en conflit sans doublon.
+        """
+        res = []
+        with self.lock:
+            for intx in tx.input:
+                txid = self.spent.get((intx["prevTxHash"], intx["index"]))
+                if txid is not None and txid != tx.txid and txid not in res:
+                    res.append(txid)
+        return res
+
+    def add(self, tx: Transaction) -> bool:
+        """
+        Ajoute une transaction en fin de tampon.
+
+        :param tx: Transaction à ajouter.
+        :return: True si la transaction a été ajoutée False si elle est
+        déjà présente ou en conflit avec une transaction du tampon.
+        """
+        txid = tx.txid
+        size = len(tx.raw_format())
+        with self.lock:
+            if txid in self.txs:
+                return False
+            if len(self.conflicts_with(tx)) > 0:
+                self.conflicts += 1
+                return False
+            # Une transaction plus grande que le tampon n'est pas conservée
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+
+            self.txs[txid] = tx
+            for intx in tx.input:
+                self.spent[(intx["prevTxHash"], intx["index"])] = txid
+            self.sizes[txid] = size
+            self.bytes += size
+            self.added += 1
+
+            # Éviction des transactions les plus anciennes
+            while len(self.txs) > self.max_count or \
+                (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._remove(next(iter(self.txs)))
+                self.evictions += 1
+            return True
+
+    def update(self, txs: Iterable[Transaction]):
+        """
+        Ajoute des transactions dans l'ordre.
+
+        :param txs: Transactions à ajouter.
+        """
+        with self.lock:
+            for tx in txs:
+                self.add(tx)
+
+    def _remove(self, txid: str) -> Transaction:
+        """
+        Retire une transaction présente dans le tampon.
+        Le tampon doit être verrouillé.
+        """
+        tx = self.txs.pop(txid)
+        for intx in tx.input:
+            outpoint = (intx["prevTxHash"], intx["index"])
+            if self.spent.get(outpoint) == txid:
+                del self.spent[outpoint]
+        self.bytes -= self.sizes.pop(txid)
+        return tx
+
+    def discard(self, tx: Union[Transaction, str]):
+        """
+        Retire une transaction si elle est présente.
+
+        :param tx: Transaction ou hash de la transaction.
+        """
+        txid = self._txid(tx)
+        with self.lock:
+            if txid in self.txs:
+                self._remove(txid)
+
+    def difference_update(self, txs: Iterable[Transaction]):
+        """
+        Retire des transactions confirmées par un bloc ainsi que les transactions
+        du tampon qui dépensent les mêmes sorties et sont donc devenues invalides.
+
+        :param txs: Transactions à retirer.
+        """
+        with self.lock:
+            for tx in txs:
+                txid = self._txid(tx)
+                if txid in self.txs:
+                    self._remove(txid)
+                elif not isinstance(tx, str):
+                    for conflict in self.conflicts_with(tx):
+                        self._remove(conflict)
+
+    def get(self, txid: str) -> Union[Transaction, None]:
+        """
+        Recherche une transaction par son hash.
+
+        :param txid: Hash de la transaction.
+        :return: Transaction ou None si absente du tampon.
+        """
+        return self.txs.get(txid)
+
+    def oldest(self, n: int, exclude: Container = ()) -> List[Transaction]:
+        """
+        Plus anciennes transactions du tampon sans copier tout le tampon.
+
+        :param n: Nombre maximum de transactions.
+        :param exclude: Hashs des transactions à ignorer.
+        :return: Transactions dans l'ordre d'arrivée.
+        """
+        res = []
+        with self.lock:
+            for txid, tx in self.txs.items():
+                if len(res) >= n: break
+                if txid not in exclude: res.append(tx)
+        return res
+
+    def clear(self):
+        with self.lock:
+            self.txs.clear()
+            self.spent.clear()
+            self.sizes.clear()
+            self.bytes = 0
+
+    def __contains__(self, tx: Union[Transaction, str]) -> bool:
+        return self._txid(tx) in self.txs
+
+    def __len__(self) -> int:
+        return len(self.txs)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """
+        Parcours des transactions dans l'ordre d'arrivée sur une copie
+        pour ne pas être interrompu par les autres threads.
+        """
+        with self.lock:
+            return iter(list(self.txs.values()))
+
+    def stats(self) -> dict:
+        """
+        Compteurs d'utilisation du tampon.
+
+        :return: Dictionnaire des compteurs.
+        """
+        return {"size": len(self.txs), "bytes": self.bytes, "added": self.added,
+            "conflicts": self.conflicts, "evictions": self.evictions}
@@ -118,3 +118,87 @@ class MerkleTree:
             hash = sum_hash(hash, proof.pop())
 
         return root == hash
+
+
+class IncrementalMerkleTree:
+    """
+    Arbre de Merkle mis à jour feuille par feuille.
+
+    Chaque étage de l'arbre est conservé sous forme d'une liste de hashs.
+    La modification, l'ajout ou le retrait de la dernière feuille ne recalcule
+    que les hashs du chemin de la feuille jusqu'à la racine. La racine est
+    identique à celle d'un MerkleTree construit sur les mêmes hashs.
+    """
+    def __init__(self, hashs: Optional[List[str]] = None):
+        """
+        :param hashs: Liste de hashs initiale.
+        """
+        # Étages de l'arbre des feuilles (0) jusqu'à la racine
+        self.levels = [[]]
+        for hash in [] if hashs is None else hashs:
+            self.append(hash)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def _refresh(self, index: int):
+        """
+        Recalcule les ancêtres d'une feuille et ajuste la taille des étages.
+
+        :param index: Indice de la feuille modifiée.
+        """
+        k = 0
+        while len(self.levels[k]) > 1:
+            level = self.levels[k]
+            if k+1 == len(self.levels):
+                self.levels.append([])
+            upper = self.levels[k+1]
+            del upper[(len(level)+1) // 2:]
+
+            # Dernier arbre impair ou fusion de 2 arbres
+            left = index - index % 2
+            hash = level[left] if left+1 == len(level) else sum_hash(level[left], level[left+1])
+            index //= 2
+            if index < len(upper):
+                upper[index] = hash
+            else:
+                upper.append(hash)
+            k += 1
+        del self.levels[k+1:]
+
+    def append(self, hash: str):
+        """
+        Ajoute une feuille en fin d'arbre.
+
+        :param hash: String du hash de la feuille.
+        """
+        self.levels[0].append(hash)
+        self._refresh(len(self.levels[0]) - 1)
+
+    def set(self, index: int, hash: str):
+        """
+        Remplace le hash d'une feuille.
+
+        :param index: Indice de la feuille.
+        :param hash: String du nouveau hash.
+        """
+        self.levels[0][index] = hash
+        self._refresh(index)
+
+    def pop(self) -> str:
+        """
+        Retire la dernière feuille de l'arbre.
+
+        :return: String du hash retiré.
+        """
+        hash = self.levels[0].pop()
+        self._refresh(max(len(self.levels[0]) - 1, 0))
+        return hash
+
+    def get_root(self) -> Optional[str]:
+        """
+        Renvoie le hash de la racine de l'arbre de Merkle.
+
+        :return: String du hash correspondant ou None si l'arbre est vide.
+        """
+        return self.levels[-1][0] if len(self.levels[0]) > 0 else None
@@ -1,9 +1,9 @@
 import threading, random
 from mini_btc import FullNode
 from mini_btc import Transaction
-from mini_btc import MerkleTree
-from mini_btc.utils import sha256, address_from_pubkey
-from typing import List
+from mini_btc import BlockTemplate
+from mini_btc.utils import sha256, short_txid
+from typing import Tuple, Union
 
 
 class Miner(FullNode):
@@ -13,7 +13,8 @@ class Miner(FullNode):
     """
     def __init__(self, pubkey: str, listen_host: str, listen_port: int,
         remote_host: str = None, remote_port: int = None, max_nodes: int = 10,
-        block_size: int = 3, difficulty: int = 5, verbose: int = 2):
+        block_size: int = 3, difficulty: int = 5, verbose: int = 2,
+        engine: str = "threading", compact_blocks: bool = True):
         """
         Création d'un mineur appartenant à la BlockChain.
 
@@ -32,13 +33,21 @@ class Miner(FullNode):
         au nombre de 0 attendus en début de hash. Plus ce nombre est élevé
         plus la difficulté est grande.
         :param verbose: Niveau de verbosité entre 0 et 2.
+        :param engine: Moteur réseau "threading" ou "asyncio".
+        :param compact_blocks: Si True les blocs résolus sont soumis sous forme
+        compacte: les noeuds les reconstruisent à partir de leur tampon de transactions.
         """
         super().__init__(listen_host, listen_port, remote_host, remote_port,
-            max_nodes, block_size, difficulty, verbose)
+            max_nodes, block_size, difficulty, verbose, engine)
 
         self.pubkey = pubkey
+        self.compact_blocks = compact_blocks
         self.is_mining = False
         self.mining_cond = threading.Condition()
+        # Arrêt définitif du thread de minage
+        self.stopped = False
+        # Modèle du prochain bloc mis à jour au fil des transactions
+        self.template = BlockTemplate(pubkey, block_size-1)
 
     def start(self):
         """
@@ -55,10 +64,7 @@ class Miner(FullNode):
         :param port: Port associée à cette adresse.
         :param body: Objet Python du corps du paquet.
         """
-        # Réveil du thread de minage
-        # Il vérifie en interne s'il peut miner
-        with self.mining_cond:
-            self.mining_cond.notify_all()
+        self._update_template()
 
     def _delete_tx(self, tx: set):
         """
@@ -68,90 +74,112 @@ class Miner(FullNode):
         """
         super()._delete_tx(tx)
 
-        # Arrêt du minage du bloc courant
-        # Le minage reprend automatiquement s'il y a assez de transactions
-        self.is_mining = False
+        # Le minage bascule sur le modèle mis à jour
+        # Il s'arrête si le modèle n'a plus assez de transactions
+        self._update_template()
+
+    def _update_template(self):
+        """
+        Met à jour le modèle du prochain bloc: chaînage au dernier bloc du registre,
+        retrait des transactions qui ne sont plus dans le tampon puis ajout des
+        plus anciennes transactions du tampon tant que le bloc n'est pas plein.
+        Réveille le thread de minage si le modèle est prêt.
+        """
+        template = self.template
+        with template.lock:
+            index = len(self.ledger)
+            parent = self.block_hashes[-1] if len(self.block_hashes) > 0 else None
+            if (template.index, template.parent) != (index, parent):
+                template.reset(index, parent)
+            for tx in template.txs.copy():
+                if tx["hash"] not in self.buf_tx:
+                    template.remove(tx["hash"])
+            if not template.full:
+                for tx in self.buf_tx.oldest(template.size - len(template), template.positions):
+                    template.add(tx)
+            full = template.full
+
+        # Le thread de minage vérifie en interne s'il peut miner
+        if full:
+            with self.mining_cond:
+                self.mining_cond.notify_all()
+
+    def __work(self) -> Tuple[int, Union[dict, None]]:
+        """
+        Bloc à miner selon le modèle courant.
+
+        :return: Version du modèle et bloc ou None si le modèle n'est pas plein.
+        """
+        with self.template.lock:
+            version = self.template.version
+            if not self.template.full:
+                return version, None
+            return version, self.template.block(random.randint(0, 1_000_000_000))
 
-    def __mine(self, block: object):
+    def __mine(self) -> Union[dict, None]:
         """
-        Minage d'un bloc en incrémentant le nonce.
+        Minage du modèle en incrémentant le nonce. Lorsque le modèle change
+        le minage continue sur le nouveau bloc sans être interrompu.
 
-        :param block: Bloc à miner.
+        :return: Bloc résolu ou None si le minage a été arrêté.
         """
         if 0 < self.verbose: self.logging("START MINING...")
 
-        while self.is_mining and not self._check_block(block, check_tx=False):
+        version, block = self.__work()
+        while block is not None and self.is_mining and not self._check_block(block, check_tx=False):
             block["nonce"] += 1
+            # Bascule sur la nouvelle version du modèle
+            if self.template.version != version:
+                nonce = block["nonce"]
+                version, block = self.__work()
+                if block is not None: block["nonce"] = nonce
 
         if 0 < self.verbose: self.logging("...STOP MINING")
 
+        return block if self.is_mining else None
+
     def __mine_routine(self):
         """
         Routine de minage à appeler dans un thread.
         Lorsque le bloc est résolu il est automatiquement soumis au réseau.
-        Pour indiquer au mineur de changer de bloc à miner il faut assigner
+        Pour indiquer au mineur d'arrêter de miner le bloc courant il faut assigner
         self.is_mining = False
         """
-        block = None
         while True:
             with self.mining_cond:
-                # On démarre le minage si on a reçu suffisamment de transactions
-                while len(self.buf_tx) < self.block_size-1:
+                # On démarre le minage si le modèle contient suffisamment de transactions
+                while not self.template.full and not self.stopped:
                     # Attente passive
                     self.mining_cond.wait()
+                if self.stopped:
+                    return
 
-            # Sélection aléatoire des transactions candidates
-            block_tx = []
-            wrong_tx = set()
-            for tx in self.buf_tx.copy():
-                # La transaction est-elle valide ?
-                if self.check_tx(tx):
-                    block_tx.append(tx.to_dict())
-                else:
-                    wrong_tx.add(tx)
-                # Suffisamment de transactions valides ?
-                if len(block_tx) == self.block_size-1: break
-
-            # Suppression des transactions invalides
-            super()._delete_tx(wrong_tx)
-
-            # Activation du minage
-            if len(block_tx) == self.block_size-1:
+                # Les transactions du modèle ont été vérifiées à leur admission
                 self.is_mining = True
-            else: continue
-
-            # Récompense de minage de 50 BTC
-            reward_tx = Transaction()
-            address = address_from_pubkey(self.pubkey)
-            lock = f"{self.pubkey} CHECKSIG"
-            reward_tx.add_output(address, 50, lock)
-            block_tx.append(reward_tx.to_dict())
-
-            # Construction d'un bloc à miner
-            block = {
-                # Numéro de bloc indexé à partir de 0
-                "index": len(self.ledger),
-                # Hash du bloc précédent auquel on se chaîne
-                "hash": None if len(self.ledger) == 0 else sha256(self.ledger[-1]),
-                # Hash de la racine de l'arbre de Merkle
-                "root": MerkleTree([tx["hash"] for tx in block_tx]).get_root(),
-                # Valeur à incrémenter pour le minage
-                "nonce": random.randint(0, 1_000_000_000),
-                # Liste des transactions du bloc
-                "tx": block_tx
-            }
-
-            # Minage du bloc
-            self.__mine(block)
+            block = self.__mine()
 
             # Si on croit avoir gagné la compétition
-            if self.is_mining:
+            if block is not None:
                 # Enregistrement du bloc dans le registre
                 if self._add_block(block):
                     if 0 < self.verbose: self.logging("!!! BLOCK FOUND !!!")
                     # Soumission du bloc
                     self.submit_block(block)
-                self.is_mining = False
+                else:
+                    # Retrait des transactions devenues invalides entre-temps
+                    txs = [Transaction(tx, tx["hash"]) for tx in block["tx"][:-1]]
+                    self._delete_tx({tx for tx, valid in zip(txs, self.check_txs(txs)) if not valid})
+            self.is_mining = False
+
+    def shutdown(self):
+        """
+        Éteins le mineur après avoir arrêté son thread de minage.
+        """
+        with self.mining_cond:
+            self.stopped = True
+            self.is_mining = False
+            self.mining_cond.notify_all()
+        super().shutdown()
 
     def submit_block(self, block: object):
         """
@@ -159,5 +187,16 @@ class Miner(FullNode):
 
         :param block: Objet Python du bloc à soumettre.
         """
-        req = {"request": "SUBMIT_BLOCK", "block": block}
-        self.broadcast(req)
+        if self.compact_blocks:
+            # En-tête et identifiants courts des transactions
+            # Les transactions sans entrée (récompense) ne sont pas diffusées
+            # à l'avance et sont donc préremplies
+            compact = {"index": block["index"], "hash": block["hash"],
+                "root": block["root"], "nonce": block["nonce"],
+                "shortids": [short_txid(tx["hash"]) for tx in block["tx"]],
+                "prefilled": [[pos, tx] for pos, tx in enumerate(block["tx"])
+                    if len(tx["input"]) == 0]}
+            req = {"request": "SUBMIT_BLOCK", "compact": compact}
+        else:
+            req = {"request": "SUBMIT_BLOCK", "block": block}
+        self.broadcast(req, id=sha256(block))
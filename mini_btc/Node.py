@@ -1,16 +1,23 @@
-import socket, threading, time
-from mini_btc.utils import send, recv, logging
+import socket, time
+from mini_btc.utils import logging
+from mini_btc.ConnectionPool import ConnectionPool
+from mini_btc.AsyncioPool import AsyncioPool
+from mini_btc.PacketCache import PacketCache, PacketStore
 from typing import Union
 
 
 class Node:
     """
     Noeud du réseau pair à pair agissant à la fois comme un client et un serveur.
-    Les communications utilisent des sockets temporaires unidirectionnels.
+    Les communications utilisent des connexions persistantes et bidirectionnelles
+    conservées dans un ensemble de connexions par noeud voisin.
     """
     def __init__(self, listen_host: str, listen_port: int,
         remote_host: str = None, remote_port: int = None, max_nodes: int = 10,
-        verbose: int = 2):
+        verbose: int = 2, idle_timeout: float = 60.0, engine: str = "threading",
+        compression: bool = True, dedup_capacity: int = 100_000,
+        dedup_ttl: float = 600.0, dedup_bloom: bool = False, send_timeout: float = 5.0,
+        inventory: bool = True, relay_capacity: int = 10_000):
         """
         Lorsque un noeud est créé il doit se connecter à un noeud du réseau.
         préexistant. Si c'est le premier alors il n'y a pas besoin de préciser
@@ -22,6 +29,25 @@ class Node:
         :param remote_port: Port associé à cette adresse.
         :param max_nodes: Nombre maximum de voisins actifs à conserver.
         :param verbose: Niveau de verbosité entre 0 et 2.
+        :param idle_timeout: Durée en secondes au-delà de laquelle une connexion
+        inutilisée avec un noeud est fermée.
+        :param engine: Moteur réseau "threading" (un thread par connexion et
+        par paquet) ou "asyncio" (une boucle d'événements et un nombre borné
+        de threads pour traiter les paquets).
+        :param compression: Si True propose la compression zlib des grands paquets
+        aux noeuds distants.
+        :param dedup_capacity: Nombre maximum d'identifiants de paquets diffusés
+        retenus pour éviter les cycles.
+        :param dedup_ttl: Durée en secondes pendant laquelle un identifiant est retenu.
+        :param dedup_bloom: Si True les identifiants oubliés sont encore reconnus
+        par un filtre de Bloom tournant.
+        :param send_timeout: Délai maximum en secondes de connexion et d'envoi
+        à un noeud voisin. Au-delà le noeud est considéré comme inactif.
+        :param inventory: Si True les paquets diffusés sont annoncés aux voisins
+        par leur identifiant (INV) et envoyés seulement à ceux qui les demandent
+        (GETDATA). Sinon ils sont envoyés en entier à tous les voisins.
+        :param relay_capacity: Nombre maximum de paquets diffusés conservés
+        pour répondre aux demandes des voisins.
         """
         self.host = listen_host
         self.port = listen_port
@@ -30,10 +56,15 @@ class Node:
         assert verbose in [0, 1, 2]
         self.verbose = verbose
 
-        # Identifiants des paquets reçus
-        self.packet_ids = set()
-        # Verrou sur packet_ids
-        self.lock_packet_ids = threading.Lock()
+        # Identifiants des paquets reçus récemment
+        self.packet_ids = PacketCache(dedup_capacity, dedup_ttl, dedup_bloom)
+
+        # Paquets diffusés récemment pouvant être demandés par les voisins
+        self.inventory = inventory
+        self.relay = PacketStore(relay_capacity, dedup_ttl)
+        # Identifiants demandés en attente de réception
+        # Ils peuvent être redemandés à un autre voisin après send_timeout secondes
+        self.requested = PacketCache(dedup_capacity, send_timeout)
 
         # Ensemble des noeuds voisins actifs
         self.nodes = set()
@@ -48,58 +79,62 @@ class Node:
         # Le serveur a un buffer de 100 connexions
         self.sock.listen(100)
 
+        # Connexions persistantes avec les autres noeuds
+        assert engine in ["threading", "asyncio"]
+        self.engine = engine
+        compression = ["zlib"] if compression else []
+        if engine == "asyncio":
+            self.pool = AsyncioPool(self.host, self.port, self.__packet_callback,
+                idle_timeout, compression=compression, on_failure=self.__peer_failure,
+                timeout=send_timeout)
+        else:
+            self.pool = ConnectionPool(self.host, self.port, self.__packet_callback,
+                idle_timeout, compression=compression, on_failure=self.__peer_failure,
+                timeout=send_timeout)
+
     def __broadcast(self, pck: object):
         """
         Diffusion sur le réseau d'un paquet.
 
         :param pck: Objet Python contenant le champ id.
         """
-        connection_refused = False
-
         # On ne renvoie pas si on a déjà envoyé pour éviter les cycles
-        self.lock_packet_ids.acquire()
-        if pck["id"] not in self.packet_ids:
-            # Il faudrait vider cet ensemble après un certain temps
-            self.packet_ids.add(pck["id"])
-            self.lock_packet_ids.release()
-
+        if self.packet_ids.add(pck["id"]):
             # Exécution de la callback sur le corps du paquet
-            self._broadcast_callback(pck["host"], pck["port"], pck["id"], pck["body"].copy())
+            # qui peut différer la diffusion du paquet aux voisins
+            if self._broadcast_callback(pck["host"], pck["port"], pck["id"], pck["body"].copy()) is not False:
+                self._relay(pck)
 
-            for host, port in self.nodes.copy():
-                try:
-                    send(host, port, pck, ignore_errors=False)
-                # Le noeud voisin est inactif
-                except ConnectionRefusedError:
-                    connection_refused = True
-                    self.nodes.remove((host, port))
-        else:
-            self.lock_packet_ids.release()
-
-        # Recherche de nouveaux voisins
-        if connection_refused:
-            self.connect()
+    def _relay(self, pck: object):
+        """
+        Diffusion aux voisins d'un paquet déjà traité par ce noeud.
 
-    def __wait(self):
+        :param pck: Objet Python du paquet diffusé.
         """
-        Fonction appelée par un thread principal permettant l'écoute des
-        connexions entrantes en provenance des autres noeuds du réseau.
+        # Annonce du paquet aux voisins qui le demanderont s'ils ne l'ont pas
+        if self.inventory:
+            self.relay.put(pck["id"], pck)
+            pck = {"header": "INV", "host": self.host, "port": self.port, "ids": [pck["id"]]}
+
+        # Les envois aux voisins ont lieu en parallèle
+        for host, port in self.nodes.copy():
+            self.pool.post(host, port, pck)
 
-        Lorsqu'un paquet arrive il est alors traité dans un thread séparé pour
-        ne pas bloquer le thread principal d'écoute.
+    def __peer_failure(self, host: str, port: int):
         """
-        while True:
-            try:
-                # Attente de clients
-                sock, ip_client = self.sock.accept()
-            # Le socket a été fermé
-            except OSError:
-                break
+        Fonction appelée par l'ensemble des connexions lorsqu'un paquet
+        n'a pas pu être envoyé à un noeud.
 
-            # On traite la requête du client dans un thread séparé
-            threading.Thread(target=self.__packet_callback, args=(sock,)).start()
+        :param host: Adresse du noeud.
+        :param port: Port associé à cette adresse.
+        """
+        # Le noeud voisin est inactif
+        if (host, port) in self.nodes:
+            self.nodes.discard((host, port))
+            # Recherche de nouveaux voisins
+            self.connect()
 
-    def __packet_callback(self, sock: socket.socket):
+    def __packet_callback(self, pck: object):
         """
         Fonction appelée dans un thread lors de la réception d'un paquet.
         Elle gère différentes en-têtes de paquet.
@@ -107,12 +142,12 @@ class Node:
         CONNECT: Première demande de connexion d'un noeud.
         CONNECT_ACCEPTED: Connexion d'un noeud acceptée.
         BROADCAST: Diffusion d'un paquet sur le réseau.
+        INV: Annonce des identifiants de paquets diffusés.
+        GETDATA: Demande des paquets diffusés correspondant à des identifiants.
         PRIVATE: Paquet privé à ne pas diffuser.
-        """
-        # Réception du paquet
-        pck = recv(sock)
-        sock.close()
 
+        :param pck: Paquet reçu.
+        """
         if self.verbose == 1:
             log = pck["header"]
             if "host" in pck and "port" in pck:
@@ -128,13 +163,13 @@ class Node:
         if "CONNECT" == pck["header"]:
             # Le format JSON ne connaît que les listes pas les ensembles
             rpck = {"header": "CONNECT_ACCEPTED", "nodes": list(self.nodes)}
-            send(pck["host"], pck["port"], rpck)
+            self.pool.send(pck["host"], pck["port"], rpck)
 
             # Notification du nouvel arrivant à tous les noeuds voisins
             # Attention: Ce n'est pas un broadcast !
             rpck["nodes"] = [(pck["host"], pck["port"])]
             for host, port in self.nodes.copy():
-                send(host, port, rpck)
+                self.pool.post(host, port, rpck)
 
             # Enregistrement du nouvel arrivant si le nombre de connexions
             # actives n'est pas dépassé
@@ -155,6 +190,22 @@ class Node:
             # Diffusion du paquet sur le réseau
             self.__broadcast(pck)
 
+        # Annonce de paquets diffusés par un voisin
+        elif "INV" == pck["header"]:
+            # On ne demande que les paquets inconnus et pas déjà demandés
+            ids = [id for id in pck["ids"]
+                if id not in self.packet_ids and self.requested.add(id)]
+            if len(ids) > 0:
+                rpck = {"header": "GETDATA", "host": self.host, "port": self.port, "ids": ids}
+                self.pool.post(pck["host"], pck["port"], rpck)
+
+        # Demande de paquets annoncés
+        elif "GETDATA" == pck["header"]:
+            for id in pck["ids"]:
+                rpck = self.relay.get(id)
+                if rpck is not None:
+                    self.pool.post(pck["host"], pck["port"], rpck)
+
         # Paquet privé à ne pas diffuser
         elif "PRIVATE" == pck["header"]:
             self._private_callback(pck["host"], pck["port"], pck["body"].copy())
@@ -169,6 +220,8 @@ class Node:
         :param port: Port associée à cette adresse.
         :param id: Identifiant du paquet.
         :param body: Objet Python du corps du paquet.
+        :return: False pour ne pas diffuser le paquet aux voisins. Il peut
+        l'être plus tard avec self._relay. Sinon le paquet est diffusé.
         """
         pass
 
@@ -198,14 +251,14 @@ class Node:
         """
         for host, port in self.nodes.copy():
             pck = {"header": "CONNECT", "host": self.host, "port": self.port}
-            send(host, port, pck)
+            self.pool.post(host, port, pck)
 
     def start(self):
         """
         Démarre le noeud en le connectant au réseau.
         """
         # Attente de connexions
-        threading.Thread(target=self.__wait).start()
+        self.pool.serve(self.sock)
 
         # Récupération de la liste des noeuds voisins
         self.connect()
@@ -213,10 +266,11 @@ class Node:
     def shutdown(self):
         """
         Éteins le noeud en lui indiquant d'arrêter d'écouter les connexions entrantes.
+        Les connexions persistantes sont fermées.
         """
-        self.sock.shutdown(socket.SHUT_RDWR)
+        self.pool.close()
 
-    def broadcast(self, body: object):
+    def broadcast(self, body: object, id: str = None):
         """
         Diffusion sur le réseau d'un objet Python.
         Cet objet sera encapsulé dans un paquet de la couche pair à pair.
@@ -224,9 +278,13 @@ class Node:
         la requête. Il s'agit du même identifiant que celui du paquet.
 
         :param body: Objet Python sérialiable en JSON.
+        :param id: Identifiant du paquet. Un identifiant dérivé du contenu
+        (hash de transaction ou de bloc) permet aux noeuds de reconnaître
+        un contenu déjà reçu. Par défaut l'identifiant est généré.
         """
         # On suppose qu'un noeud ne peut pas envoyer plusieurs paquets au même moment
-        id = f"{self.name}#{time.time()}"
+        if id is None:
+            id = f"{self.name}#{time.time()}"
         pck = {"header": "BROADCAST", "host": self.host, "port": self.port, "id": id, "body": body}
         if self.verbose == 2: self.logging(pck["body"])
         self.__broadcast(pck)
@@ -243,4 +301,4 @@ class Node:
         """
         pck = {"header": "PRIVATE", "host": self.host, "port": self.port, "body": body}
         if self.verbose == 2: self.logging(pck["body"])
-        send(remote_host, remote_port, pck)
+        self.pool.send(remote_host, remote_port, pck)
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from typing import List
+
+
+class OrphanPool:
+    """
+    Ensemble borné des blocs orphelins, c'est-à-dire des blocs reçus
+    avant leur bloc parent.
+
+    Les blocs sont indexés par hash du bloc parent pour être rattachés
+    dès que ce dernier est ajouté. Lorsque la capacité est dépassée
+    les blocs les plus anciens sont oubliés.
+    """
+    def __init__(self, capacity: int = 100):
+        """
+        :param capacity: Nombre maximum de blocs conservés.
+        Aucun bloc n'est conservé si 0.
+        """
+        assert capacity >= 0
+        self.capacity = capacity
+
+        # Hash du bloc -> bloc dans l'ordre d'arrivée
+        self.entries = OrderedDict()
+        # Hash du bloc parent -> hashs des blocs enfants dans l'ordre d'arrivée
+        self.children = dict()
+        # Verrou sur entries et children
+        self.lock = threading.Lock()
+
+    def __remove(self, hash: str) -> dict:
+        """
+        Retire un bloc des deux index.
+        """
+        block = self.entries.pop(hash)
+        siblings = self.children[block["hash"]]
+        siblings.remove(hash)
+        if len(siblings) == 0:
+            del self.children[block["hash"]]
+        return block
+
+    def add(self, hash: str, block: dict) -> bool:
+        """
+        Enregistre un bloc orphelin.
+
+        :param hash: Hash du bloc.
+        :param block: Objet Python du bloc.
+        :return: True si le bloc est nouveau False sinon.
+        """
+        with self.lock:
+            if self.capacity == 0 or hash in self.entries:
+                return False
+
+            self.entries[hash] = block
+            if block["hash"] not in self.children:
+                self.children[block["hash"]] = []
+            self.children[block["hash"]].append(hash)
+
+            while len(self.entries) > self.capacity:
+                self.__remove(next(iter(self.entries)))
+
+            return True
+
+    def pop_children(self, parent: str) -> List[dict]:
+        """
+        Retire les blocs enfants d'un bloc.
+
+        :param parent: Hash du bloc parent.
+        :return: Liste des blocs enfants dans l'ordre d'arrivée.
+        """
+        with self.lock:
+            hashes = list(self.children.get(parent, ()))
+            return [self.__remove(hash) for hash in hashes]
+
+    def __contains__(self, hash: str) -> bool:
+        return hash in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
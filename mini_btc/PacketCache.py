@@ -0,0 +1,221 @@
+import threading, time, hashlib, math
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom de taille fixe.
+    Un élément ajouté est toujours reconnu, un élément absent peut être
+    reconnu à tort avec une probabilité error_rate.
+    """
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        """
+        :param capacity: Nombre d'éléments pour lequel le filtre est dimensionné.
+        :param error_rate: Taux de faux positifs visé à pleine capacité.
+        """
+        assert capacity > 0 and 0 < error_rate < 1
+        # Nombre de bits et de fonctions de hachage optimaux
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.nhash = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __indexes(self, key: str):
+        """
+        Positions des bits d'une clé par double hachage.
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.nhash):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for index in self.__indexes(key):
+            self.bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self.__indexes(key))
+
+
+class RotatingBloomFilter:
+    """
+    Couple de filtres de Bloom tournants. Lorsque le filtre courant est plein
+    il remplace le précédent et un nouveau filtre vide est créé.
+    Un élément est ainsi retenu pendant au moins capacity insertions
+    avec une mémoire constante.
+    """
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        """
+        :param capacity: Nombre d'éléments d'un filtre avant rotation.
+        :param error_rate: Taux de faux positifs visé d'un filtre.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = None
+
+    def add(self, key: str):
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+        self.current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.current or (self.previous is not None and key in self.previous)
+
+
+class PacketCache:
+    """
+    Ensemble borné des identifiants de paquets déjà reçus.
+
+    Les identifiants sont conservés dans l'ordre de leur dernière utilisation
+    et oubliés après ttl secondes ou lorsque la capacité est dépassée (LRU).
+    Un filtre de Bloom tournant peut prolonger la mémoire des identifiants
+    oubliés pour une taille constante, au prix de rares faux positifs.
+    """
+    def __init__(self, capacity: int = 100_000, ttl: float = 600.0, bloom: bool = False):
+        """
+        :param capacity: Nombre maximum d'identifiants conservés.
+        :param ttl: Durée en secondes au-delà de laquelle un identifiant est oublié.
+        :param bloom: Si True ajoute un filtre de Bloom tournant de même capacité.
+        """
+        assert capacity > 0 and ttl > 0
+        self.capacity = capacity
+        self.ttl = ttl
+
+        # Identifiant -> date de dernière utilisation
+        self.entries = OrderedDict()
+        self.bloom = RotatingBloomFilter(capacity) if bloom else None
+        # Verrou sur entries et bloom
+        self.lock = threading.Lock()
+
+        # Compteurs
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __expire(self, now: float):
+        """
+        Oublie les identifiants plus anciens que ttl.
+        """
+        while len(self.entries) > 0:
+            id, date = next(iter(self.entries.items()))
+            if now - date <= self.ttl:
+                break
+            self.entries.popitem(last=False)
+            self.expirations += 1
+
+    def add(self, id: str) -> bool:
+        """
+        Enregistre un identifiant de paquet.
+
+        :param id: Identifiant du paquet.
+        :return: True si l'identifiant est nouveau False s'il a déjà été vu.
+        """
+        with self.lock:
+            now = time.time()
+            self.__expire(now)
+
+            if id in self.entries:
+                self.hits += 1
+                self.entries[id] = now
+                self.entries.move_to_end(id)
+                return False
+
+            if self.bloom is not None and id in self.bloom:
+                self.hits += 1
+                return False
+
+            self.misses += 1
+            self.entries[id] = now
+            if self.bloom is not None:
+                self.bloom.add(id)
+
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+            return True
+
+    def __contains__(self, id: str) -> bool:
+        with self.lock:
+            self.__expire(time.time())
+            return id in self.entries or (self.bloom is not None and id in self.bloom)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def stats(self) -> dict:
+        """
+        Compteurs d'utilisation du cache.
+
+        :return: Dictionnaire des compteurs.
+        """
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+            "evictions": self.evictions, "expirations": self.expirations}
+
+
+class PacketStore:
+    """
+    Ensemble borné des paquets diffusés récemment indexés par identifiant.
+    Il permet de répondre aux demandes de paquets annoncés aux voisins.
+
+    Les paquets sont oubliés après ttl secondes ou lorsque la capacité
+    est dépassée, les plus anciens en premier.
+    """
+    def __init__(self, capacity: int = 10_000, ttl: float = 600.0):
+        """
+        :param capacity: Nombre maximum de paquets conservés.
+        :param ttl: Durée en secondes au-delà de laquelle un paquet est oublié.
+        """
+        assert capacity > 0 and ttl > 0
+        self.capacity = capacity
+        self.ttl = ttl
+
+        # Identifiant -> (date d'ajout, paquet)
+        self.entries = OrderedDict()
+        # Verrou sur entries
+        self.lock = threading.Lock()
+
+    def __expire(self, now: float):
+        """
+        Oublie les paquets plus anciens que ttl.
+        """
+        while len(self.entries) > 0:
+            id, (date, pck) = next(iter(self.entries.items()))
+            if now - date <= self.ttl:
+                break
+            self.entries.popitem(last=False)
+
+    def put(self, id: str, pck: object):
+        """
+        Enregistre un paquet.
+
+        :param id: Identifiant du paquet.
+        :param pck: Paquet à conserver.
+        """
+        with self.lock:
+            now = time.time()
+            self.__expire(now)
+            self.entries[id] = (now, pck)
+            self.entries.move_to_end(id)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def get(self, id: str) -> object:
+        """
+        Donne un paquet enregistré.
+
+        :param id: Identifiant du paquet.
+        :return: Paquet ou None s'il est absent ou oublié.
+        """
+        with self.lock:
+            self.__expire(time.time())
+            entry = self.entries.get(id)
+            return None if entry is None else entry[1]
+
+    def __len__(self) -> int:
+        return len(self.entries)
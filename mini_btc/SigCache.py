@@ -0,0 +1,91 @@
+import hashlib, threading
+from collections import OrderedDict
+from typing import Tuple
+
+
+class SigCache:
+    """
+    Ensemble borné des vérifications de signatures réussies.
+
+    Une vérification est identifiée par la transaction qui dépense, l'indice
+    de l'entrée et la clé publique du script verrouillant. Une transaction
+    déjà vérifiée dans le tampon n'est donc pas revérifiée lorsqu'elle arrive
+    dans un bloc. Les vérifications les moins récemment utilisées
+    sont oubliées lorsque la capacité est dépassée (LRU).
+    """
+    def __init__(self, capacity: int = 100_000):
+        """
+        :param capacity: Nombre maximum de vérifications conservées.
+        Aucune vérification n'est conservée si 0.
+        """
+        assert capacity >= 0
+        self.capacity = capacity
+
+        # Clés des vérifications dans l'ordre de dernière utilisation
+        self.entries = OrderedDict()
+        # Verrou sur entries
+        self.lock = threading.Lock()
+
+        # Compteurs
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(txid: str, index: int, pubkey: str) -> Tuple[str, int, bytes]:
+        """
+        Clé d'une vérification. La clé publique est réduite à une empreinte
+        pour ne pas conserver des centaines d'octets par entrée.
+
+        :param txid: Hash de la transaction qui dépense.
+        :param index: Indice de l'entrée dans cette transaction.
+        :param pubkey: Clé publique du script verrouillant.
+        :return: Clé de la vérification.
+        """
+        return txid, index, hashlib.blake2b(pubkey.encode("utf-8"), digest_size=16).digest()
+
+    def lookup(self, key: tuple) -> bool:
+        """
+        Recherche une vérification réussie.
+
+        :param key: Clé de la vérification.
+        :return: True si la vérification a déjà réussi False sinon.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key: tuple):
+        """
+        Enregistre une vérification réussie.
+
+        :param key: Clé de la vérification.
+        """
+        if self.capacity == 0:
+            return
+        with self.lock:
+            self.entries[key] = None
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def stats(self) -> dict:
+        """
+        Compteurs d'utilisation du cache.
+
+        :return: Dictionnaire des compteurs et du taux de succès.
+        """
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+            "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups > 0 else 0.0}
@@ -1,5 +1,4 @@
-from mini_btc.utils import sha256, json_encode
-from typing import Tuple
+from mini_btc.utils import sha256, json_encode, Prehashed
 from time import time
 from typing import Optional
 
@@ -12,27 +11,87 @@ class Transaction:
     * Sorties: Les UTXO càd les transactions produites.
     * Locktime: Date d'émission de la transaction.
     * Hash: Identification de la transaction.
+
+    Une transaction créée à partir d'un dictionnaire est immuable. Une transaction
+    vide le devient dès que son dictionnaire est demandé. Sa représentation binaire
+    et son hash sont alors calculés une seule fois et conservés.
     """
-    def __init__(self, tx: Optional[dict] = None):
+    __slots__ = ("input", "output", "_locktime", "_txid", "_raw", "_sighash")
+
+    def __init__(self, tx: Optional[dict] = None, txid: Optional[str] = None):
         """
         Création d'une transaction.
 
         :param tx: Initialisation à partir du dictionnaire d'une transaction.
+        :param txid: Hash déjà vérifié de la transaction (registre) pour ne pas
+        le recalculer. Sinon il est calculé à la première demande.
         """
+        self._txid = txid if tx is not None else None
+        self._raw = None
+        self._sighash = None
         if tx is None:
             self.input = []
             self.output = []
-            self.locktime = time()
+            self._locktime = time()
         else:
-            self.input = tx["input"]
-            self.output = tx["output"]
-            self.locktime = tx["locktime"]
+            self.input = tuple(tx["input"])
+            self.output = tuple(tx["output"])
+            self._locktime = tx["locktime"]
+
+    @property
+    def locktime(self) -> float:
+        return self._locktime
+
+    @locktime.setter
+    def locktime(self, locktime: float):
+        if self.frozen:
+            raise AttributeError("La transaction est immuable")
+        self._locktime = locktime
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Indique si la transaction ne peut plus être modifiée.
+        """
+        return type(self.input) is tuple
+
+    def __freeze(self):
+        """
+        Rend la transaction immuable.
+        """
+        if not self.frozen:
+            self.input = tuple(self.input)
+            self.output = tuple(self.output)
+
+    @property
+    def txid(self) -> str:
+        """
+        Hash de la transaction calculé une seule fois.
+        """
+        if self._txid is None:
+            self.__freeze()
+            self._txid = sha256({"locktime": self.locktime,
+                "input": list(self.input), "output": list(self.output)})
+        return self._txid
+
+    @property
+    def sighash(self) -> Prehashed:
+        """
+        Empreinte du message signé par les entrées qui dépensent cette transaction.
+        Le message est la transaction sans son hash dont l'empreinte SHA256
+        est justement le txid: elle n'est donc jamais resérialisée.
+        """
+        if self._sighash is None:
+            self._sighash = Prehashed(bytes.fromhex(self.txid))
+        return self._sighash
 
     def __eq__(self, other: 'Transaction') -> bool:
-        return self.to_dict() == other.to_dict()
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.txid == other.txid
 
     def __hash__(self):
-        return int.from_bytes(self.to_dict()["hash"].encode("utf-8"), "big")
+        return hash(self.txid)
 
     def add_input(self, prevTxHash: str, index: int, unlock: str):
         """
@@ -42,6 +101,8 @@ class Transaction:
         :param index: Indice de la sortie de la transaction consommée.
         :param unlock: Argument pour déverrouiller la UTXO désignée.
         """
+        if self.frozen:
+            raise AttributeError("La transaction est immuable")
         self.input.append({"prevTxHash": prevTxHash, "index": index, "unlock": unlock})
 
     def add_output(self, address: str, value: int, lock: str):
@@ -52,6 +113,8 @@ class Transaction:
         :param value: Somme à envoyer à cette adresse.
         :param lock: Programme de verrouillage de la UTXO.
         """
+        if self.frozen:
+            raise AttributeError("La transaction est immuable")
         self.output.append({"address": address, "value": value, "lock": lock})
 
     def find_utxo(self, address: str) -> int:
@@ -70,12 +133,13 @@ class Transaction:
     def to_dict(self) -> dict:
         """
         Représentation sous forme de dictionnaire de la transaction.
+        Un nouveau dictionnaire est renvoyé à chaque appel.
 
         :return: Dictionnaire de la transaction.
         """
-        tx = {"locktime": self.locktime, "input": self.input, "output": self.output}
-        tx["hash"] = sha256(tx)
-        return tx
+        txid = self.txid
+        return {"locktime": self.locktime, "input": list(self.input),
+            "output": list(self.output), "hash": txid}
 
     def raw_format(self) -> bytes:
         """
@@ -83,4 +147,6 @@ class Transaction:
 
         :return: Chaîne binaire de la transaction.
         """
-        return json_encode(self.to_dict())
+        if self._raw is None:
+            self._raw = json_encode(self.to_dict())
+        return self._raw
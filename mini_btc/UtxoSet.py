@@ -0,0 +1,103 @@
+from mini_btc.utils import sha256
+from typing import Iterator, Set, Tuple, Union
+
+
+class UtxoSet:
+    """
+    Ensemble des sorties de transaction non-dépensées (UTXO).
+
+    Chaque UTXO est identifiée par son point de sortie (hash de la transaction,
+    indice de la sortie) et seule la sortie (adresse, montant, verrou) est conservée.
+    Un index secondaire par adresse permet de retrouver les UTXO d'un porte-feuille.
+    """
+    def __init__(self):
+        # (txid, indice) -> sortie {"address", "value", "lock"}
+        self.entries = dict()
+        # Adresse -> ensemble des points de sortie
+        self.by_address = dict()
+
+    def add(self, txid: str, index: int, utxo: dict):
+        """
+        Enregistre une sortie non-dépensée.
+
+        :param txid: Hash de la transaction.
+        :param index: Indice de la sortie dans la transaction.
+        :param utxo: Dictionnaire de la sortie.
+        """
+        outpoint = (txid, index)
+        self.entries[outpoint] = utxo
+        address = utxo["address"]
+        if address not in self.by_address:
+            self.by_address[address] = set()
+        self.by_address[address].add(outpoint)
+
+    def add_tx(self, tx: dict):
+        """
+        Enregistre toutes les sorties d'une transaction.
+
+        :param tx: Dictionnaire de la transaction.
+        """
+        for index, utxo in enumerate(tx["output"]):
+            self.add(tx["hash"], index, utxo)
+
+    def spend(self, txid: str, index: int) -> Union[dict, None]:
+        """
+        Consomme une sortie.
+
+        :param txid: Hash de la transaction.
+        :param index: Indice de la sortie dans la transaction.
+        :return: Dictionnaire de la sortie ou None si elle n'existe pas
+        ou a déjà été dépensée.
+        """
+        outpoint = (txid, index)
+        utxo = self.entries.pop(outpoint, None)
+        if utxo is not None:
+            outpoints = self.by_address[utxo["address"]]
+            outpoints.discard(outpoint)
+            if len(outpoints) == 0:
+                del self.by_address[utxo["address"]]
+        return utxo
+
+    def get(self, txid: str, index: int) -> Union[dict, None]:
+        """
+        Donne une sortie non-dépensée.
+
+        :param txid: Hash de la transaction.
+        :param index: Indice de la sortie dans la transaction.
+        :return: Dictionnaire de la sortie ou None si absente.
+        """
+        return self.entries.get((txid, index))
+
+    def outpoints(self, address: str) -> Set[Tuple[str, int]]:
+        """
+        Donne les points de sortie non-dépensés d'une adresse.
+
+        :param address: Adresse à chercher.
+        :return: Ensemble des couples (txid, indice).
+        """
+        return set(self.by_address.get(address, ()))
+
+    def commitment(self) -> str:
+        """
+        Engagement sur le contenu de l'ensemble indépendant de l'ordre d'ajout.
+
+        :return: Hash des sorties triées par point de sortie.
+        """
+        return sha256([[txid, index, self.entries[(txid, index)]]
+            for txid, index in sorted(self.entries)])
+
+    def clear(self):
+        """
+        Oublie toutes les sorties.
+        """
+        self.entries.clear()
+        self.by_address.clear()
+
+    def __contains__(self, outpoint: Tuple[str, int]) -> bool:
+        return outpoint in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return iter(self.entries)
@@ -0,0 +1,83 @@
+import multiprocessing, os, threading
+from concurrent.futures import ProcessPoolExecutor
+from mini_btc.utils import dsa_verify
+from typing import List, Tuple
+
+
+def verify_batch(checks: List[Tuple[str, str, object]]) -> List[bool]:
+    """
+    Vérifie une suite de signatures dans un processus du pool.
+
+    :param checks: Liste de triplets (clé publique, signature, données signées).
+    :return: Résultat de chaque vérification.
+    """
+    return [dsa_verify(pubkey, sign, data) for pubkey, sign, data in checks]
+
+
+class VerifyPool:
+    """
+    Moteur de vérification des signatures réparties par lots
+    sur un pool de processus.
+
+    Le GIL empêche les threads de traiter les paquets d'utiliser plusieurs
+    coeurs alors que la vérification DSA est l'étape la plus coûteuse de la
+    validation. Les signatures d'un bloc ou d'un groupe de transactions sont
+    donc découpées en un lot par processus puis les résultats sont réunis.
+
+    Les processus sont créés par un serveur "forkserver" et n'héritent donc pas
+    des threads et des verrous du noeud. Le script principal doit protéger
+    son code par if __name__ == "__main__" car il est importé par ce serveur.
+    """
+    def __init__(self, workers: int = None, min_batch: int = 16):
+        """
+        :param workers: Nombre de processus. Par défaut le nombre de coeurs.
+        :param min_batch: Nombre minimum de signatures pour utiliser le pool.
+        Les lots plus petits sont vérifiés dans le thread appelant car le coût
+        de sérialisation dépasse alors le gain.
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        assert self.workers > 0
+        self.min_batch = min_batch
+
+        # Le pool est démarré par start() ou à la première utilisation
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        Démarre les processus du pool s'ils ne le sont pas déjà.
+        Sans effet si un seul processus est utilisé.
+        """
+        with self.lock:
+            if self.workers > 1 and self.pool is None:
+                context = multiprocessing.get_context("forkserver")
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=context)
+                # Les processus sont créés à la demande: un lot vide par processus
+                list(self.pool.map(verify_batch, [[]] * self.workers))
+
+    def verify(self, checks: List[Tuple[str, str, object]]) -> List[bool]:
+        """
+        Vérifie un lot de signatures.
+
+        :param checks: Liste de triplets (clé publique, signature, données signées).
+        :return: Résultat de chaque vérification dans l'ordre du lot.
+        """
+        if self.workers == 1 or len(checks) < self.min_batch:
+            return verify_batch(checks)
+
+        self.start()
+        pool = self.pool
+
+        # Un lot contigu par processus
+        size = -(-len(checks) // self.workers)
+        batches = [checks[i:i+size] for i in range(0, len(checks), size)]
+        return [res for batch in pool.map(verify_batch, batches) for res in batch]
+
+    def close(self):
+        """
+        Arrête les processus du pool.
+        """
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
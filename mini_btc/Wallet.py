@@ -1,6 +1,6 @@
 from mini_btc.utils import \
     dsa_generate, dsa_export, dsa_import, \
-    dsa_pubkey, address_from_pubkey, dsa_sign
+    dsa_pubkey, address_from_pubkey, dsa_sign, block_locator
 from mini_btc import Node
 from mini_btc import Transaction
 from mini_btc import MerkleTree
@@ -44,6 +44,8 @@ class Wallet(Node):
 
         # Preuves de validation des transactions
         self.proof_tx = dict()
+        # Hauteur des transactions dont le bloc a été élagué par le noeud
+        self.pruned_proof = dict()
 
     @staticmethod
     def create(wallet_file: str):
@@ -92,17 +94,27 @@ class Wallet(Node):
 
         # Récupération de la blockchain
         elif "LIST_BLOCKS" == body["request"]:
+            start = body.get("start", 0)
             ledger = []
             for block in body["blocks"]:
                 # On ne garde que les headers de bloc
-                block.pop("tx")
+                block.pop("tx", None)
                 # On ne vérifie pas les blocs
                 ledger.append(block)
-            # On écrase la totalité du registre
-            self.ledger = ledger
+            # On écrase le registre à partir du premier bloc reçu
+            self.ledger = self.ledger[:start] + ledger
+
+            # Demande du morceau suivant
+            if start + len(ledger) < body.get("height", 0):
+                req = {"request": "GET_BLOCKS", "start": start + len(ledger), "headers": True}
+                self.send(host, port, req)
 
         # Réception d'une preuve de transaction
         elif "PROOF" == body["request"]:
+            # Le noeud a élagué le bloc et ne peut pas fournir de preuve
+            if body.get("pruned", False):
+                self.pruned_proof[body["txid"]] = body["index"]
+                return
             self.proof_tx[body["txid"]] = {"index": body["index"], "proof": body["proof"]}
 
     def update_balance(self):
@@ -152,12 +164,12 @@ class Wallet(Node):
         tx = Transaction()
         input_value = 0; i = 0
         while input_value < value and i < len(self.utxo):
-            utxo = self.utxo[i].copy()
-            index = Transaction(utxo).find_utxo(self.address)
-            hash = utxo.pop("hash")
-            sign = dsa_sign(self._privkey, utxo)
-            tx.add_input(prevTxHash=hash, index=index, unlock=sign)
-            input_value += utxo["output"][index]["value"]; i += 1
+            utxo = Transaction(self.utxo[i])
+            index = utxo.find_utxo(self.address)
+            # Le message signé est la transaction entière contenant la UTXO
+            sign = dsa_sign(self._privkey, utxo.sighash)
+            tx.add_input(prevTxHash=self.utxo[i]["hash"], index=index, unlock=sign)
+            input_value += utxo.output[index]["value"]; i += 1
 
         # Le solde est-il suffisant ?
         if input_value < value: return None
@@ -179,7 +191,7 @@ class Wallet(Node):
 
         tx = tx.to_dict()
         req = {"request": "TRANSACT", "tx": tx}
-        self.broadcast(req)
+        self.broadcast(req, id=tx["hash"])
 
         return tx["hash"]
 
@@ -192,7 +204,7 @@ class Wallet(Node):
         """
         tx = Transaction().to_dict()
         req = {"request": "TRANSACT", "tx": tx}
-        self.broadcast(req)
+        self.broadcast(req, id=tx["hash"])
 
         return tx["hash"]
 
@@ -201,7 +213,10 @@ class Wallet(Node):
         Mise à jour du registre du porte-feuille.
         Les blocs ne sont pas vérifiés.
         """
-        req = {"request": "GET_BLOCKS"}
+        # Le hash d'un bloc est connu grâce au header du bloc suivant
+        hashes = [block["hash"] for block in self.ledger[1:]]
+        # Seuls les en-têtes sont demandés, même à un noeud élagué
+        req = {"request": "GET_BLOCKS", "locator": block_locator(hashes), "headers": True}
         self.send(self.remote_host, self.remote_port, req)
 
     def get_proof(self, txid: str):
@@ -2,5 +2,12 @@ from .MerkleTree import MerkleTree
 from .Node import Node
 from .Transaction import Transaction
 from .Wallet import Wallet
+from .UtxoSet import UtxoSet
+from .OrphanPool import OrphanPool
+from .BlockStore import BlockStore
+from .VerifyPool import VerifyPool
+from .SigCache import SigCache
+from .Mempool import Mempool
 from .FullNode import FullNode
+from .BlockTemplate import BlockTemplate
 from .Miner import Miner
@@ -1,8 +1,51 @@
-from mini_btc.utils import dsa_verify
+from mini_btc.utils import dsa_verify, Prehashed
 from mini_btc import Transaction
+from functools import lru_cache
+from typing import Callable, List, Tuple, Union
 
 
-def execute(args: str, script: str, tx: Transaction) -> str:
+def op_checksig(stack: list, origin: list, sighash: Prehashed, checks: Union[List[tuple], None]):
+    """
+    CHECKSIG: Dépile la clé publique puis la signature et empile
+    le résultat de la vérification.
+    Lève IndexError si la pile contient moins de 2 valeurs.
+    """
+    if len(stack) < 2:
+        raise IndexError("Pile insuffisante pour CHECKSIG")
+    pubkey = stack.pop()
+    sign = stack.pop()
+    origin.pop(); origin.pop()
+    if checks is not None:
+        stack.append("true")
+        origin.append((pubkey, sign, sighash))
+    elif dsa_verify(pubkey, sign, sighash):
+        stack.append("true")
+        origin.append(None)
+    else:
+        stack.append("false")
+        origin.append(None)
+
+
+# Table des instructions: nom -> fonction (pile, origines, message signé, vérifications)
+# Les scripts compilés doivent être oubliés (compile_script.cache_clear) après une modification
+OPCODES = {
+    "CHECKSIG": op_checksig,
+}
+
+
+@lru_cache(maxsize=1024)
+def compile_script(script: str) -> Tuple[Tuple[Union[Callable, None], str], ...]:
+    """
+    Compile un script verrouillant en une suite d'instructions.
+    Les scripts récemment utilisés ne sont découpés qu'une fois.
+
+    :param script: Script dont les instructions sont séparées par des espaces.
+    :return: Couples (fonction de l'instruction ou None pour une valeur, jeton).
+    """
+    return tuple((OPCODES.get(token), token) for token in script.split())
+
+
+def execute(args: str, script: str, tx: Transaction, checks: List[tuple] = None) -> str:
     """
     Exécution d'un script verrouillant une transaction UTXO.
     Le langage commande une machine à pile.
@@ -11,26 +54,33 @@ def execute(args: str, script: str, tx: Transaction) -> str:
     :param args: Arguments séparés par des espaces.
     :param script: Script à exécuter les instructions sont séparées par des espaces.
     :param tx: Transaction à déverrouiller.
-    :return: Sommet de la pile.
+    :param checks: Si renseigné les signatures ne sont pas vérifiées: elles sont
+    supposées valides et la vérification dont dépend le sommet de la pile
+    est ajoutée à cette liste sous forme (clé publique, signature, empreinte).
+    :return: Sommet de la pile, "false" si une instruction manque de valeurs
+    ou si la pile est vide à la fin du script.
     """
-    tx = tx.to_dict()
-    tx.pop("hash")
-
-    stack = []
-    args = args.split()
-    for arg in args:
-        stack.append(arg)
-    script = script.split()
-
-    for token in script:
-        if "CHECKSIG" == token:
-            pubkey = stack.pop()
-            sign = stack.pop()
-            if dsa_verify(pubkey, sign, tx):
-                stack.append("true")
-            else:
-                stack.append("false")
-        else:
+    # Message signé calculé une seule fois par transaction
+    sighash = tx.sighash
+
+    stack = args.split()
+    # Vérification différée à l'origine de chaque valeur de la pile
+    origin = [None] * len(stack)
+
+    for op, token in compile_script(script):
+        if op is None:
             stack.append(token)
+            origin.append(None)
+        else:
+            try:
+                op(stack, origin, sighash, checks)
+            except IndexError:
+                return "false"
+
+    if len(stack) == 0:
+        return "false"
+
+    if checks is not None and origin[-1] is not None:
+        checks.append(origin[-1])
 
     return stack[-1]
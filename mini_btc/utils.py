@@ -1,40 +1,522 @@
-import socket, json, sys
+import socket, struct, json, zlib
 import datetime as dt
 from base58 import b58encode, b58decode
 from binascii import hexlify, unhexlify
 from Crypto.PublicKey import DSA
 from Crypto.Signature import DSS
 from Crypto.Hash import SHA256
-from typing import Callable, Tuple, Union
+from functools import lru_cache
+from typing import Callable, List, Tuple, Union
 
 
 def json_encode(obj: object) -> bytes:
     return json.dumps(obj).encode('utf-8')
 
 
-def json_decode(obj: bytes) -> object:
-    return json.loads(obj.decode('utf-8'))
+def json_decode(obj: Union[bytes, memoryview]) -> object:
+    return json.loads(str(obj, 'utf-8'))
 
 
-def create_sock(host: str, port: int) -> socket.socket:
+def create_sock(host: str, port: int, timeout: float = None) -> socket.socket:
     """
     Crée une prise bidirectionnelle vers un noeud.
 
     :param host: Adresse du noeud.
     :param port: Port associé à cette adresse.
+    :param timeout: Délai maximum en secondes des opérations sur la prise.
+    None pour des opérations bloquantes.
     :return: Prise connectée.
     """
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.settimeout(timeout)
     sock.connect((host, port))
     return sock
 
 
+# En-tête binaire d'une trame de taille fixe
+# magic (4 octets), version, type du contenu, taille du contenu, somme de contrôle CRC32
+FRAME_HEADER = struct.Struct("!4sBBII")
+FRAME_MAGIC = b"MBTC"
+FRAME_VERSION = 1
+# Types de contenu d'une trame
+FRAME_JSON = 0
+FRAME_BINARY = 1
+# Drapeau du type de contenu indiquant une trame compressée
+FRAME_COMPRESSED = 0x80
+# Taille maximale du contenu d'une trame
+FRAME_MAX_LENGTH = 1 << 28
+# Taille minimale d'un contenu pour qu'il soit compressé
+COMPRESS_THRESHOLD = 1024
+
+
+class JsonCodec:
+    """
+    Codec JSON utilisé par défaut et lorsque le noeud distant
+    ne connaît pas d'autre codec.
+    """
+    name = "json"
+    type = FRAME_JSON
+
+    def encode(self, obj: object) -> bytes:
+        return json_encode(obj)
+
+    def decode(self, data: Union[bytes, memoryview]) -> object:
+        return json_decode(data)
+
+
+# Étiquettes des valeurs du codec binaire
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT = range(8)
+_DIGEST, _HEX, _B58, _SCRIPT, _TX, _BLOCK = range(8, 14)
+
+# Clés fréquentes des paquets encodées par leur indice
+_KEYS = ["header", "host", "port", "id", "body", "request", "tx", "block",
+    "blocks", "locktime", "input", "output", "hash", "prevTxHash", "index",
+    "unlock", "address", "value", "lock", "root", "nonce", "txid", "proof",
+    "utxo", "nodes", "codecs"]
+_KEY_INDEX = {key: i for i, key in enumerate(_KEYS)}
+
+_TX_KEYS = ["locktime", "input", "output", "hash"]
+_INPUT_KEYS = ["prevTxHash", "index", "unlock"]
+_OUTPUT_KEYS = ["address", "value", "lock"]
+_BLOCK_KEYS = ["index", "hash", "root", "nonce", "tx"]
+
+_HEX_CHARS = frozenset("0123456789abcdef")
+_B58_CHARS = frozenset("123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz")
+_DOUBLE = struct.Struct("!d")
+
+
+@lru_cache(maxsize=1024)
+def _b58_to_raw(s: str) -> Union[bytes, None]:
+    """
+    Décode une chaîne en base 58 si son encodage est canonique.
+
+    :param s: Chaîne en base 58.
+    :return: Octets décodés ou None si la chaîne ne peut pas être retrouvée.
+    """
+    if not _B58_CHARS.issuperset(s):
+        return None
+    raw = b58decode(s.encode("utf-8"))
+    return raw if b58encode(raw).decode("utf-8") == s else None
+
+
+@lru_cache(maxsize=1024)
+def _raw_to_b58(raw: bytes) -> str:
+    return b58encode(raw).decode("utf-8")
+
+
+class BinaryCodec:
+    """
+    Codec binaire compact des paquets.
+
+    Les valeurs sont précédées d'une étiquette d'un octet. Les entiers sont des
+    varints, les hashs hexadécimaux sont transmis en octets bruts, les adresses
+    et clés publiques en base 58 sous forme binaire et les scripts P2PK
+    "<pubkey> CHECKSIG" par la clé DER brute. Les transactions et les blocs ont
+    un schéma dédié sans noms de champs.
+
+    Le décodage restitue exactement les mêmes objets que le JSON, y compris
+    l'ordre des clés, pour que les hashs calculés restent identiques.
+    """
+    name = "binary"
+    type = FRAME_BINARY
+
+    def encode(self, obj: object) -> bytes:
+        out = bytearray()
+        self.__write(out, obj)
+        return bytes(out)
+
+    def decode(self, data: Union[bytes, memoryview]) -> object:
+        # Toute erreur de décodage d'une trame reçue est une ValueError
+        try:
+            obj, pos = self.__read(memoryview(data), 0)
+        except (IndexError, KeyError, struct.error, UnicodeDecodeError, RecursionError) as e:
+            raise ValueError("Contenu binaire invalide") from e
+        if pos != len(data):
+            raise ValueError("Contenu binaire invalide")
+        return obj
+
+    @staticmethod
+    def __write_varint(out: bytearray, n: int):
+        while n > 0x7f:
+            out.append((n & 0x7f) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    @staticmethod
+    def __read_varint(data: memoryview, pos: int) -> Tuple[int, int]:
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return n, pos
+            shift += 7
+
+    def __write_bytes(self, out: bytearray, raw: bytes):
+        self.__write_varint(out, len(raw))
+        out += raw
+
+    def __read_bytes(self, data: memoryview, pos: int) -> Tuple[bytes, int]:
+        size, pos = self.__read_varint(data, pos)
+        return bytes(data[pos:pos+size]), pos + size
+
+    def __write_str(self, out: bytearray, s: str):
+        # Hash SHA256 hexadécimal
+        if len(s) == 64 and _HEX_CHARS.issuperset(s):
+            out.append(_DIGEST)
+            out += bytes.fromhex(s)
+            return
+
+        # Chaîne hexadécimale (signature)
+        if len(s) % 2 == 0 and len(s) >= 16 and _HEX_CHARS.issuperset(s):
+            out.append(_HEX)
+            self.__write_bytes(out, bytes.fromhex(s))
+            return
+
+        # Script P2PK
+        if s.endswith(" CHECKSIG") and s.count(" ") == 1:
+            raw = _b58_to_raw(s[:-9])
+            if raw is not None:
+                out.append(_SCRIPT)
+                self.__write_bytes(out, raw)
+                return
+
+        # Adresse ou clé publique en base 58
+        if len(s) >= 32:
+            raw = _b58_to_raw(s)
+            if raw is not None:
+                out.append(_B58)
+                self.__write_bytes(out, raw)
+                return
+
+        out.append(_STR)
+        self.__write_bytes(out, s.encode("utf-8"))
+
+    def __write_dict(self, out: bytearray, obj: dict):
+        keys = list(obj)
+
+        # Transaction
+        if (keys == _TX_KEYS and type(obj["input"]) is list and type(obj["output"]) is list
+            and all(type(intx) is dict and list(intx) == _INPUT_KEYS for intx in obj["input"])
+            and all(type(utxo) is dict and list(utxo) == _OUTPUT_KEYS for utxo in obj["output"])):
+            out.append(_TX)
+            self.__write(out, obj["locktime"])
+            self.__write_varint(out, len(obj["input"]))
+            for intx in obj["input"]:
+                for key in _INPUT_KEYS:
+                    self.__write(out, intx[key])
+            self.__write_varint(out, len(obj["output"]))
+            for utxo in obj["output"]:
+                for key in _OUTPUT_KEYS:
+                    self.__write(out, utxo[key])
+            self.__write(out, obj["hash"])
+            return
+
+        # Bloc
+        if keys == _BLOCK_KEYS:
+            out.append(_BLOCK)
+            for key in _BLOCK_KEYS:
+                self.__write(out, obj[key])
+            return
+
+        out.append(_DICT)
+        self.__write_varint(out, len(obj))
+        for key, value in obj.items():
+            if key in _KEY_INDEX:
+                self.__write_varint(out, _KEY_INDEX[key] + 1)
+            else:
+                self.__write_varint(out, 0)
+                self.__write_bytes(out, key.encode("utf-8"))
+            self.__write(out, value)
+
+    def __write(self, out: bytearray, obj: object):
+        if obj is None:
+            out.append(_NONE)
+        elif obj is False:
+            out.append(_FALSE)
+        elif obj is True:
+            out.append(_TRUE)
+        elif type(obj) is int:
+            out.append(_INT)
+            # Encodage zigzag des entiers signés
+            self.__write_varint(out, obj << 1 if obj >= 0 else (-obj << 1) - 1)
+        elif type(obj) is float:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(obj)
+        elif type(obj) is str:
+            self.__write_str(out, obj)
+        elif type(obj) in (list, tuple):
+            out.append(_LIST)
+            self.__write_varint(out, len(obj))
+            for value in obj:
+                self.__write(out, value)
+        elif type(obj) is dict:
+            self.__write_dict(out, obj)
+        else:
+            raise TypeError(f"Type non encodable: {type(obj)}")
+
+    def __read(self, data: memoryview, pos: int) -> Tuple[object, int]:
+        tag = data[pos]
+        pos += 1
+
+        if tag == _NONE:
+            return None, pos
+        elif tag == _FALSE:
+            return False, pos
+        elif tag == _TRUE:
+            return True, pos
+        elif tag == _INT:
+            n, pos = self.__read_varint(data, pos)
+            return (n >> 1 if n & 1 == 0 else -((n + 1) >> 1)), pos
+        elif tag == _FLOAT:
+            return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+        elif tag == _STR:
+            raw, pos = self.__read_bytes(data, pos)
+            return raw.decode("utf-8"), pos
+        elif tag == _DIGEST:
+            return data[pos:pos+32].hex(), pos + 32
+        elif tag == _HEX:
+            raw, pos = self.__read_bytes(data, pos)
+            return raw.hex(), pos
+        elif tag == _B58:
+            raw, pos = self.__read_bytes(data, pos)
+            return _raw_to_b58(raw), pos
+        elif tag == _SCRIPT:
+            raw, pos = self.__read_bytes(data, pos)
+            return _raw_to_b58(raw) + " CHECKSIG", pos
+        elif tag == _LIST:
+            size, pos = self.__read_varint(data, pos)
+            res = []
+            for _ in range(size):
+                value, pos = self.__read(data, pos)
+                res.append(value)
+            return res, pos
+        elif tag == _DICT:
+            size, pos = self.__read_varint(data, pos)
+            res = dict()
+            for _ in range(size):
+                index, pos = self.__read_varint(data, pos)
+                if index > 0:
+                    key = _KEYS[index-1]
+                else:
+                    key, pos = self.__read_bytes(data, pos)
+                    key = key.decode("utf-8")
+                res[key], pos = self.__read(data, pos)
+            return res, pos
+        elif tag == _TX:
+            tx = dict()
+            tx["locktime"], pos = self.__read(data, pos)
+            for field, keys in (("input", _INPUT_KEYS), ("output", _OUTPUT_KEYS)):
+                size, pos = self.__read_varint(data, pos)
+                tx[field] = []
+                for _ in range(size):
+                    item = dict()
+                    for key in keys:
+                        item[key], pos = self.__read(data, pos)
+                    tx[field].append(item)
+            tx["hash"], pos = self.__read(data, pos)
+            return tx, pos
+        elif tag == _BLOCK:
+            block = dict()
+            for key in _BLOCK_KEYS:
+                block[key], pos = self.__read(data, pos)
+            return block, pos
+        else:
+            raise ValueError("Étiquette binaire inconnue")
+
+
+# Codecs disponibles par type de contenu de trame
+CODECS = {codec.type: codec for codec in [JsonCodec(), BinaryCodec()]}
+# Codecs par nom dans l'ordre de préférence lors de la négociation
+CODEC_NAMES = {codec.name: codec for codec in [CODECS[FRAME_BINARY], CODECS[FRAME_JSON]]}
+
+
+def negotiate_codec(local: List[str], remote: List[str]) -> Union[JsonCodec, BinaryCodec]:
+    """
+    Choisit le codec commun préféré entre deux noeuds.
+
+    :param local: Noms des codecs acceptés par le noeud local.
+    :param remote: Noms des codecs annoncés par le noeud distant.
+    :return: Codec commun préféré, JSON par défaut.
+    """
+    for name in CODEC_NAMES:
+        if name in local and name in remote:
+            return CODEC_NAMES[name]
+    return CODECS[FRAME_JSON]
+
+
+class FrameCompressor:
+    """
+    Compression zlib en flux des trames envoyées sur une connexion.
+    Le dictionnaire de compression est conservé d'une trame à l'autre ce qui
+    permet de profiter des clés publiques et scripts répétés entre les paquets.
+    Les trames doivent être envoyées dans l'ordre de leur compression.
+    """
+    def __init__(self, threshold: int = COMPRESS_THRESHOLD, level: int = 6):
+        """
+        :param threshold: Taille minimale d'un contenu pour qu'il soit compressé.
+        :param level: Niveau de compression zlib.
+        """
+        self.threshold = threshold
+        self.compressor = zlib.compressobj(level)
+
+    def compress(self, payload: bytes) -> bytes:
+        return self.compressor.compress(payload) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def encode_frame(obj: object, codec: Union[JsonCodec, BinaryCodec] = CODECS[FRAME_JSON],
+    compressor: FrameCompressor = None) -> bytes:
+    """
+    Construit la trame d'un objet. Une trame est constituée d'un en-tête
+    binaire de taille fixe suivi du contenu. Un paquet coûte ainsi une seule
+    écriture sans aller-retour de synchronisation.
+
+    :param obj: Objet Python sérialisable en JSON.
+    :param codec: Codec du contenu de la trame.
+    :param compressor: Compression en flux de la connexion si négociée.
+    Les petits contenus ne sont pas compressés.
+    :return: Octets de la trame.
+    """
+    payload = codec.encode(obj)
+    type = codec.type
+    if compressor is not None and len(payload) >= compressor.threshold:
+        payload = compressor.compress(payload)
+        type |= FRAME_COMPRESSED
+
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, type,
+        len(payload), zlib.crc32(payload))
+    return header + payload
+
+
+def decode_frame_header(header: Union[bytes, memoryview]) -> Tuple[int, int, int]:
+    """
+    Décode l'en-tête d'une trame.
+
+    :param header: Octets de l'en-tête.
+    :return: Le triplet type du contenu, taille du contenu, somme de contrôle.
+    """
+    magic, version, type, length, checksum = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("En-tête de trame invalide")
+    if length > FRAME_MAX_LENGTH:
+        raise ValueError("Trame trop grande")
+    return type, length, checksum
+
+
+def decode_frame_payload(type: int, payload: Union[bytes, memoryview], checksum: int,
+    decompressor: object = None) -> object:
+    """
+    Décode le contenu d'une trame après vérification de sa somme de contrôle.
+
+    :param type: Type du contenu.
+    :param payload: Octets du contenu.
+    :param checksum: Somme de contrôle CRC32 attendue.
+    :param decompressor: Décompression zlib en flux de la connexion.
+    :return: Objet Python.
+    """
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("Somme de contrôle de trame invalide")
+
+    if type & FRAME_COMPRESSED:
+        if decompressor is None:
+            raise ValueError("Trame compressée inattendue")
+        try:
+            payload = decompressor.decompress(payload, FRAME_MAX_LENGTH)
+        except zlib.error as e:
+            raise ValueError("Trame compressée invalide") from e
+        if decompressor.unconsumed_tail:
+            raise ValueError("Trame trop grande")
+        type &= ~FRAME_COMPRESSED
+
+    if type not in CODECS:
+        raise ValueError("Type de trame inconnu")
+    return CODECS[type].decode(payload)
+
+
+class FrameReader:
+    """
+    Lecture des trames d'une prise dans un tampon préalloué réutilisé
+    d'une trame à l'autre.
+    """
+    def __init__(self, sock: socket.socket, bufsize: int = 1 << 16):
+        """
+        :param sock: Prise connectée à un noeud.
+        :param bufsize: Taille initiale du tampon de lecture.
+        """
+        self.sock = sock
+        self.buf = bytearray(bufsize)
+        # Décompression des trames compressées par le noeud distant
+        self.decompressor = zlib.decompressobj()
+
+    def recv_exactly(self, size: int) -> Union[memoryview, None]:
+        """
+        Lit exactement size octets dans le tampon.
+
+        :param size: Nombre d'octets à lire.
+        :return: Vue sur les octets lus ou None si la prise a été fermée.
+        """
+        # Agrandissement du tampon pour les grandes trames
+        if size > len(self.buf):
+            self.buf = bytearray(size)
+
+        view = memoryview(self.buf)[:size]
+        pos = 0
+        while pos < size:
+            try:
+                n = self.sock.recv_into(view[pos:], size - pos)
+            # Le délai de la prise concerne les écritures, on continue d'attendre
+            except socket.timeout:
+                continue
+            # La prise a été fermée par le noeud distant
+            if n == 0:
+                return None
+            pos += n
+        return view
+
+    def read(self) -> object:
+        """
+        Reçoit une trame envoyée par send_packet.
+
+        :return: Objet Python ou None si la prise a été fermée.
+        """
+        header = self.recv_exactly(FRAME_HEADER.size)
+        if header is None:
+            return None
+        type, length, checksum = decode_frame_header(header)
+
+        payload = self.recv_exactly(length)
+        if payload is None:
+            return None
+        return decode_frame_payload(type, payload, checksum, self.decompressor)
+
+
+def send_packet(sock: socket.socket, obj: object) -> None:
+    """
+    Envoie un objet sous forme d'une trame sur une prise connectée.
+
+    :param sock: Prise connectée à un noeud.
+    :param obj: Objet Python sérialisable en JSON.
+    """
+    sock.sendall(encode_frame(obj))
+
+
+def recv_packet(sock: socket.socket) -> object:
+    """
+    Reçoit une trame envoyée par send_packet.
+    Pour lire plusieurs trames sur la même prise utiliser FrameReader.
+
+    :param sock: Prise connectée à un noeud.
+    :return: Objet Python ou None si la prise a été fermée.
+    """
+    return FrameReader(sock, FRAME_HEADER.size).read()
+
+
 def send(host: str, port: int, obj: object, ignore_errors=True) -> None:
     """
     Permet d'envoyer un objet à un noeud au travers d'une prise temporaire.
-    La fonction implémente un protocole permettant au destinataire de savoir
-    quelle taille de paquet il attend.
+    L'objet est envoyé sous forme d'une trame unique (voir send_packet).
 
     :param host: Adresse du noeud.
     :param port: Port associé à cette adresse.
@@ -44,15 +526,8 @@ def send(host: str, port: int, obj: object, ignore_errors=True) -> None:
     try:
         # Création de la prise
         sock = create_sock(host, port)
-        # Détermination de la taille du paquet
-        obj = json_encode(obj)
-        length = sys.getsizeof(obj)
-        # Envoi de la taille du paquet
-        sock.sendall(json_encode({"Packet-Length": length}))
-        # Synchronisation avec le destinataire
-        assert length == json_decode(sock.recv(128))["Packet-Length"]
         # Envoi du paquet complet
-        sock.sendall(obj)
+        send_packet(sock, obj)
         # Fermeture de la prise
         sock.close()
 
@@ -66,7 +541,6 @@ def send(host: str, port: int, obj: object, ignore_errors=True) -> None:
 def recv(sock: socket.socket, ignore_errors=True) -> object:
     """
     Permet de recevoir un objet envoyé par un noeud.
-    L'objet envoyé doit être un JSON sérialisé.
     La fonction suit le protocole de la fonction précédente.
 
     :param sock: Prise connectée à un noeud.
@@ -74,13 +548,7 @@ def recv(sock: socket.socket, ignore_errors=True) -> object:
     :return: Objet Python.
     """
     try:
-        # Réception de la taille du paquet
-        obj = json_decode(sock.recv(128))
-        bufsize = obj["Packet-Length"]
-        # Synchronisation avec l'expéditeur
-        sock.sendall(json_encode(obj))
-        # Réception du paquet
-        return json_decode(sock.recv(bufsize))
+        return recv_packet(sock)
 
     except Exception as error:
         if ignore_errors:
@@ -99,6 +567,43 @@ def sha256(obj: object) -> str:
     return SHA256.new(json_encode(obj)).hexdigest()
 
 
+# Nombre de caractères hexadécimaux des identifiants courts de transaction
+SHORT_TXID_LENGTH = 16
+
+
+def short_txid(txid: str) -> str:
+    """
+    Identifiant court d'une transaction utilisé par les blocs compacts.
+
+    :param txid: Hash de la transaction.
+    :return: Préfixe de SHORT_TXID_LENGTH caractères du hash.
+    """
+    return txid[:SHORT_TXID_LENGTH]
+
+
+def block_locator(hashes: List[str]) -> List[str]:
+    """
+    Localisateur de blocs: hashs des derniers blocs d'un registre puis
+    de blocs de plus en plus espacés jusqu'au bloc genesis.
+    Permet à un noeud distant de trouver le dernier bloc commun.
+
+    :param hashes: Hashs des blocs du registre dans l'ordre.
+    :return: Hashs sélectionnés du plus récent au plus ancien.
+    """
+    locator = []
+    step = 1
+    height = len(hashes) - 1
+    while height > 0:
+        locator.append(hashes[height])
+        # Les 10 derniers blocs puis un pas doublé à chaque bloc
+        if len(locator) >= 10:
+            step *= 2
+        height -= step
+    if len(hashes) > 0:
+        locator.append(hashes[0])
+    return locator
+
+
 def sum_hash(h1: str, h2: str) -> str:
     """
     Calcule le hash de la somme de 2 hashs. Opération commutative.
@@ -168,31 +673,73 @@ def address_from_pubkey(pubkey: str) -> str:
     return address
 
 
+class Prehashed:
+    """
+    Empreinte SHA256 déjà calculée, utilisable par DSS à la place
+    d'un objet Crypto.Hash pour ne pas resérialiser les données signées.
+    """
+    __slots__ = ("_digest",)
+    oid = SHA256.SHA256Hash.oid
+    digest_size = SHA256.digest_size
+
+    def __init__(self, digest: bytes):
+        """
+        :param digest: Empreinte SHA256 brute.
+        """
+        assert len(digest) == self.digest_size
+        self._digest = digest
+
+    def digest(self) -> bytes:
+        return self._digest
+
+    def hexdigest(self) -> str:
+        return self._digest.hex()
+
+
+def _hash(data: object) -> Union[SHA256.SHA256Hash, Prehashed]:
+    """
+    Empreinte SHA256 des données à signer si elle n'est pas déjà calculée.
+    """
+    return data if isinstance(data, Prehashed) else SHA256.new(json_encode(data))
+
+
 def dsa_sign(privkey: DSA.DsaKey, data: object) -> str:
     """
     Permet de signer une transaction en cryptant son hash avec la clé privée.
 
     :param privkey: Clé privée secrète.
-    :param data: Données à hacher.
+    :param data: Données à hacher ou empreinte déjà calculée (Transaction.sighash).
     :return: Chaîne encryptée du hash.
     """
-    hash = SHA256.new(json_encode(data))
+    hash = _hash(data)
     return hexlify(DSS.new(privkey, 'fips-186-3').sign(hash)).decode("utf-8")
 
 
+@lru_cache(maxsize=1024)
+def _dsa_verifier(pubkey: str) -> DSS.DssSigScheme:
+    """
+    Vérificateur DSS d'une clé publique.
+    Le décodage base 58 et l'import de la clé, qui contrôle ses paramètres,
+    ne sont faits qu'une fois par clé récemment utilisée.
+
+    :param pubkey: Clé publique sous forme d'une chaîne de caractères.
+    :return: Vérificateur sans état partageable entre threads.
+    """
+    return DSS.new(DSA.import_key(b58decode(pubkey.encode("utf-8"))), 'fips-186-3')
+
+
 def dsa_verify(pubkey: str, sign: str, data: object) -> bool:
     """
     Vérifie la signature selon la clé publique.
 
     :param pubkey: Clé publique pour décrypter la signature.
     :param sign: Signature à vérifier.
-    :param data: Données à hacher.
+    :param data: Données à hacher ou empreinte déjà calculée (Transaction.sighash).
     :return: True si la signature correspond au hash False sinon.
     """
     try:
-        pubkey = DSA.import_key(b58decode(pubkey.encode("utf-8")))
-        hash = SHA256.new(json_encode(data))
-        DSS.new(pubkey, 'fips-186-3').verify(hash, unhexlify(sign))
+        hash = _hash(data)
+        _dsa_verifier(pubkey).verify(hash, unhexlify(sign))
         return True
     except:
         return False
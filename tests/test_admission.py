@@ -0,0 +1,55 @@
+from mini_btc import FullNode, Transaction
+from tests.utils import mine, spend, pubkey, address
+from time import sleep
+
+
+# Vérifications structurelles
+assert FullNode._parse_tx({"locktime": 0, "input": [], "output": []}) is not None
+assert FullNode._parse_tx({"locktime": 0, "input": []}) is None
+assert FullNode._parse_tx(None) is None
+assert FullNode._parse_tx({"locktime": 0, "input": [{"prevTxHash": "a", "index": -1, "unlock": ""}],
+    "output": []}) is None
+assert FullNode._parse_tx({"locktime": 0, "input": [],
+    "output": [{"address": "a", "value": "50", "lock": "true"}]}) is None
+assert FullNode._parse_tx({"locktime": 0, "input": [], "output": [], "hash": "0"}) is None
+
+n1 = FullNode("localhost", 8000, difficulty=1, verbose=0)
+n2 = FullNode("localhost", 8001, "localhost", 8000, difficulty=1, verbose=0)
+for _ in range(3):
+    block = mine(n1)
+    assert n1._add_block(block) and n2._add_block(block)
+n1.start(); n2.start()
+sleep(1)
+
+# Seules les transactions admises sont conservées et diffusées
+rewards = [block["tx"][0] for block in n1.ledger]
+valid = [spend(rewards[0]), spend(rewards[1])]
+for tx in [valid[0], {"locktime": 0}, spend(rewards[2], valid=False),
+    spend(rewards[0], dest="bob"), valid[1], spend(mine(n1)["tx"][0])]:
+    n1.broadcast({"request": "TRANSACT", "tx": tx})
+sleep(1)
+assert [tx["hash"] for tx in valid] == [tx.txid for tx in n1.buf_tx]
+assert [tx["hash"] for tx in valid] == [tx.txid for tx in n2.buf_tx]
+stats = n1.admission_stats()
+assert {"received": 6, "dropped": 0, "accepted": 2, "malformed": 1, "duplicate": 0,
+    "conflict": 1, "invalid": 1, "signature": 1} == {k: v for k, v in stats.items() if k != "throughput"}
+assert stats["throughput"] > 0
+assert 2 == n2.admission_stats()["accepted"]
+
+# Une transaction déjà admise sous un autre identifiant de paquet est ignorée
+n2.broadcast({"request": "TRANSACT", "tx": valid[0]})
+sleep(1)
+assert 1 == n2.admission_stats()["duplicate"] and 0 == n1.admission_stats()["duplicate"]
+
+# Un déverrouillage vide est refusé sans arrêter le thread d'admission
+empty = Transaction()
+empty.add_input(prevTxHash=rewards[2]["hash"], index=0, unlock="")
+empty.add_output(address, 50, f"{pubkey} CHECKSIG")
+n1.broadcast({"request": "TRANSACT", "tx": empty.to_dict()})
+n1.broadcast({"request": "TRANSACT", "tx": spend(rewards[2])})
+sleep(1)
+assert 2 == n1.admission_stats()["invalid"] and 3 == n1.admission_stats()["accepted"]
+assert 3 == len(n2.buf_tx)
+
+n1.shutdown()
+n2.shutdown()
@@ -0,0 +1,95 @@
+from mini_btc import BlockStore, FullNode
+from mini_btc.utils import sha256
+from tests.utils import mine
+import os, shutil, tempfile
+
+
+path = tempfile.mkdtemp()
+node = FullNode("localhost", 8000, difficulty=1, verbose=0)
+
+# Registre persistant utilisé comme une liste
+store = BlockStore(os.path.join(path, "store"), cache_size=2)
+blocks = [mine(node)]
+for _ in range(4):
+    blocks.append(mine(node, prev=blocks[-1]))
+for block in blocks:
+    store.append(block, undo=[["txid", 0, {"address": "a", "value": 1, "lock": "l"}]])
+assert 5 == len(store)
+assert blocks == list(store) and store == blocks
+assert blocks[1:3] == store[1:3] and blocks[-1] == store[-1]
+assert [sha256(block) for block in blocks] == store.hashes()
+assert [["txid", 0, {"address": "a", "value": 1, "lock": "l"}]] == store.undo(3)
+assert blocks[-1] == store.pop() and 4 == len(store)
+store.close()
+
+# Un enregistrement d'index incomplet est ignoré à la réouverture
+with open(os.path.join(path, "store", "index.dat"), "ab") as f:
+    f.write(b"\x00" * 10)
+store = BlockStore(os.path.join(path, "store"))
+assert blocks[:4] == list(store)
+store.append(blocks[4])
+assert blocks == list(store)
+store.truncate(2)
+assert blocks[:2] == list(store)
+store.close()
+
+# Un enregistrement d'index dont le bloc n'a pas été écrit est ignoré
+segment = os.path.join(path, "store", "blocks.dat")
+size = os.path.getsize(segment)
+os.truncate(segment, size - 1)
+store = BlockStore(os.path.join(path, "store"))
+assert blocks[:1] == list(store)
+assert os.path.getsize(segment) < size - 1
+store.append(blocks[1])
+assert blocks[:2] == list(store)
+store.close()
+node.shutdown()
+
+# Redémarrage d'un noeud à partir de son registre persistant
+node = FullNode("localhost", 8001, difficulty=1, verbose=0,
+    store=os.path.join(path, "node"), checkpoint_interval=10)
+for _ in range(25):
+    assert node._add_block(mine(node))
+ledger = list(node.ledger)
+utxo = dict(node.utxo.entries)
+tx_index = dict(node.tx_index)
+node.shutdown()
+
+# Le point de contrôle couvre tout le registre à l'arrêt
+node = FullNode("localhost", 8002, difficulty=1, verbose=0,
+    store=os.path.join(path, "node"), checkpoint_interval=10)
+assert ledger == node.ledger
+assert [sha256(block) for block in ledger] == node.block_hashes
+assert utxo == node.utxo.entries and tx_index == node.tx_index
+assert node.find_tx(ledger[7]["tx"][0]["hash"]) is not None
+
+# Les blocs ajoutés après le dernier point de contrôle sont rejoués
+for _ in range(3):
+    assert node._add_block(mine(node))
+ledger = list(node.ledger)
+utxo = dict(node.utxo.entries)
+# Arrêt sans point de contrôle
+node.pool.close()
+node.store.close()
+node = FullNode("localhost", 8003, difficulty=1, verbose=0,
+    store=os.path.join(path, "node"), checkpoint_interval=10)
+assert 28 == len(node.ledger) and ledger == node.ledger
+assert utxo == node.utxo.entries
+
+# Bascule sur une branche plus lourde à partir d'un bloc rechargé
+branch = [mine(node, prev=ledger[25])]
+for _ in range(2):
+    branch.append(mine(node, prev=branch[-1]))
+for block in branch:
+    assert node._add_block(block)
+assert ledger[:26] + branch == node.ledger
+for block in ledger[26:]:
+    assert block["tx"][0]["hash"] not in node.tx_index
+node.shutdown()
+
+node = FullNode("localhost", 8004, difficulty=1, verbose=0,
+    store=os.path.join(path, "node"), checkpoint_interval=10)
+assert ledger[:26] + branch == node.ledger
+node.shutdown()
+
+shutil.rmtree(path)
@@ -0,0 +1,67 @@
+from mini_btc import BlockTemplate, Miner, MerkleTree, Transaction
+from mini_btc.MerkleTree import IncrementalMerkleTree
+from tests.utils import mine, pubkey, address
+
+
+# L'arbre incrémental a la même racine que l'arbre de Merkle
+hashs = [Transaction().to_dict()["hash"] for _ in range(9)]
+tree = IncrementalMerkleTree()
+assert tree.get_root() is None
+for n in range(1, 10):
+    tree.append(hashs[n-1])
+    assert MerkleTree(hashs[:n]).get_root() == tree.get_root()
+tree.set(3, hashs[8])
+leaves = hashs[:3] + [hashs[8]] + hashs[4:]
+assert MerkleTree(leaves).get_root() == tree.get_root()
+for n in range(8, -1, -1):
+    assert leaves[n] == tree.pop()
+    assert (MerkleTree(leaves[:n]).get_root() if n > 0 else None) == tree.get_root()
+assert IncrementalMerkleTree(hashs).get_root() == MerkleTree(hashs).get_root()
+
+
+def check(block: dict):
+    """
+    Le bloc du modèle a la racine de ses transactions et finit par la récompense.
+    """
+    assert block["root"] == MerkleTree([tx["hash"] for tx in block["tx"]]).get_root()
+    assert [(address, 50)] == [(utxo["address"], utxo["value"]) for utxo in block["tx"][-1]["output"]]
+
+
+# Ajout et retrait de transactions
+template = BlockTemplate(pubkey, 3)
+txs = [Transaction() for _ in range(4)]
+for i, tx in enumerate(txs): tx.locktime += i
+check(template.block())
+assert template.add(txs[0]) and template.add(txs[1]) and not template.full
+assert template.add(txs[1]) is False
+assert template.add(txs[2]) and template.full and template.add(txs[3]) is False
+check(template.block())
+version = template.version
+assert template.remove(txs[0]) and template.remove(txs[0]) is False
+assert version + 1 == template.version and txs[0] not in template
+# La dernière transaction prend la place de la transaction retirée
+assert [txs[2].txid, txs[1].txid] == [tx["hash"] for tx in template.block()["tx"][:-1]]
+check(template.block())
+
+# Nouveau bloc précédent et nouvelle récompense
+reward = template.reward
+template.reset(1, "parent")
+block = template.block(nonce=7)
+assert (1, "parent", 7) == (block["index"], block["hash"], block["nonce"])
+assert reward["hash"] != template.reward["hash"]
+check(block)
+
+# Le modèle du mineur suit le tampon et le registre
+miner = Miner(pubkey, "localhost", 8000, block_size=3, difficulty=1, verbose=0)
+for tx in txs:
+    assert miner.accept_tx(tx)
+miner._update_template()
+assert [tx.txid for tx in txs[:2]] == [tx["hash"] for tx in miner.template.txs]
+assert miner._add_block(mine(miner, [txs[1].to_dict()]))
+assert [txs[0].txid, txs[2].txid] == [tx["hash"] for tx in miner.template.txs]
+block = miner.template.block()
+assert (1, miner.block_hashes[-1]) == (block["index"], block["hash"])
+check(block)
+assert miner._add_block(mine(miner, [txs[0].to_dict(), txs[2].to_dict(), txs[3].to_dict()]))
+assert 0 == len(miner.template) and not miner.template.full
+miner.shutdown()
@@ -0,0 +1,74 @@
+from mini_btc.utils import CODECS, FRAME_JSON, FRAME_BINARY, negotiate_codec, json_encode, \
+    encode_frame, FrameReader, FrameCompressor, FRAME_HEADER, FRAME_COMPRESSED, \
+    decode_frame_payload
+from mini_btc import Transaction
+import socket
+import zlib
+
+
+json_codec = CODECS[FRAME_JSON]
+binary = CODECS[FRAME_BINARY]
+
+# Valeurs simples
+for obj in [None, True, False, 0, 1, -1, 2**70, -2**70, 0.5, 1677271598.235741,
+            "", "é", "TRANSACT", [], [1, [2, None]], {}, {"inconnu": [1, 2]}]:
+    assert json_encode(obj) == json_encode(binary.decode(binary.encode(obj)))
+
+# Transaction P2PK avec signature
+pubkey = "BQfcHxQKFtLLEA9o2azM9N2owM1eaArtwEPJYtguXQPyUohbFubHLjBsb3zQuQSgCEnJ5ZL87yKZ2mZomnKasa7HGgGHG7Rabzo9PjaAt4R6h8RyWRUtSHQCAArqqXagy7rTpfDi4BKoSXcpWsNgfnjBttcd3rbdBxrL9pGHZvPP7vsA2cPPYW1k2LNezr2MW6NSWRmevXYYbq9Ly9WgKWUTXx6yhYTiuWZMG4P8xCNwDqXZPDwUWhcwV5Bf4w4V9kodG9yiJnxRax4bF4CzveJoR68ehYaF1ePNMcnA8cR1SPFTpMJLnQXNv35hGwbz2PRQ4yFPfrYiwLEk1yoaYKWisZj9QyKCnqxRxrGW36TtuBLhksQoBnEkddginsDYezxFG7WZtbwuQWBQzohmTBWd51f9BK3koHrZpUPXrvhgJchmKcqdbH2YRoyMRNSAkADyLBoPphdvbPNEBaHKoDjXNnLXe5ZBEWxeW3qdrXTsPRXmhLYbZ2HbKoAiAg1mWcSqSpZZLV89xJXP1p6Wb1TDAZm8BGLFs9iCLMPZcGzBZ2cPqszor7b8ZngEYDznvKBDbkebq927fWWKwMEcBnLu9KrZg"
+tx = Transaction()
+tx.add_input("21419e2a06f05a966bd73b3660b0faffa9397be6671cfa5a506f457e40779c47", 0,
+             "3f2a0c1d0e9b8a7c6d5e4f30211203f2a0c1d0e9b8a7c6d5e4f30211203f2a0c1d0e9b8a7c6d5e4f")
+tx.add_output("668wc7STftWcCMUR8o9G62epry1GCDc5PiMnWmXySzW8", 50, f"{pubkey} CHECKSIG")
+tx = tx.to_dict()
+
+block = {"index": 1, "hash": None, "root": tx["hash"], "nonce": 42, "tx": [tx]}
+pck = {"header": "BROADCAST", "host": "localhost", "port": 8000, "id": "localhost:8000#1.5",
+       "body": {"request": "SUBMIT_BLOCK", "block": block}}
+
+data = binary.encode(pck)
+assert binary.decode(data) == pck
+# Le hash du bloc ne doit pas changer après décodage
+assert json_encode(binary.decode(data)) == json_encode(pck)
+assert len(data) < len(json_codec.encode(pck))
+
+# Les clés inattendues ne doivent pas utiliser le schéma de transaction
+odd = {"locktime": 1.0, "input": [], "output": [{"address": "x", "lock": "y", "value": 1}], "hash": "00"}
+assert json_encode(binary.decode(binary.encode(odd))) == json_encode(odd)
+
+# Un contenu binaire tronqué ou invalide lève une ValueError
+for data in [b"", b"\x07", b"\x03\x99", data[:-1]]:
+    try:
+        binary.decode(data)
+        assert False
+    except ValueError:
+        pass
+
+# Négociation du codec
+assert "binary" == negotiate_codec(["binary", "json"], ["json", "binary"]).name
+assert "json" == negotiate_codec(["binary", "json"], ["json"]).name
+assert "json" == negotiate_codec(["json"], ["binary"]).name
+assert "json" == negotiate_codec(["binary", "json"], []).name
+
+# Compression en flux des trames d'une connexion
+sock_out, sock_in = socket.socketpair()
+reader = FrameReader(sock_in)
+compressor = FrameCompressor()
+for p in [pck, {"request": "GET_BLOCKS"}, pck]:
+    frame = encode_frame(p, binary, compressor)
+    # Seuls les grands paquets sont compressés
+    compressed = FRAME_HEADER.unpack(frame[:FRAME_HEADER.size])[2] & FRAME_COMPRESSED
+    assert bool(compressed) == (len(binary.encode(p)) >= compressor.threshold)
+    sock_out.sendall(frame)
+    assert p == reader.read()
+sock_out.close()
+sock_in.close()
+
+# Un contenu compressé corrompu lève une ValueError
+garbage = b"\x00corrompu"
+try:
+    decode_frame_payload(FRAME_BINARY | FRAME_COMPRESSED, garbage, zlib.crc32(garbage),
+        zlib.decompressobj())
+    assert False
+except ValueError:
+    pass
@@ -0,0 +1,61 @@
+from mini_btc import Miner, FullNode, Transaction
+from mini_btc.utils import sha256, short_txid
+from tests.utils import mine, spend, pubkey
+from time import sleep
+
+
+# Le mineur ne mine pas de lui-même tant que son tampon est vide
+miner = Miner(pubkey, "localhost", 8000, block_size=10, difficulty=2, verbose=0)
+node = FullNode("localhost", 8001, "localhost", 8000, block_size=10, difficulty=2, verbose=0)
+miner.start(); sleep(0.5)
+node.start(); sleep(0.5)
+
+# Toutes les transactions sont connues du noeud
+block_tx = [Transaction().to_dict() for _ in range(3)]
+for tx in block_tx:
+    node.buf_tx.add(Transaction(tx))
+block = mine(miner, block_tx)
+assert miner._add_block(block)
+miner.submit_block(block)
+sleep(1)
+assert [block] == node.ledger
+assert 0 == len(node.buf_tx)
+
+# Une transaction manquante est demandée au mineur
+block_tx = [Transaction().to_dict() for _ in range(3)]
+for tx in block_tx[:2]:
+    node.buf_tx.add(Transaction(tx))
+block = mine(miner, block_tx)
+assert miner._add_block(block)
+miner.submit_block(block)
+sleep(1)
+assert miner.ledger == node.ledger
+assert 0 == len(node.pending_blocks)
+
+# Un identifiant court qui désigne une autre transaction du tampon (collision)
+# entraîne la demande des transactions retrouvées au mineur
+for n in [0, 1]:
+    # La seconde fois une autre transaction est aussi absente du tampon
+    rewards = [block["tx"][-1] for block in miner.ledger[-2:]]
+    real, decoy = spend(rewards[0], dest="bob"), spend(rewards[0], dest="eve")
+    missing = [spend(rewards[1])][:n]
+    node.buf_tx.clear()
+    node.buf_tx.add(Transaction(decoy))
+    block = mine(miner, [real] + missing, add=True)
+    shortids = [short_txid(tx["hash"]) for tx in block["tx"]]
+    shortids[0] = short_txid(decoy["hash"])
+    compact = {"index": block["index"], "hash": block["hash"], "root": block["root"],
+        "nonce": block["nonce"], "shortids": shortids, "prefilled": [[len(shortids) - 1, block["tx"][-1]]]}
+    miner.broadcast({"request": "SUBMIT_BLOCK", "compact": compact}, id=sha256(block))
+    sleep(1)
+    assert miner.ledger == node.ledger
+    assert 0 == len(node.pending_blocks)
+
+# Un bloc compact dont une position préremplie est invalide est ignoré
+for pos in [-1, len(shortids)]:
+    bad = dict(compact, prefilled=[[pos, block["tx"][-1]]])
+    assert node._rebuild_block("localhost", 8000, bad) is None
+    assert 0 == len(node.pending_blocks)
+
+miner.shutdown()
+node.shutdown()
@@ -23,7 +23,7 @@ genesis = {'index': 0, 'hash': None, 'root': '3e85455d74d714c9c9fad556cd3b6f0d1a
     {'locktime': 1677271600.9819515, 'input': [], 'output': [
         {'address': '668wc7STftWcCMUR8o9G62epry1GCDc5PiMnWmXySzW8', 'value': 50, 'lock': 'BQfcHxQKFtLLEA9o2azM9N2owM1eaArtwEPJYtguXQPyUohbFubHLjBsb3zQuQSgCEnJ5ZL87yKZ2mZomnKasa7HGgGHG7Rabzo9PjaAt4R6h8RyWRUtSHQCAArqqXagy7rTpfDi4BKoSXcpWsNgfnjBttcd3rbdBxrL9pGHZvPP7vsA2cPPYW1k2LNezr2MW6NSWRmevXYYbq9Ly9WgKWUTXx6yhYTiuWZMG4P8xCNwDqXZPDwUWhcwV5Bf4w4V9kodG9yiJnxRax4bF4CzveJoR68ehYaF1ePNMcnA8cR1SPFTpMJLnQXNv35hGwbz2PRQ4yFPfrYiwLEk1yoaYKWisZj9QyKCnqxRxrGW36TtuBLhksQoBnEkddginsDYezxFG7WZtbwuQWBQzohmTBWd51f9BK3koHrZpUPXrvhgJchmKcqdbH2YRoyMRNSAkADyLBoPphdvbPNEBaHKoDjXNnLXe5ZBEWxeW3qdrXTsPRXmhLYbZ2HbKoAiAg1mWcSqSpZZLV89xJXP1p6Wb1TDAZm8BGLFs9iCLMPZcGzBZ2cPqszor7b8ZngEYDznvKBDbkebq927fWWKwMEcBnLu9KrZg CHECKSIG'}],
     'hash': 'fae3166e856571a85ca5ed144d3f45d768fd5b422d3205622fc5c75a5e9d61c3'}]}
-n1.ledger.append(genesis)
+n1._connect_block(genesis)
 
 # Soumission de ce premier bloc sur le réseau
 req = {"request": "SUBMIT_BLOCK", "host": "localhost", "port": 8000, "block": genesis}
@@ -45,7 +45,8 @@ assert 1 == len(n2.buf_tx)
 assert 1 == len(n3.buf_tx)
 
 # Demande de blocs à un noeud
-n1.ledger = []
+with n1.lock_ledger:
+    n1._truncate(0)
 req = {"request": "GET_BLOCKS"}
 n1.send("localhost", 8001, req)
 sleep(1)
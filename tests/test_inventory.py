@@ -0,0 +1,48 @@
+from mini_btc import Node
+from time import sleep
+
+
+class Counter(Node):
+    """
+    Noeud comptant les paquets diffusés reçus par identifiant.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, verbose=0, **kwargs)
+        self.received = dict()
+
+    def _broadcast_callback(self, host: str, port: int, id: str, body: object):
+        self.received[id] = self.received.get(id, 0) + 1
+
+
+# Triangle de noeuds: chaque paquet est annoncé deux fois à chaque noeud
+n1 = Counter("localhost", 8000)
+n2 = Counter("localhost", 8001, remote_host="localhost", remote_port=8000)
+n3 = Counter("localhost", 8002, remote_host="localhost", remote_port=8000)
+# Noeud sans annonces connecté au troisième
+n4 = Counter("localhost", 8003, remote_host="localhost", remote_port=8002, inventory=False)
+for node in [n1, n2, n3, n4]:
+    node.start()
+    sleep(0.5)
+sleep(1)
+
+# Identifiant dérivé du contenu
+txid = "4b22550a32452d9b6d7e7f82d2a2015c0083b289e1fadb538c9f868b0e6d9b4e"
+req = {'request': 'TRANSACT', 'tx': {'locktime': 1676235668.405151, 'input': [], 'output': [], 'hash': txid}}
+n1.broadcast(req, id=txid)
+sleep(1)
+
+# Un seul traitement par noeud
+for node in [n1, n2, n3, n4]:
+    assert {txid: 1} == node.received, node.received
+# Le paquet reste disponible pour les voisins qui le demandent
+assert n1.relay.get(txid)["body"] == req
+assert n4.relay.get(txid) is None
+
+# Diffusion depuis le noeud sans annonces
+n4.broadcast({"request": "PING"})
+sleep(1)
+for node in [n1, n2, n3, n4]:
+    assert 2 == len(node.received)
+
+for node in [n1, n2, n3, n4]:
+    node.shutdown()
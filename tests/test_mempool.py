@@ -0,0 +1,67 @@
+from mini_btc import FullNode, Mempool, Transaction
+from tests.utils import mine, spend
+
+
+def tx_spending(txid: str, index: int, n: int = 0) -> Transaction:
+    """
+    Transaction non signée qui dépense une sortie.
+    Sa date est fixe pour que sa taille ne dépende que de ses champs.
+    """
+    tx = Transaction()
+    tx.locktime = 0.0
+    tx.add_input(prevTxHash=txid, index=index, unlock="true")
+    tx.add_output(f"address{n}", 1, "true")
+    return tx
+
+
+# Les plus anciennes transactions sont évincées au-delà de la capacité
+pool = Mempool(max_count=2)
+txs = [Transaction() for _ in range(3)]
+for i, tx in enumerate(txs): tx.locktime += i
+assert all(pool.add(tx) for tx in txs)
+assert txs[0] not in pool and txs[1] in pool and txs[2].txid in pool
+assert txs[1:] == list(pool) and txs[1] is pool.get(txs[1].txid)
+assert pool.add(txs[2]) is False
+
+# Une seule transaction par sortie dépensée
+a, b = tx_spending("prev", 0, 1), tx_spending("prev", 0, 2)
+assert pool.add(a) and pool.add(b) is False
+assert [a.txid] == pool.conflicts_with(b)
+assert {"size": 2, "added": 4, "conflicts": 1, "evictions": 2} == \
+    {k: v for k, v in pool.stats().items() if k != "bytes"}
+
+# Un bloc qui confirme une double dépense retire la transaction en conflit
+pool.difference_update([b, txs[2]])
+assert 0 == len(pool) and 0 == pool.bytes and 0 == len(pool.spent)
+assert pool.add(b)
+
+# Capacité en octets
+size = len(a.raw_format())
+pool = Mempool(max_bytes=2*size)
+assert pool.add(tx_spending("prev", 0)) and pool.add(tx_spending("prev", 1))
+assert pool.add(tx_spending("prev", 2)) and 2 == len(pool) and pool.bytes <= 2*size
+assert ("prev", 0) not in pool.spent and 1 == pool.stats()["evictions"]
+
+node = FullNode("localhost", 8000, difficulty=1, verbose=0)
+for _ in range(3):
+    assert node._add_block(mine(node))
+
+# Seules les transactions valides sont admises
+reward_tx = node.ledger[0]["tx"][-1]
+tx = Transaction(spend(reward_tx))
+assert node.accept_tx(tx) and tx in node.buf_tx
+assert node.accept_tx(tx) is False
+assert node.accept_tx(Transaction(spend(reward_tx, value=40))) is False
+assert node.accept_tx(Transaction(spend(node.ledger[1]["tx"][-1], valid=False))) is False
+assert node.accept_tx(Transaction(spend(mine(node)["tx"][-1]))) is False
+assert node.accept_tx(Transaction(reward_tx)) is False
+assert 1 == len(node.buf_tx)
+
+# Un bloc qui dépense la même sortie retire la transaction du tampon
+other = Transaction(spend(node.ledger[1]["tx"][-1]))
+assert node.accept_tx(other)
+assert node._add_block(mine(node, [spend(reward_tx, value=40)]))
+assert [other] == list(node.buf_tx)
+assert node.accept_tx(tx) is False
+
+node.shutdown()
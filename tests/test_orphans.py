@@ -0,0 +1,76 @@
+from mini_btc import FullNode, OrphanPool
+from tests.utils import mine
+from time import sleep
+
+
+# Ensemble borné des blocs orphelins
+pool = OrphanPool(capacity=3)
+blocks = [{"hash": "p1", "n": 0}, {"hash": "p2", "n": 1}, {"hash": "p1", "n": 2}]
+for i, block in enumerate(blocks):
+    assert pool.add(f"b{i}", block)
+assert pool.add("b0", blocks[0]) is False
+assert [blocks[0], blocks[2]] == pool.pop_children("p1")
+assert "b0" not in pool and 1 == len(pool)
+assert [] == pool.pop_children("p1")
+# Les blocs les plus anciens sont oubliés
+for i in range(3, 6):
+    pool.add(f"b{i}", {"hash": "p3", "n": i})
+assert "b1" not in pool and 3 == len(pool)
+assert [] == pool.pop_children("p2")
+assert OrphanPool(capacity=0).add("b0", blocks[0]) is False
+
+
+class Recorder(FullNode):
+    """
+    Noeud comptant les demandes GET_BLOCKS reçues.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, orphan_timeout=0.5, **kwargs)
+        self.requests = 0
+
+    def _private_callback(self, host: str, port: int, body: object):
+        if "GET_BLOCKS" == body["request"]:
+            self.requests += 1
+        super()._private_callback(host, port, body)
+
+
+n1 = Recorder("localhost", 8000)
+n2 = Recorder("localhost", 8001, "localhost", 8000)
+n1.start(); n2.start()
+sleep(1)
+
+for _ in range(3):
+    mine(n1, add=True)
+for block in n1.ledger[:1]:
+    assert n2._add_block(block)
+
+# Un bloc reçu avant son parent est rattaché à l'arrivée du parent
+n2._submit_block("localhost", 8000, n1.ledger[2])
+assert 1 == len(n2.ledger) and 1 == len(n2.orphans)
+n2._submit_block("localhost", 8000, n1.ledger[1])
+assert n1.ledger == n2.ledger and 0 == len(n2.orphans)
+sleep(1)
+assert 0 == n1.requests
+
+# Un parent qui n'arrive pas déclenche une seule synchronisation
+for _ in range(4):
+    mine(n1, add=True)
+n2._submit_block("localhost", 8000, n1.ledger[5])
+n2._submit_block("localhost", 8000, n1.ledger[6])
+assert 2 == len(n2.orphans)
+sleep(1.5)
+assert n1.ledger == n2.ledger and 0 == len(n2.orphans)
+assert 1 == n1.requests
+
+# Les demandes en cours ne sont pas répétées
+mine(n1, add=True)
+n1.requests = 0
+n2._sync("localhost", 8000)
+n2._sync("localhost", 8000)
+sleep(1)
+assert n1.ledger == n2.ledger
+assert 1 == n1.requests
+assert ("localhost", 8000) not in n2.syncing
+
+n1.shutdown()
+n2.shutdown()
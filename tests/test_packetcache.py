@@ -0,0 +1,57 @@
+from mini_btc.PacketCache import PacketCache, BloomFilter, RotatingBloomFilter
+from time import sleep
+
+
+# Déduplication simple
+cache = PacketCache(capacity=10, ttl=60)
+assert cache.add("a")
+assert not cache.add("a")
+assert "a" in cache and "b" not in cache
+assert {"size": 1, "hits": 1, "misses": 1, "evictions": 0, "expirations": 0} == cache.stats()
+
+# La taille reste bornée quel que soit le trafic
+cache = PacketCache(capacity=1000, ttl=60)
+for i in range(100_000):
+    assert cache.add(f"localhost:8000#{i}")
+assert 1000 == len(cache)
+assert 99_000 == cache.stats()["evictions"]
+# Les identifiants les plus récents sont conservés
+assert "localhost:8000#99999" in cache
+assert "localhost:8000#0" not in cache
+
+# Un identifiant réutilisé redevient le plus récent (LRU)
+cache = PacketCache(capacity=2, ttl=60)
+cache.add("a"); cache.add("b"); cache.add("a"); cache.add("c")
+assert "a" in cache and "b" not in cache and "c" in cache
+
+# Expiration après ttl secondes
+cache = PacketCache(capacity=10, ttl=0.1)
+cache.add("a")
+sleep(0.2)
+assert "a" not in cache
+assert cache.add("a")
+assert 1 == cache.stats()["expirations"]
+
+# Filtre de Bloom
+bloom = BloomFilter(1000)
+for i in range(1000):
+    bloom.add(str(i))
+assert all(str(i) in bloom for i in range(1000))
+assert sum(str(i) in bloom for i in range(1000, 11000)) < 10
+
+# Le filtre tournant oublie après 2 rotations
+bloom = RotatingBloomFilter(100)
+bloom.add("a")
+for i in range(150):
+    bloom.add(str(i))
+assert "a" in bloom
+for i in range(150, 250):
+    bloom.add(str(i))
+assert "a" not in bloom
+
+# Le filtre de Bloom prolonge la mémoire des identifiants évincés
+cache = PacketCache(capacity=100, ttl=60, bloom=True)
+for i in range(150):
+    cache.add(str(i))
+assert 100 == len(cache)
+assert not cache.add("0")
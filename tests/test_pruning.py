@@ -0,0 +1,108 @@
+from mini_btc import FullNode, Wallet, Transaction
+from tests.utils import mine, spend
+from time import sleep
+
+
+full = FullNode("localhost", 8000, difficulty=1, verbose=0)
+pruned = FullNode("localhost", 8001, difficulty=1, verbose=0, prune_depth=3)
+wallet = Wallet("./wallets/alice.bin", "localhost", 8002, "localhost", 8001, verbose=0)
+full.start(); pruned.start(); wallet.start()
+sleep(1)
+
+# Registre de 8 blocs, le bloc 2 dépense la récompense du bloc 0
+# et le bloc 6 la transaction du bloc 2
+blocks = []
+for i in range(8):
+    block_tx = []
+    if i == 2: block_tx = [spend(blocks[0]["tx"][-1])]
+    if i == 6: block_tx = [spend(blocks[2]["tx"][0])]
+    blocks.append(mine(full, block_tx, add=True))
+    assert pruned._add_block(blocks[-1])
+
+# Seuls les 3 derniers blocs conservent leurs transactions
+assert 5 == pruned.pruned_height == pruned.history_height()
+assert full.block_hashes == pruned.block_hashes
+assert full.utxo.entries == pruned.utxo.entries
+assert blocks[5:] == pruned.ledger[5:]
+for block, header in zip(blocks[:5], pruned.ledger[:5]):
+    assert "tx" not in header and block["root"] == header["root"]
+assert set(pruned.undo) == set(pruned.block_hashes[5:])
+assert pruned.revertible == {(txid, i) for undo in pruned.undo.values() for txid, i, _ in undo}
+
+# Les transactions des blocs élagués ne sont conservées que si elles ont des UTXO
+# ou si le bloc qui les dépense peut encore être annulé
+assert {block["tx"][-1]["hash"] for block in blocks[1:5]} | {blocks[2]["tx"][0]["hash"]} \
+    == set(pruned.pruned_tx)
+# Les transactions qui ne sont plus conservées sont retirées de l'index
+assert pruned.find_tx(blocks[0]["tx"][-1]["hash"]) is None
+assert blocks[0]["tx"][-1]["hash"] not in pruned.tx_index
+assert 0 == pruned.pruned_index[blocks[0]["tx"][-1]["hash"]]
+assert 0 == pruned.find_tx(blocks[0]["tx"][-1]["hash"], return_index=True)
+assert set(pruned.pruned_tx) | {tx["hash"] for block in blocks[5:] for tx in block["tx"]} \
+    == set(pruned.tx_index)
+spend_tx = spend(blocks[3]["tx"][-1])
+assert pruned.check_tx(Transaction(spend_tx))
+blocks.append(mine(full, [spend_tx], add=True))
+assert pruned._add_block(blocks[-1])
+assert full.utxo.entries == pruned.utxo.entries
+blocks.append(mine(full, add=True))
+assert pruned._add_block(blocks[-1])
+assert blocks[2]["tx"][0]["hash"] not in pruned.pruned_tx
+
+# Une branche qui diverge avant les blocs complets est refusée
+other = FullNode("localhost", 8004, difficulty=1, verbose=0)
+for block in blocks[:2]:
+    assert other._add_block(block)
+branch = [mine(other, add=True) for _ in range(10)]
+for block in branch:
+    pruned._add_block(block)
+assert full.block_hashes == pruned.block_hashes
+assert pruned.revertible == {(txid, i) for undo in pruned.undo.values() for txid, i, _ in undo}
+
+# Une sortie dépensée par un bloc qui peut encore être annulé reste utilisable
+source = FullNode("localhost", 8005, difficulty=1, verbose=0)
+node = FullNode("localhost", 8006, difficulty=1, verbose=0, prune_depth=3)
+chain = []
+for i in range(6):
+    chain.append(mine(source, [spend(chain[0]["tx"][-1])] if i == 3 else [], add=True))
+    assert node._add_block(chain[-1])
+assert 3 == node.pruned_height
+fork = FullNode("localhost", 8007, difficulty=1, verbose=0)
+for block in chain[:3]:
+    assert fork._add_block(block)
+for _ in range(4):
+    assert node._add_block(mine(fork, add=True))
+assert fork.block_hashes == node.block_hashes
+reward = chain[0]["tx"][-1]
+assert node.utxo.get(reward["hash"], 0) is not None
+assert reward == node.find_tx(reward["hash"]).to_dict()
+assert node.check_tx(Transaction(spend(reward)))
+for n in [source, node, fork]:
+    n.shutdown()
+
+# Le noeud élagué n'envoie que les en-têtes des blocs élagués
+wallet.sync_block(); sleep(0.5)
+assert pruned.ledger[:pruned.pruned_height] == wallet.ledger[:pruned.pruned_height]
+assert len(blocks) == len(wallet.ledger)
+
+# Preuves refusées pour les blocs élagués, même si leurs sorties sont dépensées
+wallet.get_proof(blocks[0]["tx"][-1]["hash"])
+wallet.get_proof(blocks[2]["tx"][0]["hash"])
+wallet.get_proof(blocks[-1]["tx"][0]["hash"]); sleep(0.5)
+assert {blocks[0]["tx"][-1]["hash"]: 0, blocks[2]["tx"][0]["hash"]: 2} == wallet.pruned_proof
+assert blocks[2]["tx"][0]["hash"] not in wallet.proof_tx
+assert wallet.verify_proof(blocks[-1]["tx"][0]["hash"])
+
+# Élagage selon la taille des listes de transactions conservées
+light = FullNode("localhost", 8003, difficulty=1, verbose=0, prune_bytes=5000)
+for block in blocks:
+    assert light._add_block(block)
+assert 0 < light.pruned_height < len(blocks) - 1
+assert light.body_bytes <= 5000 and len(light.body_sizes) == len(blocks) - light.pruned_height
+assert full.utxo.entries == light.utxo.entries
+
+full.shutdown()
+pruned.shutdown()
+wallet.shutdown()
+light.shutdown()
+other.shutdown()
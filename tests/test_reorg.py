@@ -0,0 +1,102 @@
+from mini_btc import FullNode, Transaction
+from mini_btc.utils import sha256
+from tests.utils import mine, spend
+
+
+node = FullNode("localhost", 8000, difficulty=1, verbose=0)
+replay = FullNode("localhost", 8001, difficulty=1, verbose=0)
+node.start(); replay.start()
+
+
+def check_state():
+    """
+    Les index et les UTXO sont ceux obtenus en rejouant le registre.
+    """
+    replay._truncate(0)
+    for block in node.ledger:
+        assert replay._add_block(block)
+    assert node.block_hashes == replay.block_hashes
+    assert node.tx_index == replay.tx_index
+    assert node.utxo.entries == replay.utxo.entries
+    assert set(node.undo) == set(node.block_hashes)
+
+
+# Registre principal de 6 blocs, le bloc 4 dépense la récompense du bloc 1
+main = [mine(node)]
+assert node._add_block(main[0])
+for i in range(1, 6):
+    block_tx = []
+    if i == 4:
+        spend_tx = spend(main[1]["tx"][-1])
+        empty_tx = Transaction().to_dict()
+        block_tx = [spend_tx, empty_tx]
+    main.append(mine(node, block_tx, prev=main[-1]))
+    assert node._add_block(main[-1])
+assert node._add_block(main[0]) is False
+node._truncate(0)
+for block in main:
+    assert node._add_block(block)
+assert node.utxo.get(main[1]["tx"][-1]["hash"], 0) is None
+check_state()
+
+# Branche concurrente à partir du bloc 2
+branch = [mine(node, prev=main[2])]
+for _ in range(3):
+    branch.append(mine(node, prev=branch[-1]))
+
+# A travail égal le registre est conservé
+for block in branch[:3]:
+    assert node._add_block(block)
+assert main == node.ledger
+# Seuls les blocs des branches concurrentes sont dans l'arbre des blocs
+assert set(node.blocks) == {sha256(block) for block in branch[:3]}
+
+# La branche plus lourde remplace les blocs qui suivent le dernier bloc commun
+assert node._add_block(branch[3])
+assert main[:3] + branch == node.ledger
+assert set(node.blocks) == {sha256(block) for block in main[3:]}
+check_state()
+# La sortie consommée par le bloc annulé est restaurée
+assert node.utxo.get(main[1]["tx"][-1]["hash"], 0) is not None
+# Les transactions des blocs annulés retournent dans le tampon
+assert Transaction(spend_tx) in node.buf_tx
+assert Transaction(empty_tx) in node.buf_tx
+
+# Retour sur l'ancienne branche prolongée
+main.append(mine(node, prev=main[-1]))
+main.append(mine(node, prev=main[-1]))
+assert node._add_block(main[-2])
+assert main[:3] + branch == node.ledger
+assert node._add_block(main[-1])
+assert main == node.ledger
+check_state()
+assert Transaction(spend_tx) not in node.buf_tx
+
+# Une branche contenant une double dépense est rejetée et le registre restauré
+invalid = mine(node, [spend(main[1]["tx"][-1])], prev=main[6])
+child = mine(node, prev=invalid)
+assert node._add_block(invalid)
+assert node._add_block(child) is False
+assert main == node.ledger
+assert sha256(invalid) not in node.blocks
+check_state()
+
+# Les descendants connus d'un bloc invalide sont aussi oubliés
+invalid = mine(node, [spend(main[1]["tx"][-1])], prev=main[5])
+children = [mine(node, prev=invalid)]
+children.append(mine(node, prev=children[-1]))
+assert node._add_block(invalid)
+assert node._add_block(children[0])
+assert node._add_block(children[1]) is False
+assert main == node.ledger
+assert all(sha256(block) not in node.blocks for block in [invalid] + children)
+
+# Les branches concurrentes trop profondes sont oubliées
+node.fork_depth = 2
+main.append(mine(node, prev=main[-1]))
+assert node._add_block(main[-1])
+assert all(block["index"] >= len(node.ledger) - 2 for block in node.blocks.values())
+check_state()
+
+node.shutdown()
+replay.shutdown()
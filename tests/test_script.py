@@ -0,0 +1,47 @@
+from mini_btc import Transaction
+from mini_btc.script import execute, compile_script, OPCODES
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign, dsa_verify, _dsa_verifier, json_encode
+from Crypto.Hash import SHA256
+
+
+privkey = dsa_import("./wallets/alice.bin")
+pubkey, address = dsa_pubkey(privkey)
+
+tx = Transaction()
+tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+data = tx.to_dict()
+data.pop("hash")
+sign = dsa_sign(privkey, data)
+
+# Un script verrouillant n'est compilé qu'une fois
+ops = compile_script(f"{pubkey} CHECKSIG")
+assert [(None, pubkey), (OPCODES["CHECKSIG"], "CHECKSIG")] == list(ops)
+assert ops is compile_script(f"{pubkey} CHECKSIG")
+
+# La clé publique n'est importée qu'une fois
+_dsa_verifier.cache_clear()
+assert "true" == execute(sign, f"{pubkey} CHECKSIG", tx)
+assert "false" == execute(sign[:-2] + "00", f"{pubkey} CHECKSIG", tx)
+assert 1 == _dsa_verifier.cache_info().misses and 1 == _dsa_verifier.cache_info().hits
+# Une clé invalide n'est pas retenue
+assert not dsa_verify("invalid", sign, data)
+assert 1 == _dsa_verifier.cache_info().currsize
+
+# Une pile insuffisante ou vide fait échouer le script
+assert "false" == execute("", f"{pubkey} CHECKSIG", tx)
+assert "false" == execute("", f"{pubkey} CHECKSIG", tx, [])
+assert "false" == execute("", "", tx)
+
+# La table des instructions permet d'ajouter des instructions
+OPCODES["DROP"] = lambda stack, origin, tx, checks: (stack.pop(), origin.pop())
+compile_script.cache_clear()
+assert "a" == execute("a b", "DROP", tx)
+del OPCODES["DROP"]
+compile_script.cache_clear()
+assert "DROP" == execute("a b", "DROP", tx)
+
+# Le message signé est calculé une seule fois à partir du hash de la transaction
+assert tx.sighash is tx.sighash
+assert SHA256.new(json_encode(data)).digest() == tx.sighash.digest()
+assert dsa_verify(pubkey, dsa_sign(privkey, tx.sighash), data)
+assert dsa_verify(pubkey, sign, Transaction(tx.to_dict()).sighash)
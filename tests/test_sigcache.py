@@ -0,0 +1,54 @@
+from mini_btc import FullNode, SigCache, Transaction
+from tests.utils import mine, spend
+
+
+# Ensemble borné des vérifications réussies
+cache = SigCache(capacity=2)
+keys = [SigCache.key(f"tx{i}", 0, "pubkey") for i in range(3)]
+assert SigCache.key("tx0", 0, "pubkey") == keys[0] != SigCache.key("tx0", 1, "pubkey")
+assert not cache.lookup(keys[0])
+cache.add(keys[0]); cache.add(keys[1])
+assert cache.lookup(keys[0])
+# La vérification la moins récemment utilisée est oubliée
+cache.add(keys[2])
+assert keys[1] not in cache and keys[0] in cache
+assert {"size": 2, "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5} == cache.stats()
+SigCache(capacity=0).add(keys[0])
+
+
+class Counter(FullNode):
+    """
+    Noeud comptant les signatures effectivement vérifiées.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, **kwargs)
+        self.verified = 0
+
+    def _verify(self, checks: list) -> list:
+        self.verified += len(checks)
+        return super()._verify(checks)
+
+
+node = Counter("localhost", 8000)
+other = Counter("localhost", 8001)
+for _ in range(3):
+    block = mine(node)
+    assert node._add_block(block) and other._add_block(block)
+
+# Les transactions vérifiées dans le tampon ne sont pas revérifiées dans un bloc
+txs = [Transaction(spend(node.ledger[0]["tx"][0])), Transaction(spend(node.ledger[1]["tx"][0]))]
+assert node.check_txs(txs) == [True, True] and 2 == node.verified
+assert node.check_tx(txs[0]) and 2 == node.verified
+block = mine(node, [tx.to_dict() for tx in txs])
+assert node._add_block(block)
+assert 2 == node.verified
+assert {"size": 2, "hits": 3, "misses": 2} == {k: v for k, v in node.sig_cache.stats().items()
+    if k in ["size", "hits", "misses"]}
+assert 0.6 == node.sig_cache.stats()["hit_rate"]
+
+# Un noeud qui n'a pas vu les transactions les vérifie
+assert other._add_block(block)
+assert 2 == other.verified and 0 == other.sig_cache.stats()["hits"]
+
+node.shutdown()
+other.shutdown()
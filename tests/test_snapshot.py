@@ -0,0 +1,68 @@
+from mini_btc import FullNode, Transaction
+from tests.utils import mine, spend
+from time import sleep
+
+
+n1 = FullNode("localhost", 8000, difficulty=1, verbose=0, sync_chunk=4)
+n2 = FullNode("localhost", 8001, "localhost", 8000, difficulty=1, verbose=0)
+n1.start(); n2.start()
+sleep(1)
+
+# Registre de 10 blocs, le bloc 5 dépense la récompense du bloc 1
+for i in range(10):
+    mine(n1, [spend(n1.ledger[1]["tx"][-1])] if i == 5 else [], add=True)
+snapshot = n1.export_snapshot()
+assert 10 == snapshot["height"] and n1.block_hashes == snapshot["hashes"]
+assert len(n1.utxo) == sum(len(indexes) for _, indexes in snapshot["tx"])
+
+# Un instantané altéré est refusé
+tampered = dict(snapshot, tx=[[dict(tx, output=[dict(tx["output"][0], value=1000)]), indexes]
+    for tx, indexes in snapshot["tx"]])
+assert n2.import_snapshot(tampered) is False
+assert n2.import_snapshot(snapshot, commitment="0" * 64) is False
+# L'engagement couvre tous les hashs des blocs
+assert n2.import_snapshot(dict(snapshot, hashes=["0" * 64] + snapshot["hashes"][1:])) is False
+# Un instantané malformé est refusé sans exception
+tx, indexes = snapshot["tx"][0]
+for entries in [[[tx]], [[tx, [99]]], [[tx, [-1]]], [[tx, ["0"]]], [[dict(tx, output=None), indexes]],
+        [[{"hash": tx["hash"]}, indexes]], [None], None]:
+    assert n2.import_snapshot(dict(snapshot, tx=entries)) is False
+for malformed in [None, [], {"version": snapshot["version"]}, dict(snapshot, height="10"),
+        dict(snapshot, hashes=None), dict(snapshot, hashes=[None] * 10)]:
+    assert n2.import_snapshot(malformed) is False
+assert 0 == len(n2.ledger)
+
+# Le noeud amorcé ne synchronise que les blocs qui suivent l'instantané
+assert n2.import_snapshot(snapshot, commitment=snapshot["commitment"])
+assert n2.import_snapshot(snapshot) is False
+assert n1.utxo.entries == n2.utxo.entries
+for _ in range(3):
+    mine(n1, add=True)
+n2._sync("localhost", 8000); sleep(1)
+assert n1.block_hashes == n2.block_hashes
+assert n1.ledger[10:] == n2.ledger[10:] and [None] * 10 == n2.ledger[:10]
+
+# Une UTXO de l'instantané peut être dépensée
+spend_tx = spend(n1.ledger[3]["tx"][-1])
+assert n2.check_tx(Transaction(spend_tx))
+mine(n2, [spend_tx], add=True)
+assert n2.utxo.get(spend_tx["input"][0]["prevTxHash"], 0) is None
+
+# Les blocs antérieurs à l'instantané sont validés en tâche de fond
+n2.validate_snapshot("localhost", 8000); sleep(1)
+assert n2.snapshot_validated
+assert n1.ledger == n2.ledger[:13]
+assert n2.find_tx(n1.ledger[3]["tx"][-1]["hash"], return_index=True) == 3
+n2._truncate(12)
+assert n1.ledger[:12] == n2.ledger
+
+# Une branche antérieure à l'instantané annule les blocs validés
+prev = n2.ledger[3]
+for _ in range(9):
+    prev = mine(n2, prev=prev, add=True)
+assert 13 == len(n2.ledger) and n1.block_hashes[:4] == n2.block_hashes[:4]
+assert n1.block_hashes[4] != n2.block_hashes[4]
+assert n2.check_tx(Transaction(spend(n1.ledger[1]["tx"][-1])))
+
+n1.shutdown()
+n2.shutdown()
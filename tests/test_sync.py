@@ -0,0 +1,59 @@
+from mini_btc import FullNode
+from tests.utils import mine
+from time import sleep
+
+
+class Recorder(FullNode):
+    """
+    Noeud enregistrant la hauteur de départ des réponses LIST_BLOCKS reçues.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, difficulty=1, verbose=0, sync_chunk=5, **kwargs)
+        self.starts = []
+
+    def _private_callback(self, host: str, port: int, body: object):
+        if "LIST_BLOCKS" == body["request"]:
+            self.starts.append(body["start"])
+        super()._private_callback(host, port, body)
+
+
+n1 = Recorder("localhost", 8000)
+n2 = Recorder("localhost", 8001, "localhost", 8000)
+n1.start(); n2.start()
+sleep(1)
+
+# Synchronisation complète par morceaux de 5 blocs
+for _ in range(23):
+    mine(n1, add=True)
+n2._sync("localhost", 8000); sleep(1)
+assert n1.ledger == n2.ledger
+assert [0, 5, 10, 15, 20] == n2.starts
+
+# Seuls les blocs manquants sont envoyés
+mine(n1, add=True); mine(n1, add=True)
+n2.starts = []
+n2._sync("localhost", 8000); sleep(1)
+assert n1.ledger == n2.ledger
+assert [23] == n2.starts
+
+# Divergence: la chaîne la plus longue remplace les derniers blocs
+mine(n2, add=True)
+for _ in range(3):
+    mine(n1, add=True)
+n2.starts = []
+n2._sync("localhost", 8000); sleep(1)
+assert n1.ledger == n2.ledger
+assert [25] == n2.starts
+assert n1.block_hashes == n2.block_hashes
+assert len(n1.utxo) == len(n2.utxo) == 28
+
+# Une chaîne plus courte ne remplace pas le registre
+for _ in range(3):
+    mine(n2, add=True)
+ledger = n2.ledger.copy()
+mine(n1, add=True)
+n2._sync("localhost", 8000); sleep(1)
+assert ledger == n2.ledger
+
+n1.shutdown()
+n2.shutdown()
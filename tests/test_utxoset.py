@@ -0,0 +1,43 @@
+from mini_btc import UtxoSet, Transaction
+
+
+tx1 = Transaction()
+tx1.add_output("alice", 30, "alice_pubkey CHECKSIG")
+tx1.add_output("bob", 20, "bob_pubkey CHECKSIG")
+tx1 = tx1.to_dict()
+
+tx2 = Transaction()
+tx2.add_output("alice", 50, "alice_pubkey CHECKSIG")
+tx2 = tx2.to_dict()
+
+utxo = UtxoSet()
+utxo.add_tx(tx1)
+utxo.add_tx(tx2)
+assert 3 == len(utxo)
+assert (tx1["hash"], 1) in utxo
+assert {"address": "bob", "value": 20, "lock": "bob_pubkey CHECKSIG"} == utxo.get(tx1["hash"], 1)
+assert {(tx1["hash"], 0), (tx2["hash"], 0)} == utxo.outpoints("alice")
+assert set() == utxo.outpoints("charlie")
+
+# Dépense d'une sortie
+assert 30 == utxo.spend(tx1["hash"], 0)["value"]
+assert (tx1["hash"], 0) not in utxo
+assert {(tx2["hash"], 0)} == utxo.outpoints("alice")
+# Une sortie ne peut être dépensée qu'une fois
+assert utxo.spend(tx1["hash"], 0) is None
+assert utxo.get(tx1["hash"], 0) is None
+
+# L'index par adresse est vidé avec les sorties
+assert utxo.spend(tx1["hash"], 1) is not None
+assert "bob" not in utxo.by_address
+assert 1 == len(utxo)
+
+# L'engagement ne dépend pas de l'ordre d'ajout
+other = UtxoSet()
+other.add(tx2["hash"], 0, tx2["output"][0])
+assert other.commitment() == utxo.commitment()
+other.add(tx1["hash"], 0, tx1["output"][0])
+assert other.commitment() != utxo.commitment()
+
+utxo.clear()
+assert 0 == len(utxo) and set() == utxo.outpoints("alice")
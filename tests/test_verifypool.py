@@ -0,0 +1,53 @@
+from mini_btc import FullNode, VerifyPool, Transaction
+from mini_btc.script import execute
+from mini_btc.utils import dsa_sign
+from tests.utils import mine, spend, privkey, pubkey, address
+
+
+# Les processus de vérification importent ce script
+if __name__ == "__main__":
+    # Vérification d'un lot réparti sur plusieurs processus
+    data = [{"n": i} for i in range(6)]
+    checks = [(pubkey, dsa_sign(privkey, d), d) for d in data]
+    checks[4] = (pubkey, checks[4][1], {"n": -1})
+    pool = VerifyPool(workers=2, min_batch=1)
+    assert [True, True, True, True, False, True] == pool.verify(checks)
+    assert [] == pool.verify([])
+    pool.close()
+    assert [True, False] == VerifyPool(workers=1).verify(checks[3:5])
+
+    # Seule la vérification dont dépend le sommet de la pile est différée
+    tx = Transaction()
+    tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+    sign = dsa_sign(privkey, {k: v for k, v in tx.to_dict().items() if k != "hash"})
+    deferred = []
+    assert "true" == execute("bad", f"{pubkey} CHECKSIG", tx, deferred)
+    assert [(pubkey, "bad")] == [check[:2] for check in deferred]
+    deferred = []
+    assert "true" == execute(sign, f"{pubkey} CHECKSIG true", tx, deferred)
+    assert [] == deferred
+    assert "false" == execute("bad", f"{pubkey} CHECKSIG", tx)
+    assert "true" == execute(sign, f"{pubkey} CHECKSIG", tx)
+
+
+    node = FullNode("localhost", 8000, difficulty=1, verbose=0, verify_workers=2)
+    node.verifier.min_batch = 1
+    # Les processus sont démarrés avec le noeud
+    node.start()
+    assert node.verifier.pool is not None
+    for _ in range(4):
+        assert node._add_block(mine(node))
+
+    # Groupe de transactions vérifiées en un seul lot
+    group = [Transaction(spend(node.ledger[0]["tx"][0])),
+        Transaction(spend(node.ledger[1]["tx"][0], valid=False)),
+        Transaction(spend(node.ledger[2]["tx"][0])), Transaction()]
+    assert [True, False, True, True] == node.check_txs(group)
+
+    # Un bloc dont une signature est invalide est rejeté
+    assert node._add_block(mine(node, [group[1].to_dict(), group[0].to_dict()])) is False
+    assert node._add_block(mine(node, [group[0].to_dict(), group[2].to_dict()]))
+    assert node.utxo.get(node.ledger[0]["tx"][0]["hash"], 0) is None
+    assert node.utxo.get(node.ledger[2]["tx"][0]["hash"], 0) is None
+
+    node.shutdown()
@@ -0,0 +1,58 @@
+from mini_btc import FullNode, Transaction, MerkleTree
+from mini_btc.utils import dsa_import, dsa_pubkey, dsa_sign, sha256
+import random
+
+
+# Porte-feuille qui reçoit les récompenses et signe les dépenses
+privkey = dsa_import("./wallets/alice.bin")
+pubkey, address = dsa_pubkey(privkey)
+
+
+def mine(node: FullNode, block_tx: list = [], prev: dict = None, add: bool = False) -> dict:
+    """
+    Bloc résolu contenant des transactions suivies d'une récompense.
+
+    :param node: Noeud qui vérifie la preuve de travail du bloc.
+    :param block_tx: Transactions du bloc avant la récompense.
+    :param prev: Bloc précédent. Si None le bloc suit le dernier bloc du registre.
+    :param add: Si True le bloc est ajouté au registre du noeud.
+    :return: Objet Python du bloc.
+    """
+    reward_tx = Transaction()
+    reward_tx.locktime += random.random()
+    reward_tx.add_output(address, 50, f"{pubkey} CHECKSIG")
+    block_tx = block_tx + [reward_tx.to_dict()]
+    if prev is None:
+        index = len(node.ledger)
+        parent = node.block_hashes[-1] if len(node.ledger) > 0 else None
+    else:
+        index, parent = prev["index"] + 1, sha256(prev)
+    block = {"index": index, "hash": parent,
+        "root": MerkleTree([tx["hash"] for tx in block_tx]).get_root(),
+        "nonce": random.randint(0, 1_000_000_000), "tx": block_tx}
+    while not node._check_block(block, check_tx=False):
+        block["nonce"] += 1
+    if add:
+        assert node._add_block(block)
+    return block
+
+
+def spend(tx: dict, value: int = 50, dest: str = address, valid: bool = True) -> dict:
+    """
+    Transaction qui dépense la première sortie d'une transaction.
+
+    :param tx: Dictionnaire de la transaction dépensée.
+    :param value: Montant envoyé, le reste est rendu à l'adresse "change".
+    :param dest: Adresse du destinataire.
+    :param valid: Si False la signature est invalide.
+    :return: Dictionnaire de la transaction.
+    """
+    data = tx.copy()
+    data.pop("hash")
+    spend_tx = Transaction()
+    spend_tx.add_input(prevTxHash=tx["hash"], index=0,
+        unlock=dsa_sign(privkey, data if valid else {}))
+    spend_tx.add_output(dest, value, f"{pubkey} CHECKSIG")
+    if value < 50:
+        spend_tx.add_output("change", 50-value, f"{pubkey} CHECKSIG")
+    return spend_tx.to_dict()